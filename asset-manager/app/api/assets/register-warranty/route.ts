@@ -73,10 +73,13 @@ export async function POST(request: Request) {
     const warrantyApiUrl = process.env.WARRANTY_API_URL || "https://server15.eport.ws/api/v1/warranty";
 
     // Call the external warranty API
+    // One registration per asset: retries after a timeout reuse the key and
+    // get the original response back instead of creating a duplicate warranty.
     const warrantyResponse = await fetch(warrantyApiUrl, {
       method: "POST",
       headers: {
         "Content-Type": "application/json",
+        "Idempotency-Key": `asset-${asset_id}-warranty`,
       },
       body: JSON.stringify(warrantyData),
     });
@@ -1,9 +1,17 @@
-from fastapi import Depends, HTTPException, Security, status
+import math
+from collections.abc import Callable
+
+from fastapi import Depends, HTTPException, Request, Security, status
 from fastapi.security import APIKeyHeader
 
 from app.api.dependencies.database import get_repository
 from app.core import security
+from app.core.api_key_revocations import get_api_key_revocations
+from app.core.config import get_app_settings
+from app.core.rate_limit import RateLimiter, get_rate_limiter
+from app.core.settings.app import AppSettings
 from app.database.repositories.api_key import ApiKeyRepository
+from app.middlewares.usage import API_KEY_ID_STATE
 from app.models.api_key import ApiKey
 
 API_KEY_HEADER_NAME = "X-API-Key"
@@ -37,6 +45,11 @@ async def verify_api_key(
             detail="API key is required. Please provide X-API-Key header.",
         )
 
+    if api_key_header.startswith(security.SIGNED_API_KEY_PREFIX):
+        api_key = _verify_signed_api_key(api_key_header)
+        if api_key is not None:
+            return api_key
+
     # Hash the provided API key and find matching key in database
     # We use SHA-256 for API keys (not bcrypt) to avoid 72-byte limit
     provided_key_hash = security.hash_api_key(api_key_header)
@@ -69,8 +82,114 @@ async def verify_api_key(
                 detail="API key has expired.",
             )
 
-    # Update last used timestamp
-    await api_key_repo.update_last_used(api_key=api_key)
+    # Usage and last_used_at are recorded by ApiKeyUsageMiddleware, not here
+    return api_key
+
+
+def _verify_signed_api_key(api_key_header: str) -> ApiKey | None:
+    """
+    Verify a signed key in memory: signature, embedded expiry and the
+    revocation list. None when this cannot be decided without the database
+    (signing disabled, or the revocation list is stale).
+    """
+    settings = get_app_settings()
+    revocations = get_api_key_revocations()
+    signing_key = settings.api_key_signing_key
+    if signing_key is None or not revocations.fresh(settings.api_key_revocation_max_staleness_seconds):
+        return None
+
+    claims = security.parse_signed_api_key(api_key_header, signing_key)
+    if claims is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid API key.",
+        )
+    if claims.is_expired():
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="API key has expired.",
+        )
+    if revocations.is_revoked(claims.api_key_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="API key has been deactivated.",
+        )
+
+    # Not loaded from the database; carries what authorization and rate limiting read
+    rate_limit_per_minute, rate_limit_burst = revocations.rate_limits(claims.api_key_id)
+    return ApiKey(
+        id=claims.api_key_id,
+        is_active=True,
+        expires_at=claims.expires_at,
+        rate_limit_per_minute=rate_limit_per_minute,
+        rate_limit_burst=rate_limit_burst,
+    )
 
+
+async def _verify_api_key_optional(
+    api_key_header: str | None = Security(APIKeyHeaderAuth()),
+    api_key_repo: ApiKeyRepository = Depends(get_repository(ApiKeyRepository)),
+) -> ApiKey | None:
+    if not api_key_header:
+        return None
+
+    return await verify_api_key(api_key_header=api_key_header, api_key_repo=api_key_repo)
+
+
+async def _enforce_rate_limit(api_key: ApiKey, settings: AppSettings, rate_limiter: RateLimiter) -> None:
+    """Spend one token from the key's bucket or raise 429; limits come from the already loaded row."""
+    if not settings.rate_limit_enabled:
+        return
+
+    decision = await rate_limiter.hit(
+        f"api_key:{api_key.id}",
+        per_minute=api_key.rate_limit_per_minute or settings.rate_limit_default_per_minute,
+        burst=api_key.rate_limit_burst or settings.rate_limit_default_burst,
+    )
+    if not decision.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded for this API key.",
+            headers={
+                "Retry-After": str(max(math.ceil(decision.retry_after), 1)),
+                "X-RateLimit-Limit": str(decision.limit),
+                "X-RateLimit-Remaining": "0",
+            },
+        )
+
+
+async def _get_rate_limited_api_key(
+    request: Request,
+    api_key: ApiKey = Depends(verify_api_key),
+    settings: AppSettings = Depends(get_app_settings),
+    rate_limiter: RateLimiter = Depends(get_rate_limiter),
+) -> ApiKey:
+    # Count the request against the key even if it is rate limited below
+    setattr(request.state, API_KEY_ID_STATE, api_key.id)
+    await _enforce_rate_limit(api_key, settings, rate_limiter)
+    return api_key
+
+
+async def _get_rate_limited_api_key_optional(
+    request: Request,
+    api_key: ApiKey | None = Depends(_verify_api_key_optional),
+    settings: AppSettings = Depends(get_app_settings),
+    rate_limiter: RateLimiter = Depends(get_rate_limiter),
+) -> ApiKey | None:
+    if api_key is not None:
+        setattr(request.state, API_KEY_ID_STATE, api_key.id)
+        await _enforce_rate_limit(api_key, settings, rate_limiter)
     return api_key
 
+
+def get_rate_limited_api_key(
+    *,
+    required: bool = True,
+) -> Callable:
+    """
+    Verify the X-API-Key header and apply the key's rate limit.
+
+    With `required=False` requests without the header pass through unlimited,
+    while requests that do send a key must present a valid one.
+    """
+    return _get_rate_limited_api_key if required else _get_rate_limited_api_key_optional
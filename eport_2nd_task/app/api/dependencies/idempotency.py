@@ -0,0 +1,28 @@
+from fastapi import Header
+
+from app.models.api_key import ApiKey
+
+IDEMPOTENCY_KEY_HEADER_NAME = "Idempotency-Key"
+
+
+def get_idempotency_key(
+    idempotency_key: str | None = Header(
+        None,
+        alias=IDEMPOTENCY_KEY_HEADER_NAME,
+        min_length=1,
+        max_length=255,
+        description="Client-generated key; retries with the same key and body return the original response.",
+    ),
+) -> str | None:
+    return idempotency_key
+
+
+def idempotency_scope(operation: str, *, api_key: ApiKey | None, user_id: int) -> str:
+    """
+    Scope idempotency keys to the caller, so two callers picking the same key
+    never see each other's stored responses. Requests without an API key fall
+    back to the user they register for.
+    """
+    if api_key is not None:
+        return f"{operation}:api_key:{api_key.id}"
+    return f"{operation}:user:{user_id}"
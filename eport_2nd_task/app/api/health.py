@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Request, status
+from fastapi.responses import JSONResponse
+
+router = APIRouter()
+
+
+@router.get("/healthz", name="health:liveness")
+async def liveness():
+    """Liveness probe. Only checks that the process is serving requests."""
+    return {"status": "ok"}
+
+
+@router.get("/readyz", name="health:readiness")
+async def readiness(request: Request):
+    """
+    Readiness probe. Ready once the worker has warmed its pool and the
+    cached background database check is passing.
+    """
+    state = request.app.state
+    probe = getattr(state, "db_health", None)
+    warmed = getattr(state, "warmed", False)
+    database = probe.snapshot() if probe is not None else {"ok": False}
+    ready = warmed and database["ok"]
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "ready" if ready else "unavailable", "warmed": warmed, "database": database},
+    )
@@ -1,8 +1,14 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
+from app.api.dependencies.api_key import get_rate_limited_api_key
 from app.api.v1 import admin, auth, warranty
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
-api_router.include_router(warranty.router, prefix="/warranty", tags=["warranty"])
+api_router.include_router(
+    warranty.router,
+    prefix="/warranty",
+    tags=["warranty"],
+    dependencies=[Depends(get_rate_limited_api_key(required=False))],
+)
 api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
@@ -1,15 +1,31 @@
+import base64
+import json
+from datetime import UTC, date, datetime, timedelta
+
 from fastapi import APIRouter, Depends, Form, HTTPException, Query
-from starlette.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_401_UNAUTHORIZED
+from starlette.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_400_BAD_REQUEST, HTTP_401_UNAUTHORIZED
 
 from app.api.dependencies.database import get_repository
 from app.core import security
+from app.core.config import get_app_settings
+from app.core.settings.app import AppSettings
 from app.database.repositories.api_key import ApiKeyRepository
+from app.database.repositories.api_key_usage import ApiKeyUsageRepository
 from app.models.api_key import ApiKey
 from app.schemas.api_key import (
+    ApiKeyBulkCreate,
+    ApiKeyBulkCreateResponse,
     ApiKeyCreate,
     ApiKeyCreateResponse,
     ApiKeyOut,
+    ApiKeyRateLimitUpdate,
+    ApiKeyRotate,
+    ApiKeyRotateResponse,
+    ApiKeyRotation,
     ApiKeysListResponse,
+    ApiKeySort,
+    ApiKeyUsageDay,
+    ApiKeyUsageResponse,
 )
 from app.utils import ERROR_RESPONSES
 
@@ -50,6 +66,18 @@ async def admin_login(
         )
 
 
+def encode_api_key_cursor(api_key: ApiKey, sort: ApiKeySort) -> str:
+    """Opaque cursor for the page after `api_key`: its sort value and id."""
+    value = getattr(api_key, sort.value)
+    payload = json.dumps([value.isoformat() if value is not None else None, api_key.id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_api_key_cursor(cursor: str) -> tuple[datetime | None, int]:
+    value, api_key_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return (datetime.fromisoformat(value) if value is not None else None), int(api_key_id)
+
+
 @router.get(
     "/api-keys",
     status_code=HTTP_200_OK,
@@ -61,16 +89,42 @@ async def list_api_keys(
     *,
     api_key_repo: ApiKeyRepository = Depends(get_repository(ApiKeyRepository)),
     include_inactive: bool = Query(False, description="Include inactive API keys"),
+    search: str | None = Query(None, min_length=1, max_length=100, description="Case-insensitive match anywhere in the name"),
+    sort: ApiKeySort = Query(ApiKeySort.created_at, description="Newest first by this timestamp; never-used keys sort last"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(None, description="`next_cursor` from the previous page"),
 ) -> ApiKeysListResponse:
     """
-    List all API keys (admin only).
+    List API keys one page at a time (admin only).
+
+    Follow `next_cursor` for the next page. `total` counts every key matching
+    the filters, not just this page.
     """
-    keys = await api_key_repo.get_all_api_keys(include_inactive=include_inactive)
-    
+    after = None
+    if cursor:
+        try:
+            after = decode_api_key_cursor(cursor)
+        except (ValueError, TypeError):
+            raise HTTPException(
+                status_code=HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor.",
+            )
+
+    keys = await api_key_repo.list_api_keys(
+        limit=limit + 1,
+        include_inactive=include_inactive,
+        search=search,
+        sort=sort.value,
+        after=after,
+    )
+    total = await api_key_repo.count_api_keys(include_inactive=include_inactive, search=search)
+
+    page = keys[:limit]
     return ApiKeysListResponse(
         message="API keys retrieved successfully",
-        data=[ApiKeyOut.model_validate(key) for key in keys],
-        total=len(keys),
+        data=[ApiKeyOut.model_validate(key) for key in page],
+        total=total,
+        next_cursor=encode_api_key_cursor(page[-1], sort) if len(keys) > limit else None,
     )
 
 
@@ -85,14 +139,29 @@ async def create_api_key(
     *,
     api_key_in: ApiKeyCreate,
     api_key_repo: ApiKeyRepository = Depends(get_repository(ApiKeyRepository)),
+    settings: AppSettings = Depends(get_app_settings),
 ) -> ApiKeyCreateResponse:
     """
     Create a new API key (admin only).
     
     Returns the API key value (shown only once).
     """
-    from datetime import datetime, timezone, timedelta
-    
+    from datetime import datetime, timedelta, timezone
+
+    if settings.api_key_signing_key is not None:
+        # Signed keys embed their id, which create_api_keys allocates
+        [(api_key, api_key_record)] = await api_key_repo.create_api_keys(
+            api_keys_in=[api_key_in],
+            signing_secret=settings.api_key_signing_key,
+        )
+        return ApiKeyCreateResponse(
+            id=api_key_record.id,
+            name=api_key_record.name,
+            api_key=api_key,
+            created_at=api_key_record.created_at,
+            expires_at=api_key_record.expires_at,
+        )
+
     # Generate API key
     api_key = ApiKey.generate_key()
     key_hash = security.hash_api_key(api_key)
@@ -107,6 +176,8 @@ async def create_api_key(
         key_hash=key_hash,
         name=api_key_in.name,
         expires_at=expires_at.isoformat() if expires_at else None,
+        rate_limit_per_minute=api_key_in.rate_limit_per_minute,
+        rate_limit_burst=api_key_in.rate_limit_burst,
     )
     
     return ApiKeyCreateResponse(
@@ -118,6 +189,120 @@ async def create_api_key(
     )
 
 
+@router.post(
+    "/api-keys/bulk",
+    status_code=HTTP_201_CREATED,
+    response_model=ApiKeyBulkCreateResponse,
+    responses=ERROR_RESPONSES,
+    name="admin:bulk-create-api-keys",
+)
+async def bulk_create_api_keys(
+    *,
+    api_keys_in: ApiKeyBulkCreate,
+    api_key_repo: ApiKeyRepository = Depends(get_repository(ApiKeyRepository)),
+    settings: AppSettings = Depends(get_app_settings),
+) -> ApiKeyBulkCreateResponse:
+    """
+    Create many API keys at once (admin only).
+
+    All keys are created in one transaction. Returns the API key values in
+    the order requested (shown only once).
+    """
+    created = await api_key_repo.create_api_keys(
+        api_keys_in=api_keys_in.keys,
+        signing_secret=settings.api_key_signing_key,
+    )
+
+    return ApiKeyBulkCreateResponse(
+        data=[
+            ApiKeyCreateResponse(
+                id=record.id,
+                name=record.name,
+                api_key=api_key,
+                created_at=record.created_at,
+                expires_at=record.expires_at,
+            )
+            for api_key, record in created
+        ],
+    )
+
+
+@router.post(
+    "/api-keys/rotate",
+    status_code=HTTP_200_OK,
+    response_model=ApiKeyRotateResponse,
+    responses=ERROR_RESPONSES,
+    name="admin:rotate-api-keys",
+)
+async def rotate_api_keys(
+    *,
+    rotate_in: ApiKeyRotate,
+    api_key_repo: ApiKeyRepository = Depends(get_repository(ApiKeyRepository)),
+    settings: AppSettings = Depends(get_app_settings),
+) -> ApiKeyRotateResponse:
+    """
+    Replace API keys with new ones (admin only).
+
+    Rotates the given active keys, or every active key when `ids` is omitted.
+    The old keys keep working for `overlap_hours` so clients can switch over,
+    then expire. Returns the new API key values (shown only once).
+    """
+    rotated = await api_key_repo.rotate_api_keys(
+        api_key_ids=rotate_in.ids,
+        overlap=timedelta(hours=rotate_in.overlap_hours),
+        signing_secret=settings.api_key_signing_key,
+    )
+    rotated_ids = {old_key.id for old_key, _, _ in rotated}
+
+    return ApiKeyRotateResponse(
+        data=[
+            ApiKeyRotation(
+                id=new_key.id,
+                name=new_key.name,
+                api_key=api_key,
+                created_at=new_key.created_at,
+                expires_at=new_key.expires_at,
+                replaces_id=old_key.id,
+                replaced_key_expires_at=old_key.expires_at,
+            )
+            for old_key, api_key, new_key in rotated
+        ],
+        missing_ids=[api_key_id for api_key_id in rotate_in.ids or [] if api_key_id not in rotated_ids],
+    )
+
+
+@router.get(
+    "/api-keys/{api_key_id}/usage",
+    status_code=HTTP_200_OK,
+    response_model=ApiKeyUsageResponse,
+    responses=ERROR_RESPONSES,
+    name="admin:api-key-usage",
+)
+async def get_api_key_usage(
+    *,
+    api_key_id: int,
+    api_key_repo: ApiKeyRepository = Depends(get_repository(ApiKeyRepository)),
+    usage_repo: ApiKeyUsageRepository = Depends(get_repository(ApiKeyUsageRepository)),
+    date_from: date | None = Query(None, description="First UTC day; defaults to 30 days ago"),
+    date_to: date | None = Query(None, description="Last UTC day, inclusive; defaults to today"),
+) -> ApiKeyUsageResponse:
+    """
+    Daily request counts, response bytes, errors and summed latency of an
+    API key (admin only).
+    """
+    if await api_key_repo.get_api_key_by_id(api_key_id=api_key_id) is None:
+        raise HTTPException(
+            status_code=404,
+            detail="API key not found",
+        )
+
+    date_to = date_to or datetime.now(UTC).date()
+    date_from = date_from or date_to - timedelta(days=30)
+    usage = await usage_repo.get_daily_usage(api_key_id=api_key_id, date_from=date_from, date_to=date_to)
+
+    return ApiKeyUsageResponse(data=[ApiKeyUsageDay.model_validate(day) for day in usage])
+
+
 @router.post(
     "/api-keys/{api_key_id}/deactivate",
     status_code=HTTP_200_OK,
@@ -133,16 +318,14 @@ async def deactivate_api_key(
     """
     Deactivate an API key by ID (admin only).
     """
-    api_key = await api_key_repo.get_api_key_by_id(api_key_id=api_key_id)
+    deactivated_key = await api_key_repo.deactivate_api_key(api_key_id=api_key_id)
     
-    if not api_key:
+    if not deactivated_key:
         raise HTTPException(
             status_code=404,
             detail="API key not found",
         )
     
-    deactivated_key = await api_key_repo.deactivate_api_key(api_key=api_key)
-    
     return ApiKeyOut.model_validate(deactivated_key)
 
 
@@ -161,15 +344,46 @@ async def activate_api_key(
     """
     Activate an API key by ID (admin only).
     """
-    api_key = await api_key_repo.get_api_key_by_id(api_key_id=api_key_id)
+    activated_key = await api_key_repo.activate_api_key(api_key_id=api_key_id)
     
-    if not api_key:
+    if not activated_key:
         raise HTTPException(
             status_code=404,
             detail="API key not found",
         )
     
-    activated_key = await api_key_repo.activate_api_key(api_key=api_key)
-    
     return ApiKeyOut.model_validate(activated_key)
 
+
+@router.patch(
+    "/api-keys/{api_key_id}/rate-limit",
+    status_code=HTTP_200_OK,
+    response_model=ApiKeyOut,
+    responses=ERROR_RESPONSES,
+    name="admin:update-api-key-rate-limit",
+)
+async def update_api_key_rate_limit(
+    *,
+    api_key_id: int,
+    rate_limit_in: ApiKeyRateLimitUpdate,
+    api_key_repo: ApiKeyRepository = Depends(get_repository(ApiKeyRepository)),
+) -> ApiKeyOut:
+    """
+    Set the rate limit of an API key by ID (admin only).
+
+    Send null values to fall back to the server defaults. The new limits apply
+    from the key's next request.
+    """
+    updated_key = await api_key_repo.update_rate_limit(
+        api_key_id=api_key_id,
+        rate_limit_per_minute=rate_limit_in.rate_limit_per_minute,
+        rate_limit_burst=rate_limit_in.rate_limit_burst,
+    )
+    
+    if not updated_key:
+        raise HTTPException(
+            status_code=404,
+            detail="API key not found",
+        )
+    
+    return ApiKeyOut.model_validate(updated_key)
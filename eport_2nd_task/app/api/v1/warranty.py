@@ -1,14 +1,34 @@
-from fastapi import APIRouter, Depends, Query
-from starlette.status import HTTP_200_OK, HTTP_201_CREATED
+from datetime import date
 
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_400_BAD_REQUEST
+
+from app.api.dependencies.api_key import get_rate_limited_api_key
 from app.api.dependencies.database import get_repository
+from app.api.dependencies.idempotency import get_idempotency_key, idempotency_scope
 from app.api.dependencies.service import get_service
+from app.core.change_feed import WarrantyChangeFilter
+from app.core.config import get_app_settings
+from app.core.settings.app import AppSettings
+from app.database.repositories.idempotency_key import IdempotencyKeyRepository
 from app.database.repositories.warranty import WarrantyRepository
+from app.models.api_key import ApiKey
 from app.schemas.warranty import (
+    WarrantyBatchRequest,
+    WarrantyBatchResponse,
+    WarrantyBulkUpdateRequest,
+    WarrantyBulkUpdateResponse,
+    WarrantyChangesResponse,
     WarrantyInCreate,
+    WarrantyInUpdate,
     WarrantyResponse,
+    WarrantyRollupResponse,
+    WarrantySummaryResponse,
     WarrantiesFilters,
+    WarrantyTotalMode,
 )
+from app.services.idempotency import IdempotencyService
 from app.services.warranty import WarrantyService
 from app.utils import ERROR_RESPONSES, handle_result
 
@@ -48,6 +68,13 @@ router = APIRouter()
     
     **Response:**
     Returns the created warranty record with all details including the assigned ID and timestamps.
+
+    **Retries:**
+    Send an `Idempotency-Key` header to make retries safe. A retry with the same key and
+    body returns the stored response (with `Idempotent-Replayed: true`) instead of creating
+    a second warranty. Reusing a key with a different body returns 422; a retry while the
+    first request is still running returns 409. Keys are scoped to the calling API key
+    (or, without one, to `user_id`), so different callers may pick the same key.
     """,
     tags=["Warranty Registration"],
 )
@@ -55,6 +82,12 @@ async def register_warranty(
     *,
     warranty_service: WarrantyService = Depends(get_service(WarrantyService)),
     warranty_repo: WarrantyRepository = Depends(get_repository(WarrantyRepository)),
+    idempotency_service: IdempotencyService = Depends(get_service(IdempotencyService)),
+    idempotency_repo: IdempotencyKeyRepository = Depends(get_repository(IdempotencyKeyRepository)),
+    idempotency_key: str | None = Depends(get_idempotency_key),
+    # Same dependency as the router's, so it is resolved (and rate limited) once
+    api_key: ApiKey | None = Depends(get_rate_limited_api_key(required=False)),
+    settings: AppSettings = Depends(get_app_settings),
     warranty_in: WarrantyInCreate,
 ) -> WarrantyResponse:
     """
@@ -63,10 +96,25 @@ async def register_warranty(
     This endpoint creates a new warranty registration record in the database.
     All required fields must be provided, and the device will be assigned a unique ID.
     """
-    result = await warranty_service.create_warranty(
-        warranty_repo=warranty_repo,
-        warranty_in=warranty_in,
-    )
+
+    async def create_warranty():
+        return await warranty_service.create_warranty(
+            warranty_repo=warranty_repo,
+            warranty_in=warranty_in,
+        )
+
+    if idempotency_key is None:
+        result = await create_warranty()
+    else:
+        result = await idempotency_service.run_once(
+            scope=idempotency_scope("warranty:register", api_key=api_key, user_id=warranty_in.user_id),
+            key=idempotency_key,
+            payload=warranty_in,
+            ttl_seconds=settings.idempotency_key_ttl_seconds,
+            idempotency_repo=idempotency_repo,
+            operation=create_warranty,
+            pending_lease_seconds=settings.idempotency_pending_lease_seconds,
+        )
 
     return await handle_result(result)
 
@@ -87,6 +135,14 @@ async def list_warranties(
     status: str | None = Query(None),
     department: str | None = Query(None),
     category: str | None = Query(None),
+    include_total: WarrantyTotalMode = Query(
+        WarrantyTotalMode.none,
+        description="Add a `total` of matching rows: `exact` counts them, `estimate` uses planner statistics.",
+    ),
+    fields: str | None = Query(
+        None,
+        description="Comma-separated columns to return, e.g. `asset_name,status,warranty_expiry_date`. `id` is always included.",
+    ),
 ) -> WarrantyResponse:
     """
     Get a list of warranties with optional filters.
@@ -98,6 +154,8 @@ async def list_warranties(
         status=status,
         department=department,
         category=category,
+        include_total=include_total,
+        fields=[field.strip() for field in fields.split(",") if field.strip()] if fields else None,
     )
     result = await warranty_service.get_warranties(
         warranties_filters=filters, warranty_repo=warranty_repo
@@ -105,3 +163,291 @@ async def list_warranties(
 
     return await handle_result(result)
 
+
+
+@router.get(
+    "/batch",
+    status_code=HTTP_200_OK,
+    response_model=WarrantyBatchResponse,
+    responses=ERROR_RESPONSES,
+    name="warranty:batch-get",
+)
+async def get_warranties_batch(
+    *,
+    warranty_service: WarrantyService = Depends(get_service(WarrantyService)),
+    warranty_repo: WarrantyRepository = Depends(get_repository(WarrantyRepository)),
+    ids: str = Query(..., description="Comma-separated warranty ids, e.g. `12,7,31` (at most 1000)."),
+) -> WarrantyBatchResponse:
+    """
+    Get many warranties by id in one request.
+
+    Found warranties come back in the requested order; ids with no live
+    warranty are listed in `missing_ids`. Use the POST variant for long lists.
+    """
+    try:
+        warranty_ids = [int(warranty_id) for warranty_id in ids.split(",") if warranty_id.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST,
+            detail="`ids` must be a comma-separated list of integers.",
+        )
+
+    result = await warranty_service.get_warranties_by_ids(
+        warranty_ids=warranty_ids,
+        warranty_repo=warranty_repo,
+    )
+
+    return await handle_result(result)
+
+
+@router.post(
+    "/batch",
+    status_code=HTTP_200_OK,
+    response_model=WarrantyBatchResponse,
+    responses=ERROR_RESPONSES,
+    name="warranty:batch-post",
+)
+async def post_warranties_batch(
+    *,
+    warranty_service: WarrantyService = Depends(get_service(WarrantyService)),
+    warranty_repo: WarrantyRepository = Depends(get_repository(WarrantyRepository)),
+    batch_in: WarrantyBatchRequest,
+) -> WarrantyBatchResponse:
+    """Same as `GET /batch`, with the ids in the body: `{"ids": [12, 7, 31]}`."""
+    result = await warranty_service.get_warranties_by_ids(
+        warranty_ids=batch_in.ids,
+        warranty_repo=warranty_repo,
+    )
+
+    return await handle_result(result)
+
+
+@router.post(
+    "/bulk-update",
+    status_code=HTTP_200_OK,
+    response_model=WarrantyBulkUpdateResponse,
+    responses=ERROR_RESPONSES,
+    name="warranty:bulk-update",
+)
+async def bulk_update_warranties(
+    *,
+    warranty_service: WarrantyService = Depends(get_service(WarrantyService)),
+    warranty_repo: WarrantyRepository = Depends(get_repository(WarrantyRepository)),
+    bulk_in: WarrantyBulkUpdateRequest,
+) -> WarrantyBulkUpdateResponse:
+    """
+    Apply one partial update to many warranties.
+
+    Select the warranties with either `ids` or `filters` (status, department,
+    category) and give the fields to change in `update`, e.g.
+    `{"filters": {"department": "Sales"}, "update": {"status": "Retired"}}`.
+
+    Each call changes at most `batch_size` warranties, ordered by id, in a
+    single UPDATE, and returns their ids. While `has_more` is true, call again
+    with `after_id` set to `next_after_id`. With `dry_run` nothing is changed
+    and `count` is the number of warranties that would be.
+    """
+    result = await warranty_service.bulk_update_warranties(
+        bulk_in=bulk_in,
+        warranty_repo=warranty_repo,
+    )
+
+    return await handle_result(result)
+
+
+@router.get(
+    "/changes",
+    status_code=HTTP_200_OK,
+    response_model=WarrantyChangesResponse,
+    responses=ERROR_RESPONSES,
+    name="warranty:changes",
+)
+async def list_warranty_changes(
+    *,
+    warranty_service: WarrantyService = Depends(get_service(WarrantyService)),
+    warranty_repo: WarrantyRepository = Depends(get_repository(WarrantyRepository)),
+    since: str | None = Query(
+        None,
+        description="`next_since` from the previous response; omit to start from the beginning.",
+    ),
+    limit: int = Query(500, ge=1, le=5000),
+) -> WarrantyChangesResponse:
+    """
+    Get warranties created, updated or soft-deleted since a watermark.
+
+    Rows come back in write order and may repeat if they changed again. Keep
+    calling with `next_since` while `has_more` is true, and store the last
+    `next_since` for the next sync.
+    """
+    result = await warranty_service.get_warranty_changes(
+        since=since,
+        limit=limit,
+        warranty_repo=warranty_repo,
+    )
+
+    return await handle_result(result)
+
+
+@router.get(
+    "/summary",
+    status_code=HTTP_200_OK,
+    response_model=WarrantySummaryResponse,
+    responses=ERROR_RESPONSES,
+    name="warranty:summary",
+)
+async def get_warranty_summary(
+    *,
+    warranty_service: WarrantyService = Depends(get_service(WarrantyService)),
+    warranty_repo: WarrantyRepository = Depends(get_repository(WarrantyRepository)),
+    department: str | None = Query(None),
+) -> WarrantySummaryResponse:
+    """
+    Get total asset cost, asset count and count still under warranty per
+    department, broken down by category.
+
+    Figures cover live (not deleted) warranties and are kept up to date on
+    every write, so this is cheap regardless of how many warranties exist.
+    """
+    result = await warranty_service.get_department_summaries(
+        department=department,
+        warranty_repo=warranty_repo,
+    )
+
+    return await handle_result(result)
+
+
+@router.get(
+    "/rollups",
+    status_code=HTTP_200_OK,
+    response_model=WarrantyRollupResponse,
+    responses=ERROR_RESPONSES,
+    name="warranty:rollups",
+)
+async def get_warranty_rollups(
+    *,
+    warranty_service: WarrantyService = Depends(get_service(WarrantyService)),
+    warranty_repo: WarrantyRepository = Depends(get_repository(WarrantyRepository)),
+    date_from: date = Query(..., description="First month of the series; any day in the month."),
+    date_to: date = Query(..., description="Last month of the series, inclusive; any day in the month."),
+    group_by: str | None = Query(
+        None,
+        description="Comma-separated breakdown, any of `department,category,status`; omit for one series.",
+    ),
+    status: str | None = Query(None),
+    department: str | None = Query(None),
+    category: str | None = Query(None),
+) -> WarrantyRollupResponse:
+    """
+    Get monthly counts of warranty registrations (by creation month) and
+    expiries (by warranty expiry month) for live warranties.
+
+    Counts come from a rollup table kept current on every write, so the cost
+    depends on the months and groups requested, not on the number of warranties.
+    Months with nothing registered or expiring are omitted.
+    """
+    result = await warranty_service.get_monthly_rollups(
+        date_from=date_from,
+        date_to=date_to,
+        group_by=[field.strip() for field in group_by.split(",") if field.strip()] if group_by else [],
+        warranty_repo=warranty_repo,
+        status=status,
+        department=department,
+        category=category,
+    )
+
+    return await handle_result(result)
+
+
+@router.get(
+    "/stream",
+    status_code=HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={HTTP_200_OK: {"content": {"text/event-stream": {}}}},
+    name="warranty:stream",
+)
+async def stream_warranty_changes(
+    *,
+    request: Request,
+    settings: AppSettings = Depends(get_app_settings),
+    status: str | None = Query(None),
+    department: str | None = Query(None),
+    category: str | None = Query(None),
+) -> StreamingResponse:
+    """
+    Stream warranty changes as Server-Sent Events.
+
+    Each event is `insert`, `update` or `delete` with `{id, op, updated_at,
+    status, department, category}`; filters match on the row after the change.
+    A `resync` event means changes may have been missed and the client should
+    refetch the list. Subscribe first, then fetch, so nothing falls in between.
+    """
+    feed = request.app.state.warranty_change_feed
+    filters = WarrantyChangeFilter(status=status, department=department, category=category)
+
+    return StreamingResponse(
+        feed.stream(filters, heartbeat_seconds=settings.warranty_stream_heartbeat_seconds),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/{warranty_id}",
+    status_code=HTTP_200_OK,
+    response_model=WarrantyResponse,
+    responses=ERROR_RESPONSES,
+    name="warranty:get-by-id",
+)
+async def get_warranty(
+    *,
+    warranty_service: WarrantyService = Depends(get_service(WarrantyService)),
+    warranty_repo: WarrantyRepository = Depends(get_repository(WarrantyRepository)),
+    warranty_id: int,
+) -> WarrantyResponse:
+    """
+    Get a single warranty by ID.
+    This endpoint is public and does not require API key authentication.
+    """
+    result = await warranty_service.get_warranty_by_id(
+        warranty_id=warranty_id,
+        warranty_repo=warranty_repo,
+    )
+
+    return await handle_result(result)
+
+
+@router.patch(
+    "/{warranty_id}",
+    status_code=HTTP_200_OK,
+    response_model=WarrantyResponse,
+    responses=ERROR_RESPONSES,
+    name="warranty:update",
+)
+async def update_warranty(
+    *,
+    warranty_service: WarrantyService = Depends(get_service(WarrantyService)),
+    warranty_repo: WarrantyRepository = Depends(get_repository(WarrantyRepository)),
+    warranty_id: int,
+    warranty_in: WarrantyInUpdate,
+    if_match: str | None = Header(
+        None,
+        alias="If-Match",
+        description="ETag from a previous GET; the update is applied only if the warranty has not changed since.",
+    ),
+) -> WarrantyResponse:
+    """
+    Update the given fields of a warranty.
+
+    Send the `ETag` from `GET /{warranty_id}` as `If-Match` to avoid
+    overwriting someone else's edit: if the warranty changed in between, the
+    update is not applied and 412 is returned with the current ETag. The
+    check and the write happen in a single statement, so no lock is held.
+    """
+    result = await warranty_service.update_warranty(
+        warranty_id=warranty_id,
+        warranty_in=warranty_in,
+        warranty_repo=warranty_repo,
+        if_match=if_match,
+    )
+
+    return await handle_result(result)
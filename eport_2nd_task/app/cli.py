@@ -2,12 +2,14 @@
 CLI commands for managing API keys.
 """
 import asyncio
+import json
 import sys
-from datetime import datetime, timedelta
-from typing import Optional
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any
 
 import click
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
 # Note: UsersRepository expects AsyncSession, not AsyncConnection
@@ -15,22 +17,32 @@ from sqlalchemy.orm import sessionmaker
 from app.core.config import get_app_settings
 from app.core import security
 from app.database.repositories.api_key import ApiKeyRepository
+from app.database.repositories.api_key_usage import ApiKeyUsageRepository
+from app.database.repositories.idempotency_key import IdempotencyKeyRepository
 from app.database.repositories.users import UsersRepository
+from app.database.repositories.warranty import WarrantyRepository
 from app.models.api_key import ApiKey
+from app.schemas.api_key import ApiKeyCreate
 from app.schemas.user import UserInCreate
 
 settings = get_app_settings()
 
 
-def get_db_session_factory():
-    """Create a database session factory for CLI commands."""
-    engine = create_async_engine(
+def get_db_engine(pool_size: int = 5) -> AsyncEngine:
+    """Create a database engine for CLI commands."""
+    return create_async_engine(
         url=str(settings.db_url),
-        pool_size=5,
+        pool_size=pool_size,
         max_overflow=0,
         echo=False,
         future=True,
     )
+
+
+def get_db_session_factory(engine: AsyncEngine | None = None):
+    """Create a database session factory for CLI commands."""
+    if engine is None:
+        engine = get_db_engine()
     async_session_factory = sessionmaker(
         bind=engine,
         class_=AsyncSession,
@@ -40,12 +52,37 @@ def get_db_session_factory():
     return async_session_factory
 
 
-async def _create_api_key(name: str, expires_days: Optional[int] = None) -> tuple[str, ApiKey]:
+def _run_with_engine(func: Callable[..., Awaitable[Any]], *args, pool_size: int = 1, **kwargs) -> Any:
+    """
+    Run a CLI coroutine against a single engine and dispose it afterwards.
+
+    The coroutine receives the session factory as its first argument.
+    """
+
+    async def runner():
+        engine = get_db_engine(pool_size=pool_size)
+        try:
+            return await func(get_db_session_factory(engine), *args, **kwargs)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(runner())
+
+
+async def _create_api_key(session_factory, name: str, expires_days: int | None = None) -> tuple[str, ApiKey]:
     """Internal function to create an API key."""
-    session_factory = get_db_session_factory()
     async with session_factory() as db:
         repo = ApiKeyRepository(db)
-        
+
+        signing_key = get_app_settings().api_key_signing_key
+        if signing_key is not None:
+            # Signed keys embed their id, which create_api_keys allocates
+            [(api_key, api_key_record)] = await repo.create_api_keys(
+                api_keys_in=[ApiKeyCreate(name=name, expires_days=expires_days)],
+                signing_secret=signing_key,
+            )
+            return api_key, api_key_record
+
         # Generate a new API key
         api_key = ApiKey.generate_key()
         key_hash = security.hash_api_key(api_key)
@@ -66,32 +103,60 @@ async def _create_api_key(name: str, expires_days: Optional[int] = None) -> tupl
         return api_key, api_key_record
 
 
-async def _deactivate_api_key(api_key_id: int) -> bool:
+async def _create_api_keys(session_factory, names: list[str], expires_days: int | None = None) -> list[tuple[str, ApiKey]]:
+    """Internal function to create many API keys in one transaction."""
+    async with session_factory() as db:
+        repo = ApiKeyRepository(db)
+        return await repo.create_api_keys(
+            api_keys_in=[ApiKeyCreate(name=name, expires_days=expires_days) for name in names],
+            signing_secret=get_app_settings().api_key_signing_key,
+        )
+
+
+async def _rotate_api_keys(session_factory, api_key_ids: list[int] | None, overlap_hours: int) -> list[tuple[ApiKey, str, ApiKey]]:
+    """Internal function to replace API keys, keeping the old ones valid for an overlap window."""
+    async with session_factory() as db:
+        repo = ApiKeyRepository(db)
+        return await repo.rotate_api_keys(
+            api_key_ids=api_key_ids,
+            overlap=timedelta(hours=overlap_hours),
+            signing_secret=get_app_settings().api_key_signing_key,
+        )
+
+
+async def _deactivate_api_key(session_factory, api_key_id: int) -> bool:
     """Internal function to deactivate an API key."""
-    session_factory = get_db_session_factory()
     async with session_factory() as db:
         repo = ApiKeyRepository(db)
         
-        api_key = await repo.get_api_key_by_id(api_key_id=api_key_id)
-        if not api_key:
-            return False
-        
-        await repo.deactivate_api_key(api_key=api_key)
-        return True
+        return await repo.deactivate_api_key(api_key_id=api_key_id) is not None
 
 
-async def _list_api_keys(include_inactive: bool = False) -> list[ApiKey]:
+async def _list_api_keys(session_factory, include_inactive: bool = False) -> list[ApiKey]:
     """Internal function to list API keys."""
-    session_factory = get_db_session_factory()
     async with session_factory() as db:
         repo = ApiKeyRepository(db)
-        keys = await repo.get_all_api_keys(include_inactive=include_inactive)
-        return keys
+        keys: list[ApiKey] = []
+        after = None
+        while True:
+            page = await repo.list_api_keys(limit=500, include_inactive=include_inactive, after=after)
+            keys.extend(page)
+            if len(page) < 500:
+                return keys
+            after = (page[-1].created_at, page[-1].id)
+
+
+async def _list_api_keys_with_usage(session_factory, include_inactive: bool, usage_days: int) -> tuple[list[ApiKey], dict]:
+    """Internal function to list API keys with their usage totals over the last `usage_days` days."""
+    keys = await _list_api_keys(session_factory, include_inactive=include_inactive)
+    since = datetime.now(timezone.utc).date() - timedelta(days=usage_days)
+    async with session_factory() as db:
+        totals = await ApiKeyUsageRepository(db).get_usage_totals(api_key_ids=[key.id for key in keys], since=since)
+    return keys, totals
 
 
-async def _create_user(username: str, email: str, password: str) -> dict:
+async def _create_user(session_factory, username: str, email: str, password: str) -> dict:
     """Internal function to create a user."""
-    session_factory = get_db_session_factory()
     async with session_factory() as db:
         repo = UsersRepository(db)
         
@@ -117,6 +182,119 @@ async def _create_user(username: str, email: str, password: str) -> dict:
         return {"error": None, "user": created_user}
 
 
+async def _purge_idempotency_keys(session_factory) -> int:
+    """Internal function to delete expired idempotency keys."""
+    async with session_factory() as db:
+        repo = IdempotencyKeyRepository(db)
+        return await repo.delete_expired_keys()
+
+
+async def _archive_warranties(session_factory, older_than_days: int, batch_size: int) -> int:
+    """Internal function to move old soft-deleted warranties to the archive partition."""
+    async with session_factory() as db:
+        repo = WarrantyRepository(db)
+        return await repo.archive_deleted_warranties(older_than_days=older_than_days, batch_size=batch_size)
+
+
+async def _batch_generate(session_factory, op: dict) -> dict:
+    api_key, api_key_record = await _create_api_key(session_factory, op["name"], op.get("expires_days"))
+    return {
+        "id": api_key_record.id,
+        "name": api_key_record.name,
+        "api_key": api_key,
+        "expires_at": api_key_record.expires_at,
+    }
+
+
+async def _batch_deactivate(session_factory, op: dict) -> dict:
+    api_key_id = int(op["id"])
+    if not await _deactivate_api_key(session_factory, api_key_id):
+        raise LookupError(f"API key {api_key_id} not found")
+    return {"id": api_key_id}
+
+
+async def _batch_list_keys(session_factory, op: dict) -> dict:
+    keys = await _list_api_keys(session_factory, include_inactive=bool(op.get("include_inactive", False)))
+    return {"keys": [{"id": key.id, "name": key.name, "is_active": key.is_active} for key in keys]}
+
+
+async def _batch_create_user(session_factory, op: dict) -> dict:
+    result = await _create_user(session_factory, op["username"], op["email"], op["password"])
+    if result["error"]:
+        raise ValueError(result["error"])
+    user = result["user"]
+    return {"id": user.id, "username": user.username, "email": user.email}
+
+
+BATCH_OPERATIONS: dict[str, Callable[..., Awaitable[dict]]] = {
+    "generate": _batch_generate,
+    "deactivate": _batch_deactivate,
+    "list-keys": _batch_list_keys,
+    "create-user": _batch_create_user,
+}
+
+
+async def _run_batch_operation(session_factory, semaphore: asyncio.Semaphore, line_no: int, line: str) -> dict:
+    """Parse and execute a single batch line, returning a JSON-serialisable result."""
+    try:
+        op = json.loads(line)
+        handler = BATCH_OPERATIONS[op["op"]]
+    except (json.JSONDecodeError, KeyError, TypeError):
+        return {"line": line_no, "ok": False, "error": f"Invalid operation: {line}"}
+
+    async with semaphore:
+        try:
+            result = await handler(session_factory, op)
+        except Exception as e:
+            return {"line": line_no, "op": op["op"], "ok": False, "error": str(e)}
+
+    return {"line": line_no, "op": op["op"], "ok": True, **result}
+
+
+async def _run_batch(session_factory, stream, concurrency: int, emit: Callable[[dict], None]) -> int:
+    """
+    Read operations from a line-oriented stream and run them over one engine.
+
+    Lines are read as they arrive, so an interactive stdin behaves like a REPL.
+    At most `concurrency` operations hold a connection at any time. Returns the
+    number of failed operations.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    pending: set[asyncio.Task] = set()
+    failures = 0
+
+    def _on_done(task: asyncio.Task) -> None:
+        nonlocal failures
+        pending.discard(task)
+        result = task.result()
+        if not result["ok"]:
+            failures += 1
+        emit(result)
+
+    line_no = 0
+    while True:
+        line = await asyncio.to_thread(stream.readline)
+        if not line:
+            break
+        line_no += 1
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        task = asyncio.create_task(_run_batch_operation(session_factory, semaphore, line_no, line))
+        pending.add(task)
+        task.add_done_callback(_on_done)
+
+        # Stop reading ahead once enough work is queued behind the semaphore
+        while len(pending) >= concurrency * 2:
+            await asyncio.wait(set(pending), return_when=asyncio.FIRST_COMPLETED)
+
+    if pending:
+        await asyncio.wait(set(pending))
+
+    return failures
+
+
 @click.group()
 def cli():
     """Warranty Register Management CLI."""
@@ -126,10 +304,10 @@ def cli():
 @cli.command()
 @click.option("--name", required=True, help="Name/description for the API key")
 @click.option("--expires-days", type=int, help="Number of days until the key expires (optional)")
-def generate(name: str, expires_days: Optional[int]):
+def generate(name: str, expires_days: int | None):
     """Generate a new API key."""
     try:
-        api_key, api_key_record = asyncio.run(_create_api_key(name, expires_days))
+        api_key, api_key_record = _run_with_engine(_create_api_key, name, expires_days)
         
         click.echo("\n" + "=" * 60)
         click.echo("API Key Generated Successfully!")
@@ -153,12 +331,88 @@ def generate(name: str, expires_days: Optional[int]):
         sys.exit(1)
 
 
+@cli.command()
+@click.option("--name", "names", multiple=True, help="Name for one new key; repeat for each key")
+@click.option("--names-file", type=click.File("r"), help="File with one key name per line")
+@click.option("--expires-days", type=int, help="Number of days until the keys expire (optional)")
+def generate_bulk(names: tuple[str, ...], names_file, expires_days: int | None):
+    """
+    Generate many API keys in one transaction.
+
+    Writes one JSON object per key (id, name, api_key, expires_at) to stdout.
+    The keys are not shown again.
+    """
+    all_names = list(names)
+    if names_file is not None:
+        all_names.extend(line.strip() for line in names_file if line.strip())
+    if not all_names:
+        click.echo("Give at least one --name or a --names-file.", err=True)
+        sys.exit(1)
+
+    try:
+        created = _run_with_engine(_create_api_keys, all_names, expires_days)
+    except Exception as e:
+        click.echo(f"Error generating API keys: {str(e)}", err=True)
+        sys.exit(1)
+
+    for api_key, record in created:
+        click.echo(
+            json.dumps(
+                {"id": record.id, "name": record.name, "api_key": api_key, "expires_at": record.expires_at},
+                default=str,
+            )
+        )
+    click.echo(f"✓ Generated {len(created)} API key(s).", err=True)
+
+
+@cli.command()
+@click.option("--id", "api_key_ids", type=int, multiple=True, help="ID of a key to rotate; repeat for each key")
+@click.option("--all", "rotate_all", is_flag=True, help="Rotate every active key")
+@click.option("--overlap-hours", type=click.IntRange(min=0), default=24, show_default=True, help="Hours the old keys keep working")
+def rotate(api_key_ids: tuple[int, ...], rotate_all: bool, overlap_hours: int):
+    """
+    Replace API keys with new ones.
+
+    The old keys keep verifying for --overlap-hours, then expire. Writes one
+    JSON object per new key (id, replaces_id, name, api_key) to stdout.
+    """
+    if bool(api_key_ids) == rotate_all:
+        click.echo("Give either --id (one or more) or --all.", err=True)
+        sys.exit(1)
+
+    try:
+        rotated = _run_with_engine(_rotate_api_keys, None if rotate_all else list(api_key_ids), overlap_hours)
+    except Exception as e:
+        click.echo(f"Error rotating API keys: {str(e)}", err=True)
+        sys.exit(1)
+
+    for old_key, api_key, new_key in rotated:
+        click.echo(
+            json.dumps(
+                {
+                    "id": new_key.id,
+                    "replaces_id": old_key.id,
+                    "name": new_key.name,
+                    "api_key": api_key,
+                    "replaced_key_expires_at": old_key.expires_at,
+                },
+                default=str,
+            )
+        )
+    click.echo(f"✓ Rotated {len(rotated)} API key(s); old keys stop working in {overlap_hours} hour(s).", err=True)
+
+    missing = sorted(set(api_key_ids) - {old_key.id for old_key, _, _ in rotated})
+    if missing:
+        click.echo(f"✗ Not active or not found: {', '.join(map(str, missing))}", err=True)
+        sys.exit(1)
+
+
 @cli.command()
 @click.option("--id", "api_key_id", type=int, required=True, help="ID of the API key to deactivate")
 def deactivate(api_key_id: int):
     """Deactivate an API key by ID."""
     try:
-        success = asyncio.run(_deactivate_api_key(api_key_id))
+        success = _run_with_engine(_deactivate_api_key, api_key_id)
         
         if success:
             click.echo(f"✓ API key {api_key_id} has been deactivated successfully.")
@@ -173,10 +427,11 @@ def deactivate(api_key_id: int):
 
 @cli.command()
 @click.option("--include-inactive", is_flag=True, help="Include inactive API keys in the list")
-def list_keys(include_inactive: bool):
+@click.option("--usage-days", type=click.IntRange(min=1), default=30, show_default=True, help="Days of usage to total per key")
+def list_keys(include_inactive: bool, usage_days: int):
     """List all API keys."""
     try:
-        keys = asyncio.run(_list_api_keys(include_inactive=include_inactive))
+        keys, usage = _run_with_engine(_list_api_keys_with_usage, include_inactive, usage_days)
         
         if not keys:
             click.echo("No API keys found.")
@@ -196,6 +451,14 @@ def list_keys(include_inactive: bool):
                 click.echo(f"Last Used: {key.last_used_at}")
             if key.expires_at:
                 click.echo(f"Expires: {key.expires_at}")
+            totals = usage.get(key.id)
+            if totals:
+                click.echo(
+                    f"Usage ({usage_days}d): {totals.requests} request(s), {totals.errors} error(s), "
+                    f"{totals.bytes_out} byte(s) out, {totals.latency_ms_sum / totals.requests:.1f} ms avg"
+                )
+            else:
+                click.echo(f"Usage ({usage_days}d): none")
             click.echo("-" * 80)
         
         click.echo(f"\nTotal: {len(keys)} key(s)\n")
@@ -212,7 +475,7 @@ def list_keys(include_inactive: bool):
 def create_user(username: str, email: str, password: str):
     """Create a new user account for Warranty Centre login."""
     try:
-        result = asyncio.run(_create_user(username, email, password))
+        result = _run_with_engine(_create_user, username, email, password)
         
         if result["error"]:
             click.echo(f"✗ Error: {result['error']}", err=True)
@@ -242,6 +505,63 @@ def create_user(username: str, email: str, password: str):
         sys.exit(1)
 
 
+@cli.command()
+def purge_idempotency_keys():
+    """Delete expired idempotency keys."""
+    try:
+        deleted = _run_with_engine(_purge_idempotency_keys)
+        click.echo(f"✓ Deleted {deleted} expired idempotency key(s).")
+
+    except Exception as e:
+        click.echo(f"Error purging idempotency keys: {str(e)}", err=True)
+        sys.exit(1)
+
+
+@cli.command()
+@click.option("--older-than-days", type=click.IntRange(min=0), default=settings.warranty_archive_after_days, show_default=True, help="Archive warranties soft-deleted at least this many days ago")
+@click.option("--batch-size", type=click.IntRange(min=1), default=settings.warranty_archive_batch_size, show_default=True, help="Rows moved per transaction")
+def archive_warranties(older_than_days: int, batch_size: int):
+    """Move old soft-deleted warranties into the archive partition."""
+    try:
+        archived = _run_with_engine(_archive_warranties, older_than_days, batch_size)
+        click.echo(f"✓ Archived {archived} warranty(ies) soft-deleted more than {older_than_days} day(s) ago.")
+
+    except Exception as e:
+        click.echo(f"Error archiving warranties: {str(e)}", err=True)
+        sys.exit(1)
+
+
+@cli.command()
+@click.option("--file", "input_file", type=click.File("r"), default="-", help="File with one JSON operation per line (default: stdin)")
+@click.option("--concurrency", type=click.IntRange(min=1), default=4, show_default=True, help="Maximum number of operations running at once")
+def batch(input_file, concurrency: int):
+    """
+    Run many operations over one shared database engine.
+
+    Each input line is a JSON object with an "op" key (generate, deactivate,
+    list-keys or create-user) and the same arguments as the single command:
+
+    \b
+      {"op": "generate", "name": "partner-a", "expires_days": 90}
+      {"op": "deactivate", "id": 12}
+
+    One JSON result is written to stdout per operation as it completes.
+    """
+
+    def emit(result: dict) -> None:
+        click.echo(json.dumps(result, default=str))
+
+    try:
+        failures = _run_with_engine(_run_batch, input_file, concurrency, emit, pool_size=concurrency)
+    except Exception as e:
+        click.echo(f"Error running batch: {str(e)}", err=True)
+        sys.exit(1)
+
+    if failures:
+        click.echo(f"{failures} operation(s) failed.", err=True)
+        sys.exit(1)
+
+
 if __name__ == "__main__":
     cli()
 
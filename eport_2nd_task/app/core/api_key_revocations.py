@@ -0,0 +1,62 @@
+import asyncio
+import logging
+import time
+from functools import lru_cache
+
+from app.database.repositories.api_key import ApiKeyRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ApiKeyRevocations:
+    """
+    The worker's copy of which API key ids no longer verify, for signed keys.
+
+    Revoked ids are a bitmap indexed by key id, so a lookup is a byte read.
+    Ids past the end of the bitmap belong to keys created since the last
+    refresh and are live. Custom rate limits ride along, since signed keys
+    never load their row.
+    """
+
+    def __init__(self) -> None:
+        self._revoked = bytearray()
+        self._limits: dict[int, tuple[int | None, int | None]] = {}
+        self.refreshed_at: float | None = None
+
+    def is_revoked(self, api_key_id: int) -> bool:
+        byte = api_key_id >> 3
+        return byte < len(self._revoked) and bool(self._revoked[byte] & (1 << (api_key_id & 7)))
+
+    def rate_limits(self, api_key_id: int) -> tuple[int | None, int | None]:
+        return self._limits.get(api_key_id, (None, None))
+
+    def fresh(self, max_staleness_seconds: float) -> bool:
+        return self.refreshed_at is not None and time.monotonic() - self.refreshed_at <= max_staleness_seconds
+
+    def load(self, revoked_ids: list[int], limits: dict[int, tuple[int | None, int | None]]) -> None:
+        bitmap = bytearray((max(revoked_ids) >> 3) + 1 if revoked_ids else 0)
+        for api_key_id in revoked_ids:
+            bitmap[api_key_id >> 3] |= 1 << (api_key_id & 7)
+        # Swapped in whole so readers never see a half-built list
+        self._revoked, self._limits = bitmap, limits
+        self.refreshed_at = time.monotonic()
+
+    async def refresh(self, session_factory) -> int:
+        """Reload from the database; returns the number of revoked ids."""
+        async with session_factory() as session:
+            revoked_ids, limits = await ApiKeyRepository(session).get_revocation_snapshot()
+        self.load(revoked_ids, limits)
+        return len(revoked_ids)
+
+    async def run(self, session_factory, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.refresh(session_factory)
+            except Exception:
+                logger.exception("Failed to refresh API key revocations.")
+
+
+@lru_cache
+def get_api_key_revocations() -> ApiKeyRevocations:
+    return ApiKeyRevocations()
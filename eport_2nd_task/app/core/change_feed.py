@@ -0,0 +1,153 @@
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Channel the notify_warranty_change trigger publishes to
+WARRANTY_CHANGES_CHANNEL = "warranty_changes"
+
+# Sent to every subscriber when events may have been missed (listener
+# reconnected or the subscriber fell behind); clients should refetch.
+RESYNC_EVENT = {"op": "resync"}
+
+
+@dataclass(frozen=True)
+class WarrantyChangeFilter:
+    status: str | None = None
+    department: str | None = None
+    category: str | None = None
+
+    def matches(self, event: dict[str, Any]) -> bool:
+        return (
+            (self.status is None or event.get("status") == self.status)
+            and (self.department is None or event.get("department") == self.department)
+            and (self.category is None or event.get("category") == self.category)
+        )
+
+
+@dataclass(eq=False)
+class Subscription:
+    filters: WarrantyChangeFilter
+    queue: asyncio.Queue = field(default_factory=asyncio.Queue)
+    # Set when the queue overflowed; the stream ends after a resync event
+    overflowed: bool = False
+
+
+class WarrantyChangeFeed:
+    """
+    Fans warranty change notifications out to in-process subscribers.
+
+    Each worker holds a single LISTEN connection, opened when the first
+    subscriber arrives and reopened with backoff if it drops. A subscriber
+    that falls more than `queue_size` events behind is disconnected rather
+    than buffered without bound.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        *,
+        queue_size: int = 100,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+    ) -> None:
+        # asyncpg takes a plain postgresql:// DSN
+        self.dsn = dsn.replace("postgresql+asyncpg://", "postgresql://", 1)
+        self.queue_size = queue_size
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.connected = False
+        self._subscriptions: set[Subscription] = set()
+        self._task: asyncio.Task | None = None
+
+    def subscribe(self, filters: WarrantyChangeFilter) -> Subscription:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+        subscription = Subscription(filters, asyncio.Queue(maxsize=self.queue_size))
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    def dispatch(self, event: dict[str, Any]) -> None:
+        for subscription in list(self._subscriptions):
+            if event is not RESYNC_EVENT and not subscription.filters.matches(event):
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                subscription.overflowed = True
+                self.unsubscribe(subscription)
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed warranty change payload: %r", payload)
+            return
+        self.dispatch(event)
+
+    async def _listen(self) -> None:
+        import asyncpg
+
+        delay = self.reconnect_delay
+        while True:
+            try:
+                connection = await asyncpg.connect(self.dsn)
+            except Exception as e:
+                logger.warning("Warranty change feed could not connect, retrying in %ss: %r", delay, e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+                continue
+
+            delay = self.reconnect_delay
+            terminated = asyncio.Event()
+            connection.add_termination_listener(lambda _: terminated.set())
+            try:
+                await connection.add_listener(WARRANTY_CHANGES_CHANNEL, self._on_notify)
+                self.connected = True
+                await terminated.wait()
+                logger.warning("Warranty change feed connection lost, reconnecting.")
+            finally:
+                self.connected = False
+                if not connection.is_closed():
+                    await connection.close()
+            # Anything published while disconnected was missed
+            self.dispatch(RESYNC_EVENT)
+
+    async def stream(self, filters: WarrantyChangeFilter, heartbeat_seconds: float = 15.0) -> AsyncIterator[str]:
+        """Server-Sent Events for changes matching `filters`, with keep-alive comments."""
+        subscription = self.subscribe(filters)
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), heartbeat_seconds)
+                except TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _format_sse(event)
+                if subscription.overflowed and subscription.queue.empty():
+                    yield _format_sse(RESYNC_EVENT)
+                    return
+        finally:
+            self.unsubscribe(subscription)
+
+    async def close(self) -> None:
+        self._subscriptions.clear()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def _format_sse(event: dict[str, Any]) -> str:
+    return f"event: {event['op']}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
@@ -1,20 +1,124 @@
+import asyncio
+import logging
 from collections.abc import Callable
 
 from fastapi import FastAPI
 
+from app.core.api_key_revocations import get_api_key_revocations
+from app.core.change_feed import WarrantyChangeFeed
+from app.core.health import DatabaseHealthProbe
 from app.core.settings.app import AppSettings
 from app.database.events import close_db_connection, connect_to_db
+from app.database.repositories.idempotency_key import IdempotencyKeyRepository
+from app.database.repositories.warranty import WarrantyRepository
+from app.database.warmup import warm_up_pool
+
+logger = logging.getLogger(__name__)
+
+
+async def _purge_expired_idempotency_keys(app: FastAPI, interval_seconds: int) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            async with app.state.pool() as session:
+                deleted = await IdempotencyKeyRepository(session).delete_expired_keys()
+            if deleted:
+                logger.info("Purged %s expired idempotency keys.", deleted)
+        except Exception:
+            logger.exception("Failed to purge expired idempotency keys.")
+
+
+async def _archive_deleted_warranties(app: FastAPI, settings: AppSettings) -> None:
+    while True:
+        await asyncio.sleep(settings.warranty_archive_interval_seconds)
+        try:
+            async with app.state.pool() as session:
+                archived = await WarrantyRepository(session).archive_deleted_warranties(
+                    older_than_days=settings.warranty_archive_after_days,
+                    batch_size=settings.warranty_archive_batch_size,
+                )
+            if archived:
+                logger.info("Archived %s soft-deleted warranties.", archived)
+        except Exception:
+            logger.exception("Failed to archive soft-deleted warranties.")
+
+
+async def _retry_warm_up(app: FastAPI, settings: AppSettings) -> None:
+    while True:
+        await asyncio.sleep(settings.db_warmup_retry_seconds)
+        if await warm_up_pool(app.state.pool, settings.db_pool_size, settings.db_warmup_timeout_seconds):
+            app.state.warmed = True
+            return
 
 
 def create_start_app_handler(app: FastAPI, settings: AppSettings) -> Callable:
     async def start_app() -> None:
+        app.state.warmed = False
         await connect_to_db(app, settings)
+        warmed = True
+        if settings.db_warmup_enabled:
+            warmed = await warm_up_pool(app.state.pool, settings.db_pool_size, settings.db_warmup_timeout_seconds)
+
+        app.state.db_health = DatabaseHealthProbe(
+            app.state.engine,
+            interval_seconds=settings.health_probe_interval_seconds,
+            timeout_seconds=settings.health_probe_timeout_seconds,
+        )
+        # The first check opens a pool connection before readiness can flip
+        await app.state.db_health.check()
+
+        app.state.background_tasks = [
+            asyncio.create_task(app.state.db_health.run()),
+            asyncio.create_task(
+                _purge_expired_idempotency_keys(app, settings.idempotency_cleanup_interval_seconds)
+            ),
+        ]
+        app.state.warranty_change_feed = WarrantyChangeFeed(
+            str(settings.db_url), queue_size=settings.warranty_stream_queue_size
+        )
+        if settings.warranty_archive_enabled:
+            app.state.background_tasks.append(asyncio.create_task(_archive_deleted_warranties(app, settings)))
+        usage = getattr(app.state, "api_key_usage", None)
+        if usage is not None:
+            app.state.background_tasks.append(
+                asyncio.create_task(usage.run(app.state.pool, settings.api_key_usage_flush_interval_seconds))
+            )
+        if settings.api_key_signing_key is not None:
+            revocations = get_api_key_revocations()
+            try:
+                await revocations.refresh(app.state.pool)
+            except Exception:
+                # Signed keys fall back to the database lookup until a refresh succeeds
+                logger.exception("Failed to load API key revocations.")
+            app.state.background_tasks.append(
+                asyncio.create_task(revocations.run(app.state.pool, settings.api_key_revocation_refresh_seconds))
+            )
+        if warmed:
+            app.state.warmed = True
+        else:
+            # Stay unready until a retry succeeds
+            app.state.background_tasks.append(asyncio.create_task(_retry_warm_up(app, settings)))
 
     return start_app
 
 
 def create_stop_app_handler(app):
     async def stop_app():
+        for task in getattr(app.state, "background_tasks", []):
+            task.cancel()
+        change_feed = getattr(app.state, "warranty_change_feed", None)
+        if change_feed is not None:
+            await change_feed.close()
+        usage = getattr(app.state, "api_key_usage", None)
+        if usage is not None and hasattr(app.state, "pool"):
+            # Last chance to write what this worker counted since the last flush
+            try:
+                await usage.flush(app.state.pool)
+            except Exception:
+                logger.exception("Failed to flush API key usage on shutdown.")
         await close_db_connection(app)
+        writer = getattr(app.state, "access_log_writer", None)
+        if writer is not None:
+            writer.close()
 
     return stop_app
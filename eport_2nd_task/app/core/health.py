@@ -0,0 +1,73 @@
+import asyncio
+import logging
+import time
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseHealthProbe:
+    """
+    Checks the database from a background task and caches the result.
+
+    Readiness probes read `snapshot()` instead of querying the database, so
+    probe traffic never competes with real requests for pool connections.
+    A result older than `max_age_seconds` counts as unhealthy.
+    """
+
+    def __init__(self, engine: AsyncEngine, interval_seconds: float = 5.0, timeout_seconds: float = 2.0) -> None:
+        self.engine = engine
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.max_age_seconds = interval_seconds * 3
+        self.ok = False
+        self.error: str | None = None
+        self.latency_ms: float | None = None
+        self.checked_at: float | None = None
+
+    async def check(self) -> bool:
+        started = time.monotonic()
+        try:
+            async with asyncio.timeout(self.timeout_seconds):
+                async with self.engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+        except Exception as e:
+            if self.ok:
+                logger.warning("Database health check failed: %r", e)
+            self.ok = False
+            self.error = repr(e)
+        else:
+            self.ok = True
+            self.error = None
+        self.latency_ms = round((time.monotonic() - started) * 1000, 2)
+        self.checked_at = time.monotonic()
+        return self.ok
+
+    async def run(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.interval_seconds)
+
+    @property
+    def healthy(self) -> bool:
+        if self.checked_at is None:
+            return False
+        return self.ok and time.monotonic() - self.checked_at <= self.max_age_seconds
+
+    def snapshot(self) -> dict[str, Any]:
+        pool = self.engine.pool
+        return {
+            "ok": self.healthy,
+            "error": self.error,
+            "latency_ms": self.latency_ms,
+            "age_seconds": round(time.monotonic() - self.checked_at, 2) if self.checked_at is not None else None,
+            "pool": {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+            },
+        }
@@ -0,0 +1,128 @@
+import logging
+import math
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+
+from app.core.config import get_app_settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    limit: int
+    remaining: int
+    # Seconds until enough tokens are available again; 0 when allowed
+    retry_after: float
+
+
+class InMemoryRateLimitBackend:
+    """
+    Token buckets kept in the worker's memory.
+
+    Each worker limits independently, so with N workers a key can reach
+    N times its limit. Use the Redis backend when that matters.
+    """
+
+    def __init__(self, max_buckets: int = 100_000) -> None:
+        self.max_buckets = max_buckets
+        # bucket key -> (tokens, monotonic timestamp of last refill)
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    async def acquire(self, key: str, *, rate: float, capacity: int, cost: int = 1) -> tuple[bool, float]:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (float(capacity), now))
+        tokens = min(float(capacity), tokens + (now - updated_at) * rate)
+
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+
+        if key not in self._buckets and len(self._buckets) >= self.max_buckets:
+            self._evict_full_buckets(now, rate, capacity)
+        self._buckets[key] = (tokens, now)
+        return allowed, tokens
+
+    def _evict_full_buckets(self, now: float, rate: float, capacity: int) -> None:
+        # A bucket that has refilled to capacity carries no state worth keeping
+        idle = [key for key, (tokens, updated_at) in self._buckets.items() if tokens + (now - updated_at) * rate >= capacity]
+        for key in idle or list(self._buckets)[: len(self._buckets) // 10 or 1]:
+            del self._buckets[key]
+
+
+_REDIS_TOKEN_BUCKET = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisRateLimitBackend:
+    """
+    Token buckets shared by all workers, updated atomically by a Lua script.
+
+    Requires the optional `redis` package.
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit:") -> None:
+        try:
+            from redis.asyncio import Redis
+        except ImportError as e:
+            raise RuntimeError("The redis rate limit backend requires the 'redis' package.") from e
+
+        self.prefix = prefix
+        self._redis = Redis.from_url(url)
+        self._script = self._redis.register_script(_REDIS_TOKEN_BUCKET)
+
+    async def acquire(self, key: str, *, rate: float, capacity: int, cost: int = 1) -> tuple[bool, float]:
+        allowed, tokens = await self._script(keys=[self.prefix + key], args=[rate, capacity, cost])
+        return bool(allowed), float(tokens)
+
+
+class RateLimiter:
+    def __init__(self, backend, *, fail_open: bool = True) -> None:
+        self.backend = backend
+        self.fail_open = fail_open
+
+    async def hit(self, key: str, *, per_minute: int, burst: int | None = None, cost: int = 1) -> RateLimitDecision:
+        """Take `cost` tokens from the bucket for `key`, refilled at `per_minute` tokens per minute."""
+        rate = per_minute / 60
+        capacity = burst or per_minute
+        try:
+            allowed, tokens = await self.backend.acquire(key, rate=rate, capacity=capacity, cost=cost)
+        except Exception:
+            if not self.fail_open:
+                raise
+            logger.exception("Rate limit backend failed; allowing request.")
+            return RateLimitDecision(allowed=True, limit=capacity, remaining=capacity, retry_after=0)
+
+        retry_after = 0 if allowed else (cost - tokens) / rate
+        return RateLimitDecision(allowed=allowed, limit=capacity, remaining=max(math.floor(tokens), 0), retry_after=retry_after)
+
+
+@lru_cache
+def get_rate_limiter() -> RateLimiter:
+    settings = get_app_settings()
+    if settings.rate_limit_backend == "redis":
+        if not settings.rate_limit_redis_url:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL must be set when RATE_LIMIT_BACKEND=redis.")
+        backend = RedisRateLimitBackend(settings.rate_limit_redis_url)
+    else:
+        backend = InMemoryRateLimitBackend()
+    return RateLimiter(backend)
@@ -1,13 +1,27 @@
+import base64
 import hashlib
+import hmac
 import secrets
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from functools import lru_cache
 
-import bcrypt
-from passlib.context import CryptContext
+# Prefix of HMAC-signed API keys; legacy random keys start with "wr_"
+SIGNED_API_KEY_PREFIX = "wrs_"
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# passlib and bcrypt are only needed for user passwords, so they are imported
+# on first use rather than by every module that imports this one.
+@lru_cache
+def get_pwd_context():
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def generate_salt() -> str:
+    import bcrypt
+
     return bcrypt.gensalt().decode()
 
 
@@ -19,7 +33,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     # Try direct verification first
     try:
-        if pwd_context.verify(plain_password, hashed_password):
+        if get_pwd_context().verify(plain_password, hashed_password):
             return True
     except Exception:
         pass
@@ -30,7 +44,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     if len(password_bytes) > 72:
         password_hash = hashlib.sha256(password_bytes).hexdigest()
         try:
-            return pwd_context.verify(password_hash, hashed_password)
+            return get_pwd_context().verify(password_hash, hashed_password)
         except Exception:
             pass
     
@@ -52,12 +66,12 @@ def get_password_hash(password: str) -> str:
         password = hashlib.sha256(password_bytes).hexdigest()
     
     try:
-        return pwd_context.hash(password)
+        return get_pwd_context().hash(password)
     except Exception as e:
         # Fallback: if bcrypt still fails, hash with SHA-256 and try again
         if "cannot be longer than 72 bytes" in str(e) or len(password_bytes) > 72:
             password = hashlib.sha256(password_bytes).hexdigest()
-            return pwd_context.hash(password)
+            return get_pwd_context().hash(password)
         raise
 
 
@@ -74,6 +88,54 @@ def hash_api_key(api_key: str) -> str:
     return hashlib.sha256(api_key.encode('utf-8')).hexdigest()
 
 
+def generate_api_keys(count: int) -> list[tuple[str, str]]:
+    """Generate `count` new API keys as (plain key, key hash) pairs."""
+    from app.models.api_key import ApiKey
+
+    return [(api_key, hash_api_key(api_key)) for api_key in (ApiKey.generate_key() for _ in range(count))]
+
+
+@dataclass(frozen=True)
+class SignedApiKeyClaims:
+    api_key_id: int
+    expires_at: datetime | None
+
+    def is_expired(self) -> bool:
+        return self.expires_at is not None and self.expires_at <= datetime.now(UTC)
+
+
+def _api_key_signature(message: str, secret: str) -> str:
+    digest = hmac.new(secret.encode("utf-8"), message.encode("utf-8"), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+
+def sign_api_key(api_key_id: int, expires_at: datetime | None, secret: str) -> str:
+    """
+    Issue a signed API key: `wrs_<id>.<expiry epoch or 0>.<HMAC-SHA256>`.
+
+    The id and expiry can be checked without a database lookup; the key is
+    still stored by hash like any other, so it also verifies the legacy way.
+    """
+    expires = int(expires_at.timestamp()) if expires_at is not None else 0
+    message = f"{SIGNED_API_KEY_PREFIX}{api_key_id}.{expires}"
+    return f"{message}.{_api_key_signature(message, secret)}"
+
+
+def parse_signed_api_key(api_key: str, secret: str) -> SignedApiKeyClaims | None:
+    """Claims of a signed API key, or None when it is malformed or the signature does not match."""
+    message, _, signature = api_key.rpartition(".")
+    # compare_digest raises on non-ASCII str, and a valid key is all ASCII
+    if not api_key.isascii() or not message.startswith(SIGNED_API_KEY_PREFIX):
+        return None
+    if not secrets.compare_digest(signature, _api_key_signature(message, secret)):
+        return None
+    try:
+        api_key_id, expires = (int(part) for part in message[len(SIGNED_API_KEY_PREFIX):].split("."))
+    except ValueError:
+        return None
+    return SignedApiKeyClaims(api_key_id, datetime.fromtimestamp(expires, UTC) if expires else None)
+
+
 def verify_api_key(api_key: str, key_hash: str) -> bool:
     """
     Verify an API key against its hash.
@@ -1,5 +1,5 @@
 import logging
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import ConfigDict, SecretStr, field_validator
 
@@ -18,6 +18,8 @@ class AppSettings(BaseAppSettings):
     openapi_prefix: str = ""
     openapi_url: str = "/openapi.json"
     redoc_url: str = "/redoc"
+    # False leaves the docs and openapi.json routes out of the app entirely
+    docs_enabled: bool = True
     title: str = "Warranty Register"
     version: str = "0.3.0"
 
@@ -29,6 +31,96 @@ class AppSettings(BaseAppSettings):
     allowed_hosts: list[str] = ["*"]
     logging_level: int | None = None  # Optional, will be set by child classes
 
+    # production server (python -m app.server)
+    server_host: str = "0.0.0.0"
+    server_port: int = 8000
+    # None sizes the worker count to the CPU count
+    server_workers: int | None = None
+    # recycle a worker after this many requests (plus up to the jitter, drawn
+    # per worker); None disables recycling. Only applies with several workers.
+    server_max_requests: int | None = 10_000
+    server_max_requests_jitter: int = 1_000
+    server_graceful_timeout_seconds: int = 30
+    server_keepalive_seconds: int = 5
+    # proxies trusted for X-Forwarded-*; widen it for deployments behind another proxy
+    server_forwarded_allow_ips: str = "127.0.0.1"
+
+    # database connection pool
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    # total connections across all server workers, kept below max_connections (200) in
+    # postgresql/postgresql.conf; each worker gets its share, at most db_pool_size + db_max_overflow
+    db_connection_budget: int = 150
+    # open db_pool_size connections and run the hot queries before readiness
+    db_warmup_enabled: bool = True
+    db_warmup_timeout_seconds: float = 30.0
+    # a failed warm-up is retried in the background; readiness waits for it
+    db_warmup_retry_seconds: float = 5.0
+
+    # idempotency keys (POST /warranty)
+    idempotency_key_ttl_seconds: int = 24 * 60 * 60
+    # a reservation whose response was never stored (crash between commits) can
+    # be taken over by a retry after this long
+    idempotency_pending_lease_seconds: int = 60
+    idempotency_cleanup_interval_seconds: int = 60 * 60
+
+    # archiving of soft-deleted warranties into the warranties_archive partition
+    warranty_archive_enabled: bool = True
+    warranty_archive_after_days: int = 90
+    warranty_archive_batch_size: int = 1000
+    warranty_archive_interval_seconds: int = 6 * 60 * 60
+
+    # warranty change feed (GET /warranty/stream)
+    warranty_stream_queue_size: int = 100
+    warranty_stream_heartbeat_seconds: float = 15.0
+
+    # per-API-key rate limiting; keys without their own limits use these
+    rate_limit_enabled: bool = True
+    rate_limit_default_per_minute: int = 600
+    rate_limit_default_burst: int | None = None
+    rate_limit_backend: Literal["memory", "redis"] = "memory"
+    rate_limit_redis_url: str | None = None
+
+    # signed (wrs_) API keys: set a secret to issue them and verify them without
+    # a database lookup; revocations are picked up within the refresh interval
+    api_key_signing_secret: SecretStr | None = None
+    api_key_revocation_refresh_seconds: int = 30
+    # past this age the revocation list is distrusted and keys are looked up
+    api_key_revocation_max_staleness_seconds: int = 300
+
+    # per-key usage counters, kept in memory and flushed to api_key_usage_daily
+    api_key_usage_enabled: bool = True
+    api_key_usage_flush_interval_seconds: int = 30
+
+    # structured JSON access log (replaces uvicorn.access)
+    access_log_enabled: bool = True
+    # None writes to stdout
+    access_log_path: str | None = None
+    # records beyond this many pending are dropped and counted
+    access_log_queue_size: int = 10_000
+    access_log_default_sample_rate: float = 1.0
+    # first match wins: {"path": prefix, "status": "2xx" | "4xx" | "5xx" | "*", "rate": 0..1}
+    access_log_sample_rules: list[dict[str, Any]] = [
+        {"path": "/healthz", "status": "2xx", "rate": 0.0},
+        {"path": "/readyz", "status": "2xx", "rate": 0.0},
+        {"path": "/api/v1/warranty", "status": "2xx", "rate": 0.01},
+    ]
+
+    # background database probe backing /readyz
+    health_probe_interval_seconds: float = 5.0
+    health_probe_timeout_seconds: float = 2.0
+
+    # admission control (load shedding); limits are per worker process
+    admission_control_enabled: bool = True
+    admission_max_in_flight: int = 200
+    # extra in-flight slots only priority routes may use
+    admission_priority_reserve: int = 20
+    admission_max_pool_wait_ms: float = 500.0
+    admission_retry_after_seconds: int = 1
+    # long-lived streams are exempt too, or each one would hold an in-flight slot
+    admission_exempt_paths: list[str] = ["/healthz", "/readyz", "/metrics", "/api/v1/warranty/stream"]
+    admission_priority_paths: list[str] = ["/admin", "/api/v1/admin"]
+
     @field_validator("logging_level", mode="before")
     @classmethod
     def parse_logging_level(cls, v):
@@ -46,6 +138,13 @@ class AppSettings(BaseAppSettings):
             return level_map.get(v.upper(), logging.DEBUG)
         return v
 
+    @property
+    def api_key_signing_key(self) -> str | None:
+        """The secret new API keys are signed with, or None to issue legacy random keys."""
+        if self.api_key_signing_secret is None:
+            return None
+        return self.api_key_signing_secret.get_secret_value()
+
     @property
     def fastapi_kwargs(self) -> dict[str, Any]:
         return {
@@ -1,6 +1,5 @@
 from datetime import UTC, datetime, timedelta
 
-from jose import JWTError, jwt
 from pydantic import ValidationError
 
 from app.models.user import User
@@ -19,6 +18,8 @@ def create_token(
     secret_key: str,
     expires_delta: timedelta | None = timedelta(minutes=15),
 ):
+    from jose import jwt
+
     to_encode = content.copy()
     expire = datetime.now(UTC) + expires_delta
     to_encode.update(TokenBase(exp=expire, sub=JWT_SUBJECT).model_dump())
@@ -38,6 +39,8 @@ def create_token_for_user(user: User, secret_key: str) -> UserTokenData:
 
 
 def get_user_from_token(token: str, secret_key: str) -> str:
+    from jose import JWTError, jwt
+
     try:
         decoded_user = jwt.decode(token, secret_key, algorithms=ALGORITHM)
         return TokenUser(**decoded_user)
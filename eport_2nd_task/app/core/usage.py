@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import UTC, date, datetime
+
+from app.database.repositories.api_key_usage import ApiKeyUsageRepository
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class UsageCounters:
+    requests: int = 0
+    bytes_out: int = 0
+    errors: int = 0
+    latency_ms_sum: float = 0.0
+
+    def add(self, other: "UsageCounters") -> None:
+        self.requests += other.requests
+        self.bytes_out += other.bytes_out
+        self.errors += other.errors
+        self.latency_ms_sum += other.latency_ms_sum
+
+
+class ApiKeyUsageRecorder:
+    """
+    Per-key, per-day request counters kept in the worker's memory.
+
+    `record` is a dict update on the request path; `flush` hands everything
+    counted since the last flush to the database in one transaction. A failed
+    flush puts its counts back so they go out with the next one.
+    """
+
+    def __init__(self) -> None:
+        self._counters: dict[tuple[int, date], UsageCounters] = {}
+        self._last_used: dict[int, datetime] = {}
+        self._flush_lock = asyncio.Lock()
+
+    def record(self, api_key_id: int, *, status: int, bytes_out: int, latency_ms: float) -> None:
+        now = datetime.now(UTC)
+        counters = self._counters.get((api_key_id, now.date()))
+        if counters is None:
+            counters = self._counters[(api_key_id, now.date())] = UsageCounters()
+        counters.requests += 1
+        counters.bytes_out += bytes_out
+        counters.errors += status >= 400
+        counters.latency_ms_sum += latency_ms
+        self._last_used[api_key_id] = now
+
+    def pending(self) -> int:
+        return sum(counters.requests for counters in self._counters.values())
+
+    def _take(self) -> tuple[dict[tuple[int, date], UsageCounters], dict[int, datetime]]:
+        counters, last_used = self._counters, self._last_used
+        self._counters, self._last_used = {}, {}
+        return counters, last_used
+
+    def _put_back(self, counters: dict[tuple[int, date], UsageCounters], last_used: dict[int, datetime]) -> None:
+        for key, value in counters.items():
+            self._counters.setdefault(key, UsageCounters()).add(value)
+        for api_key_id, used_at in last_used.items():
+            self._last_used[api_key_id] = max(used_at, self._last_used.get(api_key_id, used_at))
+
+    async def flush(self, session_factory) -> int:
+        """Write pending counters; returns the number of requests flushed."""
+        async with self._flush_lock:
+            counters, last_used = self._take()
+            if not counters:
+                return 0
+            usage = [
+                {
+                    "api_key_id": api_key_id,
+                    "day": day,
+                    "requests": value.requests,
+                    "bytes_out": value.bytes_out,
+                    "errors": value.errors,
+                    "latency_ms_sum": value.latency_ms_sum,
+                }
+                for (api_key_id, day), value in counters.items()
+            ]
+            try:
+                async with session_factory() as session:
+                    await ApiKeyUsageRepository(session).add_usage(usage=usage, last_used=last_used)
+            except BaseException:
+                self._put_back(counters, last_used)
+                raise
+            return sum(row["requests"] for row in usage)
+
+    async def run(self, session_factory, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                # Shielded so shutdown cannot cancel a flush between its commit
+                # and its return, which would count the batch twice
+                await asyncio.shield(self.flush(session_factory))
+            except Exception:
+                logger.exception("Failed to flush API key usage; keeping %s request(s) for the next flush.", self.pending())
@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.settings.app import AppSettings
+from app.database.pool import TimedAsyncAdaptedQueuePool
 
 logger = logging.getLogger(__name__)
 
@@ -20,8 +21,9 @@ async def connect_to_db(app: FastAPI, settings: AppSettings) -> None:
     # echo: Enable SQL logging only in debug mode (performance impact in production)
     engine = create_async_engine(
         url=str(settings.db_url),
-        pool_size=20,  # Reduced from 50 for better resource usage
-        max_overflow=10,  # Allow temporary overflow during traffic spikes
+        poolclass=TimedAsyncAdaptedQueuePool,  # Feeds checkout latency to admission control
+        pool_size=settings.db_pool_size,  # 20 by default; reduced from 50 for better resource usage
+        max_overflow=settings.db_max_overflow,  # Allow temporary overflow during traffic spikes
         pool_pre_ping=True,  # Verify connections before using
         pool_recycle=3600,  # Recycle connections after 1 hour
         echo=settings.debug,  # Only log SQL in debug mode
@@ -33,6 +35,7 @@ async def connect_to_db(app: FastAPI, settings: AppSettings) -> None:
         expire_on_commit=False,
         autoflush=True,
     )
+    app.state.engine = engine
     app.state.pool = async_session_factory
 
     logger.info("Connected to database.")
@@ -41,6 +44,8 @@ async def connect_to_db(app: FastAPI, settings: AppSettings) -> None:
 async def close_db_connection(app: FastAPI) -> None:
     logger.info("Closing database connection...")
 
-    # app.state.pool.close_all()
+    engine = getattr(app.state, "engine", None)
+    if engine is not None:
+        await engine.dispose()
 
     logger.info("Database connection closed.")
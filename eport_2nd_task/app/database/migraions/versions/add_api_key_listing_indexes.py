@@ -0,0 +1,41 @@
+"""add_api_key_listing_indexes
+
+Revision ID: add_api_key_listing_indexes
+Revises: add_api_key_replaced_by
+Create Date: 2025-04-14 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "add_api_key_listing_indexes"
+down_revision = "add_api_key_replaced_by"
+branch_labels = None
+depends_on = None
+
+SORT_COLUMNS = ("created_at", "last_used_at")
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Keyset indexes for the admin listing. The sort key is the same
+    # coalesce() expression the repository orders by, so NULLs sort last and
+    # the planner can walk the index backwards from the cursor.
+    with op.get_context().autocommit_block():
+        for column in SORT_COLUMNS:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_api_keys_{column}_id "
+                f"ON api_keys ((coalesce({column}, '-infinity')), id) WHERE deleted_at IS NULL"
+            )
+        # Substring name search (ILIKE '%...%')
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_api_keys_name_trgm "
+            "ON api_keys USING gin (name gin_trgm_ops) WHERE deleted_at IS NULL"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_api_keys_name_trgm")
+        for column in SORT_COLUMNS:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_api_keys_{column}_id")
@@ -0,0 +1,32 @@
+"""add_api_key_replaced_by
+
+Revision ID: add_api_key_replaced_by
+Revises: create_warranty_monthly_rollups_table
+Create Date: 2025-04-07 00:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "add_api_key_replaced_by"
+down_revision = "create_warranty_monthly_rollups_table"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "api_keys",
+        sa.Column(
+            "replaced_by_id",
+            sa.Integer(),
+            sa.ForeignKey("api_keys.id", name="fk_api_keys_replaced_by_id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("fk_api_keys_replaced_by_id", "api_keys", type_="foreignkey")
+    op.drop_column("api_keys", "replaced_by_id")
@@ -0,0 +1,25 @@
+"""add_rate_limits_to_api_keys
+
+Revision ID: add_rate_limits_to_api_keys
+Revises: create_idempotency_keys
+Create Date: 2025-02-24 00:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "add_rate_limits_to_api_keys"
+down_revision = "create_idempotency_keys"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("api_keys", sa.Column("rate_limit_per_minute", sa.Integer(), nullable=True))
+    op.add_column("api_keys", sa.Column("rate_limit_burst", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("api_keys", "rate_limit_burst")
+    op.drop_column("api_keys", "rate_limit_per_minute")
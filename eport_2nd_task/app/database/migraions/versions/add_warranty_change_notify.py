@@ -0,0 +1,74 @@
+"""add_warranty_change_notify
+
+Revision ID: add_warranty_change_notify
+Revises: partition_warranties_by_archived
+Create Date: 2025-03-10 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "add_warranty_change_notify"
+down_revision = "partition_warranties_by_archived"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Compact payload: enough for clients to apply a delta (and for the API to
+    # filter subscribers) without a NOTIFY ever approaching its 8000-byte cap.
+    # A soft delete is reported as op "delete". Rows moved into the archive
+    # partition were soft-deleted long ago, so that insert is not reported.
+    op.execute(
+        """
+    CREATE FUNCTION notify_warranty_change()
+        RETURNS TRIGGER AS
+    $$
+    DECLARE
+        rec warranties;
+        change_op text;
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            rec := OLD;
+            change_op := 'delete';
+        ELSIF TG_OP = 'INSERT' THEN
+            IF NEW.archived THEN
+                RETURN NULL;
+            END IF;
+            rec := NEW;
+            change_op := 'insert';
+        ELSE
+            rec := NEW;
+            change_op := CASE WHEN NEW.deleted_at IS NOT NULL AND OLD.deleted_at IS NULL THEN 'delete' ELSE 'update' END;
+        END IF;
+
+        PERFORM pg_notify(
+            'warranty_changes',
+            json_build_object(
+                'id', rec.id,
+                'op', change_op,
+                'updated_at', rec.updated_at,
+                'status', rec.status,
+                'department', rec.department,
+                'category', rec.category
+            )::text
+        );
+        RETURN NULL;
+    END;
+    $$ language 'plpgsql';
+    """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER notify_warranty_change
+            AFTER INSERT OR UPDATE OR DELETE
+            ON warranties
+            FOR EACH ROW
+        EXECUTE PROCEDURE notify_warranty_change();
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER notify_warranty_change ON warranties")
+    op.execute("DROP FUNCTION notify_warranty_change")
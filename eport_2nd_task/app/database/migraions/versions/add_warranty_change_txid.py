@@ -0,0 +1,67 @@
+"""add_warranty_change_txid
+
+Revision ID: add_warranty_change_txid
+Revises: add_warranty_change_notify
+Create Date: 2025-03-17 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "add_warranty_change_txid"
+down_revision = "add_warranty_change_notify"
+branch_labels = None
+depends_on = None
+
+PARTITIONS = ("warranties_live", "warranties_archive")
+
+
+def upgrade() -> None:
+    # change_txid is the id of the transaction that last wrote the row. It is
+    # the watermark for GET /warranty/changes. Existing rows read as 0 through
+    # the constant default, so adding the column does not rewrite the table.
+    op.execute("ALTER TABLE warranties ADD COLUMN change_txid bigint NOT NULL DEFAULT 0")
+    op.execute(
+        """
+    CREATE FUNCTION set_warranty_change_txid()
+        RETURNS TRIGGER AS
+    $$
+    BEGIN
+        NEW.change_txid = txid_current();
+        RETURN NEW;
+    END;
+    $$ language 'plpgsql';
+    """
+    )
+    # Row-level BEFORE triggers cannot be declared on a partitioned table
+    # before Postgres 13, so each partition gets its own.
+    for partition in PARTITIONS:
+        op.execute(
+            f"""
+            CREATE TRIGGER set_warranty_change_txid
+                BEFORE INSERT OR UPDATE
+                ON {partition}
+                FOR EACH ROW
+            EXECUTE PROCEDURE set_warranty_change_txid();
+            """
+        )
+
+    # Keyset index for the changes feed: built concurrently on each partition,
+    # then attached to an index declared on the parent only.
+    with op.get_context().autocommit_block():
+        for partition in PARTITIONS:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{partition}_change_txid_id "
+                f"ON {partition} (change_txid, id)"
+            )
+    op.execute("CREATE INDEX ix_warranties_change_txid_id ON ONLY warranties (change_txid, id)")
+    for partition in PARTITIONS:
+        op.execute(f"ALTER INDEX ix_warranties_change_txid_id ATTACH PARTITION ix_{partition}_change_txid_id")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX ix_warranties_change_txid_id")
+    for partition in PARTITIONS:
+        op.execute(f"DROP TRIGGER set_warranty_change_txid ON {partition}")
+    op.execute("DROP FUNCTION set_warranty_change_txid")
+    op.execute("ALTER TABLE warranties DROP COLUMN change_txid")
@@ -0,0 +1,36 @@
+"""add_warranty_live_filter_index
+
+Revision ID: add_warranty_live_filter_index
+Revises: add_image_urls_to_warranties, create_api_keys
+Create Date: 2025-02-03 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "add_warranty_live_filter_index"
+down_revision = ("add_image_urls_to_warranties", "create_api_keys")
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Partial index over live rows only: list filters and COUNT(*) can be
+    # answered from it, and its reltuples doubles as a cheap live-row estimate.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_warranties_live_filters",
+            "warranties",
+            ["status", "department", "category"],
+            postgresql_where="deleted_at IS NULL",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_warranties_live_filters",
+            table_name="warranties",
+            postgresql_concurrently=True,
+        )
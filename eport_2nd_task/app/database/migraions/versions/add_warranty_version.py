@@ -0,0 +1,24 @@
+"""add_warranty_version
+
+Revision ID: add_warranty_version
+Revises: add_warranty_change_txid
+Create Date: 2025-03-24 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "add_warranty_version"
+down_revision = "add_warranty_change_txid"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Row version for optimistic concurrency (ETag / If-Match). Existing rows
+    # read as 1 through the constant default, so the table is not rewritten.
+    op.execute("ALTER TABLE warranties ADD COLUMN version integer NOT NULL DEFAULT 1")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE warranties DROP COLUMN version")
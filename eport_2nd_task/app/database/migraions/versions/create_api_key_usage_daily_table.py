@@ -0,0 +1,31 @@
+"""create_api_key_usage_daily_table
+
+Revision ID: create_api_key_usage_daily_table
+Revises: add_api_key_listing_indexes
+Create Date: 2025-04-21 00:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "create_api_key_usage_daily_table"
+down_revision = "add_api_key_listing_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "api_key_usage_daily",
+        sa.Column("api_key_id", sa.Integer, sa.ForeignKey("api_keys.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("day", sa.Date, primary_key=True),
+        sa.Column("requests", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("bytes_out", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("errors", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("latency_ms_sum", sa.Float, nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("api_key_usage_daily")
@@ -0,0 +1,45 @@
+"""create_idempotency_keys_table
+
+Revision ID: create_idempotency_keys
+Revises: add_warranty_live_filter_index
+Create Date: 2025-02-10 00:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import func
+
+# revision identifiers, used by Alembic.
+revision = "create_idempotency_keys"
+down_revision = "add_warranty_live_filter_index"
+branch_labels = None
+depends_on = None
+
+
+def _create_idempotency_keys_table() -> None:
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("scope", sa.String(100), nullable=False),
+        sa.Column("key", sa.String(255), nullable=False),
+        sa.Column("request_fingerprint", sa.String(64), nullable=False),
+        sa.Column("response_status", sa.Integer, nullable=True),
+        sa.Column("response_body", sa.Text, nullable=True),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            nullable=False,
+            server_default=func.now(),
+        ),
+        sa.Column("expires_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.UniqueConstraint("scope", "key", name="uq_idempotency_keys_scope_key"),
+    )
+    op.create_index("ix_idempotency_keys_expires_at", "idempotency_keys", ["expires_at"])
+
+
+def upgrade() -> None:
+    _create_idempotency_keys_table()
+
+
+def downgrade() -> None:
+    op.drop_table("idempotency_keys")
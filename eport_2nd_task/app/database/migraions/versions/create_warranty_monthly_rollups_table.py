@@ -0,0 +1,128 @@
+"""create_warranty_monthly_rollups_table
+
+Revision ID: create_warranty_monthly_rollups_table
+Revises: create_warranty_summaries_table
+Create Date: 2025-04-07 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "create_warranty_monthly_rollups_table"
+down_revision = "create_warranty_summaries_table"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+    CREATE TABLE warranty_monthly_rollups (
+        month date NOT NULL,
+        department varchar(100) NOT NULL,
+        category varchar(100) NOT NULL,
+        status varchar(50) NOT NULL,
+        registered_count integer NOT NULL DEFAULT 0,
+        expiring_count integer NOT NULL DEFAULT 0,
+        PRIMARY KEY (month, department, category, status)
+    )
+    """
+    )
+    op.execute(
+        """
+    CREATE FUNCTION bump_warranty_monthly_rollup(
+        row_created_at timestamp,
+        row_expiry_date date,
+        row_department varchar,
+        row_category varchar,
+        row_status varchar,
+        delta integer
+    )
+        RETURNS void AS
+    $$
+    BEGIN
+        IF row_created_at IS NOT NULL THEN
+            INSERT INTO warranty_monthly_rollups (month, department, category, status, registered_count)
+            VALUES (date_trunc('month', row_created_at)::date, row_department, row_category, row_status, delta)
+            ON CONFLICT (month, department, category, status) DO UPDATE
+            SET registered_count = warranty_monthly_rollups.registered_count + EXCLUDED.registered_count;
+        END IF;
+        IF row_expiry_date IS NOT NULL THEN
+            INSERT INTO warranty_monthly_rollups (month, department, category, status, expiring_count)
+            VALUES (date_trunc('month', row_expiry_date)::date, row_department, row_category, row_status, delta)
+            ON CONFLICT (month, department, category, status) DO UPDATE
+            SET expiring_count = warranty_monthly_rollups.expiring_count + EXCLUDED.expiring_count;
+        END IF;
+    END;
+    $$ language 'plpgsql';
+    """
+    )
+    # Same shape as maintain_warranty_summary: take the old row out, put the
+    # new one in, and skip writes that change none of the rolled-up columns.
+    op.execute(
+        """
+    CREATE FUNCTION maintain_warranty_monthly_rollup()
+        RETURNS TRIGGER AS
+    $$
+    BEGIN
+        IF TG_OP = 'UPDATE'
+            AND (OLD.deleted_at IS NULL AND NOT OLD.archived) = (NEW.deleted_at IS NULL AND NOT NEW.archived)
+            AND OLD.created_at IS NOT DISTINCT FROM NEW.created_at
+            AND OLD.warranty_expiry_date IS NOT DISTINCT FROM NEW.warranty_expiry_date
+            AND OLD.department = NEW.department
+            AND OLD.category = NEW.category
+            AND OLD.status = NEW.status THEN
+            RETURN NULL;
+        END IF;
+
+        IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.deleted_at IS NULL AND NOT OLD.archived THEN
+            PERFORM bump_warranty_monthly_rollup(
+                OLD.created_at, OLD.warranty_expiry_date, OLD.department, OLD.category, OLD.status, -1
+            );
+        END IF;
+
+        IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.deleted_at IS NULL AND NOT NEW.archived THEN
+            PERFORM bump_warranty_monthly_rollup(
+                NEW.created_at, NEW.warranty_expiry_date, NEW.department, NEW.category, NEW.status, 1
+            );
+        END IF;
+
+        RETURN NULL;
+    END;
+    $$ language 'plpgsql';
+    """
+    )
+    op.execute(
+        """
+    CREATE TRIGGER maintain_warranty_monthly_rollup
+        AFTER INSERT OR UPDATE OR DELETE
+        ON warranties
+        FOR EACH ROW
+    EXECUTE PROCEDURE maintain_warranty_monthly_rollup();
+    """
+    )
+    # Writers are locked out by the trigger creation until this commits
+    op.execute(
+        """
+    INSERT INTO warranty_monthly_rollups (month, department, category, status, registered_count, expiring_count)
+    SELECT month, department, category, status, sum(registered), sum(expiring)
+    FROM (
+        SELECT date_trunc('month', created_at)::date AS month, department, category, status,
+            1 AS registered, 0 AS expiring
+        FROM warranties
+        WHERE NOT archived AND deleted_at IS NULL AND created_at IS NOT NULL
+        UNION ALL
+        SELECT date_trunc('month', warranty_expiry_date)::date, department, category, status, 0, 1
+        FROM warranties
+        WHERE NOT archived AND deleted_at IS NULL AND warranty_expiry_date IS NOT NULL
+    ) AS events
+    GROUP BY month, department, category, status
+    """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER maintain_warranty_monthly_rollup ON warranties")
+    op.execute("DROP FUNCTION maintain_warranty_monthly_rollup")
+    op.execute("DROP FUNCTION bump_warranty_monthly_rollup")
+    op.execute("DROP TABLE warranty_monthly_rollups")
@@ -0,0 +1,96 @@
+"""create_warranty_summaries_table
+
+Revision ID: create_warranty_summaries_table
+Revises: add_warranty_version
+Create Date: 2025-03-31 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "create_warranty_summaries_table"
+down_revision = "add_warranty_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+    CREATE TABLE warranty_summaries (
+        department varchar(100) NOT NULL,
+        category varchar(100) NOT NULL,
+        expires_on date NOT NULL,
+        asset_count integer NOT NULL DEFAULT 0,
+        total_cost numeric(14, 2) NOT NULL DEFAULT 0,
+        PRIMARY KEY (department, category, expires_on)
+    )
+    """
+    )
+    # Each write to a live warranty moves its count and cost between summary
+    # rows. Writes that leave department, category, expiry, cost and liveness
+    # alone (notes, status, ...) do not touch the summary.
+    op.execute(
+        """
+    CREATE FUNCTION maintain_warranty_summary()
+        RETURNS TRIGGER AS
+    $$
+    BEGIN
+        IF TG_OP = 'UPDATE'
+            AND (OLD.deleted_at IS NULL AND NOT OLD.archived) = (NEW.deleted_at IS NULL AND NOT NEW.archived)
+            AND OLD.department = NEW.department
+            AND OLD.category = NEW.category
+            AND OLD.warranty_expiry_date IS NOT DISTINCT FROM NEW.warranty_expiry_date
+            AND OLD.cost = NEW.cost THEN
+            RETURN NULL;
+        END IF;
+
+        IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.deleted_at IS NULL AND NOT OLD.archived THEN
+            UPDATE warranty_summaries
+            SET asset_count = asset_count - 1, total_cost = total_cost - OLD.cost
+            WHERE department = OLD.department
+                AND category = OLD.category
+                AND expires_on = COALESCE(OLD.warranty_expiry_date, '-infinity'::date);
+        END IF;
+
+        IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.deleted_at IS NULL AND NOT NEW.archived THEN
+            INSERT INTO warranty_summaries (department, category, expires_on, asset_count, total_cost)
+            VALUES (NEW.department, NEW.category, COALESCE(NEW.warranty_expiry_date, '-infinity'::date), 1, NEW.cost)
+            ON CONFLICT (department, category, expires_on) DO UPDATE
+            SET asset_count = warranty_summaries.asset_count + 1,
+                total_cost = warranty_summaries.total_cost + EXCLUDED.total_cost;
+        END IF;
+
+        RETURN NULL;
+    END;
+    $$ language 'plpgsql';
+    """
+    )
+    # AFTER row triggers can be declared on the partitioned parent; moving a
+    # row between partitions fires them as a DELETE plus an INSERT.
+    op.execute(
+        """
+    CREATE TRIGGER maintain_warranty_summary
+        AFTER INSERT OR UPDATE OR DELETE
+        ON warranties
+        FOR EACH ROW
+    EXECUTE PROCEDURE maintain_warranty_summary();
+    """
+    )
+    # Creating the trigger locks out writers until this migration commits, so
+    # the backfill cannot race with the trigger.
+    op.execute(
+        """
+    INSERT INTO warranty_summaries (department, category, expires_on, asset_count, total_cost)
+    SELECT department, category, COALESCE(warranty_expiry_date, '-infinity'::date), count(*), sum(cost)
+    FROM warranties
+    WHERE NOT archived AND deleted_at IS NULL
+    GROUP BY 1, 2, 3
+    """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER maintain_warranty_summary ON warranties")
+    op.execute("DROP FUNCTION maintain_warranty_summary")
+    op.execute("DROP TABLE warranty_summaries")
@@ -0,0 +1,74 @@
+"""partition_warranties_by_archived
+
+Revision ID: partition_warranties_by_archived
+Revises: add_rate_limits_to_api_keys
+Create Date: 2025-03-03 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "partition_warranties_by_archived"
+down_revision = "add_rate_limits_to_api_keys"
+branch_labels = None
+depends_on = None
+
+# `warranties` becomes a LIST-partitioned table on `archived`:
+#   warranties_live    (archived = false) - the existing table, attached as is
+#   warranties_archive (archived = true)  - soft-deleted rows moved by the archive job
+#
+# The existing table is never rewritten or scanned under an exclusive lock:
+# the new column uses a constant default, the CHECK constraint is validated
+# and the (id, archived) unique index built without blocking writes, and
+# ATTACH PARTITION then trusts the validated constraint instead of scanning.
+# The index is turned into a UNIQUE constraint first: ATTACH only reuses a
+# partition index for the parent's primary key if it backs a constraint, and
+# would otherwise build a second one under ACCESS EXCLUSIVE.
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE warranties ADD COLUMN archived boolean NOT NULL DEFAULT false")
+    op.execute("ALTER TABLE warranties ADD CONSTRAINT warranties_live_not_archived CHECK (NOT archived) NOT VALID")
+
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TABLE warranties VALIDATE CONSTRAINT warranties_live_not_archived")
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS warranties_live_id_archived_key "
+            "ON warranties (id, archived)"
+        )
+
+    op.execute(
+        "ALTER TABLE warranties ADD CONSTRAINT warranties_live_id_archived_key "
+        "UNIQUE USING INDEX warranties_live_id_archived_key"
+    )
+    op.execute("ALTER TABLE warranties RENAME TO warranties_live")
+    op.execute(
+        "CREATE TABLE warranties (LIKE warranties_live INCLUDING DEFAULTS) PARTITION BY LIST (archived)"
+    )
+    op.execute("ALTER TABLE warranties ADD PRIMARY KEY (id, archived)")
+    op.execute("ALTER SEQUENCE warranties_id_seq OWNED BY warranties.id")
+    op.execute("ALTER TABLE warranties ATTACH PARTITION warranties_live FOR VALUES IN (false)")
+    op.execute("CREATE TABLE warranties_archive PARTITION OF warranties FOR VALUES IN (true)")
+    op.execute(
+        """
+        CREATE TRIGGER update_warranty_modtime
+            BEFORE UPDATE
+            ON warranties_archive
+            FOR EACH ROW
+        EXECUTE PROCEDURE update_updated_at_column();
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE warranties DETACH PARTITION warranties_archive")
+    op.execute("ALTER TABLE warranties DETACH PARTITION warranties_live")
+    op.execute("ALTER SEQUENCE warranties_id_seq OWNED BY warranties_live.id")
+    op.execute("DROP TABLE warranties")
+    op.execute("ALTER TABLE warranties_live RENAME TO warranties")
+    op.execute("ALTER TABLE warranties DROP CONSTRAINT warranties_live_not_archived")
+    # Drops warranties_live_id_archived_key, the index backing it
+    op.execute("ALTER TABLE warranties DROP CONSTRAINT warranties_live_id_archived_key")
+    op.execute("INSERT INTO warranties SELECT * FROM warranties_archive")
+    op.execute("DROP TABLE warranties_archive")
+    op.execute("ALTER TABLE warranties DROP COLUMN archived")
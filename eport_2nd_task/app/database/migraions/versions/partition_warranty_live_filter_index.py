@@ -0,0 +1,39 @@
+"""partition_warranty_live_filter_index
+
+Revision ID: partition_warranty_live_filter_index
+Revises: skip_archive_moves_in_change_notify
+Create Date: 2025-04-28 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "partition_warranty_live_filter_index"
+down_revision = "skip_archive_moves_in_change_notify"
+branch_labels = None
+depends_on = None
+
+PARTITIONS = ("warranties_live", "warranties_archive")
+COLUMNS = "(status, department, category) WHERE deleted_at IS NULL"
+
+
+def upgrade() -> None:
+    # Partitioning left ix_warranties_live_filters as a local index on
+    # warranties_live only. Give the parent the partitioned index the model
+    # declares: the live partition keeps its index under a partition name,
+    # the archive partition's is built concurrently, then both are attached
+    # to an index declared on the parent only.
+    op.execute("ALTER INDEX ix_warranties_live_filters RENAME TO ix_warranties_live_live_filters")
+    with op.get_context().autocommit_block():
+        for partition in PARTITIONS:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{partition}_live_filters ON {partition} {COLUMNS}")
+    op.execute(f"CREATE INDEX ix_warranties_live_filters ON ONLY warranties {COLUMNS}")
+    for partition in PARTITIONS:
+        op.execute(f"ALTER INDEX ix_warranties_live_filters ATTACH PARTITION ix_{partition}_live_filters")
+
+
+def downgrade() -> None:
+    # Dropping the parent index drops the attached partition indexes with it
+    op.execute("DROP INDEX ix_warranties_live_filters")
+    with op.get_context().autocommit_block():
+        op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_warranties_live_filters ON warranties_live {COLUMNS}")
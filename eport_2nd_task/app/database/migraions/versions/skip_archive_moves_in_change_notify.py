@@ -0,0 +1,107 @@
+"""skip_archive_moves_in_change_notify
+
+Revision ID: skip_archive_moves_in_change_notify
+Revises: create_api_key_usage_daily_table
+Create Date: 2025-04-28 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "skip_archive_moves_in_change_notify"
+down_revision = "create_api_key_usage_daily_table"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Moving a row into warranties_archive fires AFTER DELETE on the live
+    # partition as well as AFTER INSERT on the archive. Both halves are now
+    # skipped, so an archive run no longer sends a "delete" per archived row
+    # (and overflows every stream subscriber's queue).
+    op.execute(
+        """
+    CREATE OR REPLACE FUNCTION notify_warranty_change()
+        RETURNS TRIGGER AS
+    $$
+    DECLARE
+        rec warranties;
+        change_op text;
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            -- Already reported when it was soft-deleted; this is the archive
+            -- job moving the row out of warranties_live
+            IF OLD.deleted_at IS NOT NULL THEN
+                RETURN NULL;
+            END IF;
+            rec := OLD;
+            change_op := 'delete';
+        ELSIF TG_OP = 'INSERT' THEN
+            IF NEW.archived THEN
+                RETURN NULL;
+            END IF;
+            rec := NEW;
+            change_op := 'insert';
+        ELSE
+            rec := NEW;
+            change_op := CASE WHEN NEW.deleted_at IS NOT NULL AND OLD.deleted_at IS NULL THEN 'delete' ELSE 'update' END;
+        END IF;
+
+        PERFORM pg_notify(
+            'warranty_changes',
+            json_build_object(
+                'id', rec.id,
+                'op', change_op,
+                'updated_at', rec.updated_at,
+                'status', rec.status,
+                'department', rec.department,
+                'category', rec.category
+            )::text
+        );
+        RETURN NULL;
+    END;
+    $$ language 'plpgsql';
+    """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+    CREATE OR REPLACE FUNCTION notify_warranty_change()
+        RETURNS TRIGGER AS
+    $$
+    DECLARE
+        rec warranties;
+        change_op text;
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            rec := OLD;
+            change_op := 'delete';
+        ELSIF TG_OP = 'INSERT' THEN
+            IF NEW.archived THEN
+                RETURN NULL;
+            END IF;
+            rec := NEW;
+            change_op := 'insert';
+        ELSE
+            rec := NEW;
+            change_op := CASE WHEN NEW.deleted_at IS NOT NULL AND OLD.deleted_at IS NULL THEN 'delete' ELSE 'update' END;
+        END IF;
+
+        PERFORM pg_notify(
+            'warranty_changes',
+            json_build_object(
+                'id', rec.id,
+                'op', change_op,
+                'updated_at', rec.updated_at,
+                'status', rec.status,
+                'department', rec.department,
+                'category', rec.category
+            )::text
+        );
+        RETURN NULL;
+    END;
+    $$ language 'plpgsql';
+    """
+    )
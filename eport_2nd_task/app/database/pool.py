@@ -0,0 +1,60 @@
+import itertools
+import time
+from collections import deque
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class PoolWaitTracker:
+    """
+    Records how long connection checkouts take.
+
+    `current_wait_ms` reports the larger of the oldest checkout still waiting
+    and the mean of checkouts completed within the last `window_seconds`, so
+    it falls back to zero once the pool has been quiet for a window.
+    """
+
+    def __init__(self, window_seconds: float = 5.0) -> None:
+        self.window_seconds = window_seconds
+        self._samples: deque[tuple[float, float]] = deque()
+        self._waiting: dict[int, float] = {}
+        self._tokens = itertools.count()
+
+    def start(self) -> int:
+        token = next(self._tokens)
+        self._waiting[token] = time.monotonic()
+        return token
+
+    def finish(self, token: int) -> None:
+        started = self._waiting.pop(token, None)
+        if started is not None:
+            now = time.monotonic()
+            self._samples.append((now, (now - started) * 1000))
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiting)
+
+    def current_wait_ms(self) -> float:
+        now = time.monotonic()
+        horizon = now - self.window_seconds
+        while self._samples and self._samples[0][0] < horizon:
+            self._samples.popleft()
+
+        oldest_waiting_ms = (now - min(self._waiting.values())) * 1000 if self._waiting else 0.0
+        recent_ms = sum(wait for _, wait in self._samples) / len(self._samples) if self._samples else 0.0
+        return max(oldest_waiting_ms, recent_ms)
+
+
+pool_wait_tracker = PoolWaitTracker()
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that reports checkout latency to `pool_wait_tracker`."""
+
+    def connect(self):
+        token = pool_wait_tracker.start()
+        try:
+            return super().connect()
+        finally:
+            pool_wait_tracker.finish(token)
@@ -1,8 +1,15 @@
-from sqlalchemy import and_, select, func
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import DateTime, and_, bindparam, case, insert, literal_column, or_, select, func, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import security
 from app.database.repositories.base import BaseRepository, db_error_handler
 from app.models.api_key import ApiKey
+from app.schemas.api_key import ApiKeyCreate
+
+# Columns the admin listing can be sorted by (newest first)
+API_KEY_SORT_COLUMNS = {"created_at": ApiKey.created_at, "last_used_at": ApiKey.last_used_at}
 
 
 class ApiKeyRepository(BaseRepository):
@@ -37,25 +44,62 @@ class ApiKeyRepository(BaseRepository):
 
         return result.ApiKey if result is not None else None
 
+    @staticmethod
+    def _list_conditions(*, include_inactive: bool = False, search: str | None = None) -> list:
+        conditions = [ApiKey.deleted_at.is_(None)]
+        if not include_inactive:
+            conditions.append(ApiKey.is_active.is_(True))
+        if search:
+            # Substring match, served by the ix_api_keys_name_trgm index
+            escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            conditions.append(ApiKey.name.ilike(f"%{escaped}%"))
+        return conditions
+
+    @staticmethod
+    def _sort_key(sort: str):
+        # NULLs (never used) sort last; matches the ix_api_keys_<sort>_id indexes
+        return func.coalesce(API_KEY_SORT_COLUMNS[sort], literal_column("'-infinity'"))
+
     @db_error_handler
-    async def get_all_api_keys(
+    async def list_api_keys(
         self,
         *,
-        skip: int = 0,
-        limit: int = 100,
+        limit: int = 50,
         include_inactive: bool = False,
+        search: str | None = None,
+        sort: str = "created_at",
+        after: tuple[datetime | None, int] | None = None,
     ) -> list[ApiKey]:
-        """Get all API keys with optional filtering."""
-        query = select(ApiKey).where(ApiKey.deleted_at.is_(None))
+        """
+        One page of API keys, newest `sort` value first.
 
-        if not include_inactive:
-            query = query.where(ApiKey.is_active.is_(True))
+        `after` is the (sort value, id) of the last key on the previous page;
+        paging seeks on the index instead of skipping rows.
+        """
+        sort_key = self._sort_key(sort)
+        conditions = self._list_conditions(include_inactive=include_inactive, search=search)
+        if after is not None:
+            after_value, after_id = after
+            if after_value is None:
+                after_key = literal_column("'-infinity'")
+            else:
+                # Both sort columns are timestamptz in the database
+                after_key = bindparam("after_value", after_value, type_=DateTime(timezone=True))
+            conditions.append(tuple_(sort_key, ApiKey.id) < tuple_(after_key, after_id))
 
-        query = query.order_by(ApiKey.created_at.desc()).offset(skip).limit(limit)
+        query = select(ApiKey).where(*conditions).order_by(sort_key.desc(), ApiKey.id.desc()).limit(limit)
 
-        raw_results = await self.connection.execute(query)
-        results = raw_results.scalars().all()
-        return results
+        raw_results = await self.connection.scalars(query)
+        return raw_results.all()
+
+    @db_error_handler
+    async def count_api_keys(self, *, include_inactive: bool = False, search: str | None = None) -> int:
+        """Number of API keys matching the listing filters."""
+        conditions = self._list_conditions(include_inactive=include_inactive, search=search)
+        query = select(func.count()).select_from(ApiKey).where(*conditions)
+
+        raw_result = await self.connection.execute(query)
+        return raw_result.scalar_one()
 
     @db_error_handler
     async def create_api_key(
@@ -64,6 +108,8 @@ class ApiKeyRepository(BaseRepository):
         key_hash: str,
         name: str,
         expires_at: str | None = None,
+        rate_limit_per_minute: int | None = None,
+        rate_limit_burst: int | None = None,
     ) -> ApiKey:
         """Create a new API key."""
         from datetime import datetime
@@ -80,6 +126,8 @@ class ApiKeyRepository(BaseRepository):
             name=name,
             is_active=True,
             expires_at=expires_datetime,
+            rate_limit_per_minute=rate_limit_per_minute,
+            rate_limit_burst=rate_limit_burst,
         )
         self.connection.add(api_key)
         await self.connection.commit()
@@ -87,42 +135,199 @@ class ApiKeyRepository(BaseRepository):
         return api_key
 
     @db_error_handler
-    async def deactivate_api_key(self, *, api_key: ApiKey) -> ApiKey:
-        """Deactivate an API key."""
-        api_key.is_active = False
-        self.connection.add(api_key)
+    async def create_api_keys(
+        self,
+        *,
+        api_keys_in: list[ApiKeyCreate],
+        signing_secret: str | None = None,
+    ) -> list[tuple[str, ApiKey]]:
+        """
+        Create many API keys in one transaction.
+
+        Keys are generated and hashed up front and inserted with multi-row
+        INSERT ... RETURNING. With `signing_secret` the keys are signed `wrs_`
+        keys. Returns (plain key, record) pairs in input order; the plain keys
+        are not stored anywhere.
+        """
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                "name": api_key_in.name,
+                "is_active": True,
+                "expires_at": now + timedelta(days=api_key_in.expires_days) if api_key_in.expires_days else None,
+                "rate_limit_per_minute": api_key_in.rate_limit_per_minute,
+                "rate_limit_burst": api_key_in.rate_limit_burst,
+            }
+            for api_key_in in api_keys_in
+        ]
+        plain_keys = await self._generate_keys(rows, signing_secret)
+
+        records = await self._insert_api_keys(rows)
         await self.connection.commit()
-        await self.connection.refresh(api_key)
-        return api_key
+        return list(zip(plain_keys, records))
 
     @db_error_handler
-    async def activate_api_key(self, *, api_key: ApiKey) -> ApiKey:
-        """Activate an API key."""
-        api_key.is_active = True
-        self.connection.add(api_key)
+    async def rotate_api_keys(
+        self,
+        *,
+        api_key_ids: list[int] | None,
+        overlap: timedelta,
+        signing_secret: str | None = None,
+    ) -> list[tuple[ApiKey, str, ApiKey]]:
+        """
+        Replace active API keys with new ones, in one transaction.
+
+        Each new key copies the name, expiry and rate limits of the key it
+        replaces. The old key keeps verifying until `overlap` from now, then
+        expires. Expired keys and keys that were already replaced are skipped,
+        so rotating again within the overlap only rotates the new keys.
+        `api_key_ids=None` rotates every active key; with
+        `signing_secret` the new keys are signed `wrs_` keys. Returns
+        (old record, new plain key, new record) triples.
+        """
+        query = (
+            select(ApiKey)
+            .where(
+                ApiKey.is_active.is_(True),
+                ApiKey.deleted_at.is_(None),
+                ApiKey.replaced_by_id.is_(None),
+                or_(ApiKey.expires_at.is_(None), ApiKey.expires_at > func.now()),
+            )
+            .order_by(ApiKey.id)
+            .with_for_update()
+        )
+        if api_key_ids is not None:
+            query = query.where(ApiKey.id.in_(api_key_ids))
+        old_keys = (await self.connection.scalars(query)).all()
+        if not old_keys:
+            await self.connection.commit()
+            return []
+
+        rows = [
+            {
+                "name": old_key.name,
+                "is_active": True,
+                "expires_at": old_key.expires_at,
+                "rate_limit_per_minute": old_key.rate_limit_per_minute,
+                "rate_limit_burst": old_key.rate_limit_burst,
+            }
+            for old_key in old_keys
+        ]
+        plain_keys = await self._generate_keys(rows, signing_secret)
+        new_keys = await self._insert_api_keys(rows)
+
+        overlap_until = datetime.now(timezone.utc) + overlap
+        expire_query = (
+            update(ApiKey)
+            .where(ApiKey.id.in_([old_key.id for old_key in old_keys]))
+            .values(
+                expires_at=func.least(func.coalesce(ApiKey.expires_at, overlap_until), overlap_until),
+                replaced_by_id=case(
+                    {old_key.id: new_key.id for old_key, new_key in zip(old_keys, new_keys)},
+                    value=ApiKey.id,
+                ),
+            )
+            .returning(ApiKey)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        # RETURNING refreshes the old records' expires_at and replaced_by_id in place
+        (await self.connection.scalars(expire_query)).all()
         await self.connection.commit()
-        await self.connection.refresh(api_key)
-        return api_key
+
+        return [
+            (old_key, api_key, new_key)
+            for old_key, api_key, new_key in zip(old_keys, plain_keys, new_keys)
+        ]
+
+    async def _generate_keys(self, rows: list[dict], signing_secret: str | None) -> list[str]:
+        """
+        Fill in `key_hash` on each row and return the plain keys.
+
+        Signed keys embed their id, so ids are drawn from the sequence up
+        front and inserted explicitly.
+        """
+        if signing_secret is None:
+            generated = security.generate_api_keys(len(rows))
+        else:
+            id_query = select(
+                func.nextval(func.pg_get_serial_sequence(ApiKey.__tablename__, "id"))
+            ).select_from(func.generate_series(1, len(rows)))
+            ids = (await self.connection.scalars(id_query)).all()
+            generated = []
+            for row, api_key_id in zip(rows, ids):
+                row["id"] = api_key_id
+                api_key = ApiKey.generate_key(api_key_id, row["expires_at"], signing_secret)
+                generated.append((api_key, security.hash_api_key(api_key)))
+        for row, (_, key_hash) in zip(rows, generated):
+            row["key_hash"] = key_hash
+        return [api_key for api_key, _ in generated]
+
+    async def _insert_api_keys(self, rows: list[dict]) -> list[ApiKey]:
+        """Insert API key rows, batched into multi-row VALUES, returning records in input order."""
+        query = insert(ApiKey).returning(ApiKey, sort_by_parameter_order=True)
+        return (await self.connection.scalars(query, rows)).all()
 
     @db_error_handler
-    async def update_last_used(self, *, api_key: ApiKey) -> ApiKey:
-        """Update the last used timestamp for an API key."""
-        from datetime import datetime, timezone
-        api_key.last_used_at = datetime.now(timezone.utc)
-        self.connection.add(api_key)
-        await self.connection.commit()
-        await self.connection.refresh(api_key)
-        return api_key
+    async def get_revocation_snapshot(self) -> tuple[list[int], dict[int, tuple[int | None, int | None]]]:
+        """
+        Ids of keys that must no longer verify (deactivated, deleted or
+        expired, including rotated keys past their overlap), and the rate
+        limits of keys that override the defaults.
+        """
+        revoked_query = select(ApiKey.id).where(
+            ApiKey.is_active.is_(False) | ApiKey.deleted_at.is_not(None) | (ApiKey.expires_at <= func.now())
+        )
+        revoked = (await self.connection.scalars(revoked_query)).all()
+
+        limits_query = select(ApiKey.id, ApiKey.rate_limit_per_minute, ApiKey.rate_limit_burst).where(
+            ApiKey.is_active.is_(True),
+            ApiKey.deleted_at.is_(None),
+            ApiKey.rate_limit_per_minute.is_not(None) | ApiKey.rate_limit_burst.is_not(None),
+        )
+        rows = await self.connection.execute(limits_query)
+        limits = {row.id: (row.rate_limit_per_minute, row.rate_limit_burst) for row in rows}
+        return list(revoked), limits
 
     @db_error_handler
-    async def delete_api_key(self, *, api_key: ApiKey) -> ApiKey:
-        """Soft delete an API key."""
-        from sqlalchemy import func
+    async def deactivate_api_key(self, *, api_key_id: int) -> ApiKey | None:
+        """Deactivate an API key; None when not found."""
+        return await self._update_api_key(api_key_id, {"is_active": False})
 
-        api_key.deleted_at = func.now()
-        api_key.is_active = False
-        self.connection.add(api_key)
+    @db_error_handler
+    async def activate_api_key(self, *, api_key_id: int) -> ApiKey | None:
+        """Activate an API key; None when not found."""
+        return await self._update_api_key(api_key_id, {"is_active": True})
+
+    @db_error_handler
+    async def update_rate_limit(
+        self,
+        *,
+        api_key_id: int,
+        rate_limit_per_minute: int | None,
+        rate_limit_burst: int | None,
+    ) -> ApiKey | None:
+        """Set the token-bucket limits of an API key; None when not found."""
+        return await self._update_api_key(
+            api_key_id,
+            {"rate_limit_per_minute": rate_limit_per_minute, "rate_limit_burst": rate_limit_burst},
+        )
+
+    @db_error_handler
+    async def delete_api_key(self, *, api_key_id: int) -> ApiKey | None:
+        """Soft delete an API key; None when not found."""
+        return await self._update_api_key(api_key_id, {"deleted_at": func.now(), "is_active": False})
+
+    async def _update_api_key(self, api_key_id: int, values: dict) -> ApiKey | None:
+        """Apply `values` to a non-deleted API key with one UPDATE ... RETURNING."""
+        query = (
+            update(ApiKey)
+            .where(ApiKey.id == api_key_id, ApiKey.deleted_at.is_(None))
+            .values(**values)
+            .returning(ApiKey)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+
+        raw_result = await self.connection.execute(query)
+        api_key = raw_result.scalar_one_or_none()
         await self.connection.commit()
-        await self.connection.refresh(api_key)
         return api_key
-
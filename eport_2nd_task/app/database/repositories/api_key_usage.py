@@ -0,0 +1,96 @@
+from datetime import date, datetime
+
+from sqlalchemy import Row, bindparam, func, literal_column, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.repositories.base import BaseRepository, db_error_handler
+from app.models.api_key import ApiKey
+from app.models.api_key_usage import ApiKeyUsageDaily
+
+# Rows per multi-row upsert; keeps each statement well under the bind parameter limit
+USAGE_UPSERT_CHUNK = 1000
+
+
+class ApiKeyUsageRepository(BaseRepository):
+    def __init__(self, conn: AsyncSession) -> None:
+        super().__init__(conn)
+
+    @db_error_handler
+    async def add_usage(self, *, usage: list[dict], last_used: dict[int, datetime]) -> None:
+        """
+        Add counter deltas to api_key_usage_daily and advance last_used_at, in
+        one transaction.
+
+        `usage` rows hold api_key_id, day, requests, bytes_out, errors and
+        latency_ms_sum. Every write is additive (or GREATEST for last_used_at),
+        so workers can flush concurrently; rows are written in key order so
+        two flushes cannot deadlock on each other.
+        """
+        usage = sorted(usage, key=lambda row: (row["api_key_id"], row["day"]))
+        for start in range(0, len(usage), USAGE_UPSERT_CHUNK):
+            query = insert(ApiKeyUsageDaily).values(usage[start : start + USAGE_UPSERT_CHUNK])
+            query = query.on_conflict_do_update(
+                index_elements=[ApiKeyUsageDaily.api_key_id, ApiKeyUsageDaily.day],
+                set_={
+                    "requests": ApiKeyUsageDaily.requests + query.excluded.requests,
+                    "bytes_out": ApiKeyUsageDaily.bytes_out + query.excluded.bytes_out,
+                    "errors": ApiKeyUsageDaily.errors + query.excluded.errors,
+                    "latency_ms_sum": ApiKeyUsageDaily.latency_ms_sum + query.excluded.latency_ms_sum,
+                },
+            )
+            await self.connection.execute(query)
+
+        if last_used:
+            query = (
+                update(ApiKey.__table__)
+                .where(ApiKey.__table__.c.id == bindparam("b_id"))
+                .values(
+                    last_used_at=func.greatest(
+                        func.coalesce(ApiKey.__table__.c.last_used_at, literal_column("'-infinity'")),
+                        bindparam("b_last_used_at"),
+                    )
+                )
+            )
+            await self.connection.execute(
+                query,
+                [{"b_id": api_key_id, "b_last_used_at": last_used[api_key_id]} for api_key_id in sorted(last_used)],
+            )
+
+        await self.connection.commit()
+
+    @db_error_handler
+    async def get_daily_usage(self, *, api_key_id: int, date_from: date, date_to: date) -> list[ApiKeyUsageDaily]:
+        """Usage rows of one key between two days, inclusive, oldest first."""
+        query = (
+            select(ApiKeyUsageDaily)
+            .where(
+                ApiKeyUsageDaily.api_key_id == api_key_id,
+                ApiKeyUsageDaily.day >= date_from,
+                ApiKeyUsageDaily.day <= date_to,
+            )
+            .order_by(ApiKeyUsageDaily.day)
+        )
+
+        raw_results = await self.connection.scalars(query)
+        return raw_results.all()
+
+    @db_error_handler
+    async def get_usage_totals(self, *, api_key_ids: list[int], since: date) -> dict[int, Row]:
+        """Summed usage per key from `since` on, for the given keys; keys without usage are absent."""
+        if not api_key_ids:
+            return {}
+        query = (
+            select(
+                ApiKeyUsageDaily.api_key_id,
+                func.sum(ApiKeyUsageDaily.requests).label("requests"),
+                func.sum(ApiKeyUsageDaily.bytes_out).label("bytes_out"),
+                func.sum(ApiKeyUsageDaily.errors).label("errors"),
+                func.sum(ApiKeyUsageDaily.latency_ms_sum).label("latency_ms_sum"),
+            )
+            .where(ApiKeyUsageDaily.api_key_id.in_(api_key_ids), ApiKeyUsageDaily.day >= since)
+            .group_by(ApiKeyUsageDaily.api_key_id)
+        )
+
+        raw_results = await self.connection.execute(query)
+        return {row.api_key_id: row for row in raw_results.all()}
@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.repositories.base import BaseRepository, db_error_handler
+from app.models.idempotency_key import IdempotencyKey
+
+
+class IdempotencyKeyRepository(BaseRepository):
+    def __init__(self, conn: AsyncSession) -> None:
+        super().__init__(conn)
+
+    @db_error_handler
+    async def get_idempotency_key(self, *, scope: str, key: str) -> IdempotencyKey | None:
+        """Get an unexpired idempotency key."""
+        query = select(IdempotencyKey).where(
+            and_(
+                IdempotencyKey.scope == scope,
+                IdempotencyKey.key == key,
+                IdempotencyKey.expires_at > func.now(),
+            )
+        ).limit(1)
+
+        raw_result = await self.connection.execute(query)
+        result = raw_result.fetchone()
+
+        return result.IdempotencyKey if result is not None else None
+
+    @db_error_handler
+    async def reserve_idempotency_key(
+        self,
+        *,
+        scope: str,
+        key: str,
+        request_fingerprint: str,
+        ttl_seconds: int,
+        pending_lease_seconds: int,
+    ) -> int | None:
+        """
+        Claim a key for a new request, taking over an expired row if there is one.
+
+        A row without a stored response that is older than `pending_lease_seconds`
+        is taken over too: its request committed but never saved its response.
+        The row is written but not committed, so it becomes visible together with
+        whatever the request commits next. Returns the row id, or None when a
+        live row already holds the key.
+        """
+        expires_at = func.now() + timedelta(seconds=ttl_seconds)
+        query = insert(IdempotencyKey).values(
+            scope=scope,
+            key=key,
+            request_fingerprint=request_fingerprint,
+            expires_at=expires_at,
+        )
+        query = query.on_conflict_do_update(
+            constraint="uq_idempotency_keys_scope_key",
+            set_={
+                "request_fingerprint": request_fingerprint,
+                "response_status": None,
+                "response_body": None,
+                "created_at": func.now(),
+                "expires_at": expires_at,
+            },
+            where=or_(
+                IdempotencyKey.expires_at <= func.now(),
+                and_(
+                    IdempotencyKey.response_status.is_(None),
+                    IdempotencyKey.created_at <= func.now() - timedelta(seconds=pending_lease_seconds),
+                ),
+            ),
+        ).returning(IdempotencyKey.id)
+
+        raw_result = await self.connection.execute(query)
+        return raw_result.scalar_one_or_none()
+
+    @db_error_handler
+    async def save_response(self, *, idempotency_key_id: int, status_code: int, body: str) -> None:
+        """Store the response to replay for retries of the same key."""
+        query = (
+            update(IdempotencyKey)
+            .where(IdempotencyKey.id == idempotency_key_id)
+            .values(response_status=status_code, response_body=body)
+        )
+        await self.connection.execute(query)
+        await self.connection.commit()
+
+    @db_error_handler
+    async def release_idempotency_key(self, *, idempotency_key_id: int) -> None:
+        """Drop a reservation whose request failed so the client can retry it."""
+        query = delete(IdempotencyKey).where(IdempotencyKey.id == idempotency_key_id)
+        await self.connection.execute(query)
+        await self.connection.commit()
+
+    @db_error_handler
+    async def delete_expired_keys(self) -> int:
+        """Delete expired idempotency keys and return how many were removed."""
+        query = delete(IdempotencyKey).where(IdempotencyKey.expires_at <= func.now())
+
+        raw_result = await self.connection.execute(query)
+        await self.connection.commit()
+        return raw_result.rowcount
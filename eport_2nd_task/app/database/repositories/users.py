@@ -1,6 +1,7 @@
-from sqlalchemy import and_, func, or_, select
+from sqlalchemy import and_, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncConnection
 
+from app.core import security
 from app.database.repositories.base import BaseRepository, db_error_handler
 from app.models.user import User
 from app.schemas.user import UserInCreate, UserInDB, UserInUpdate
@@ -72,24 +73,36 @@ class UsersRepository(BaseRepository):
         return created_user
 
     @db_error_handler
-    async def update_user(self, *, user: User, user_in: UserInUpdate) -> User:
-        user_in_obj = user_in.model_dump(exclude_unset=True)
-        if user_in.password:
-            user.change_password(user_in.password)
+    async def update_user(self, *, user_id: int, user_in: UserInUpdate) -> User | None:
+        """
+        Update an active user with one UPDATE ... RETURNING.
 
-        for key, val in user_in_obj.items():
-            setattr(user, key, val)
+        Returns None when no active user has that id.
+        """
+        values = user_in.model_dump(exclude_unset=True, exclude={"password"})
+        if user_in.password:
+            salt = security.generate_salt()
+            values.update(salt=salt, hashed_password=security.get_password_hash(salt + user_in.password))
+        if not values:
+            return await self.get_user_by_id(user_id=user_id)
 
-        self.connection.add(user)
-        await self.connection.commit()
-        await self.connection.refresh(user)
-        return user
+        return await self._update_active_user(user_id, values)
 
     @db_error_handler
-    async def delete_user(self, *, user: User) -> User:
-        user.deleted_at = func.now()
+    async def delete_user(self, *, user_id: int) -> User | None:
+        """Soft delete an active user with one UPDATE ... RETURNING; None when not found."""
+        return await self._update_active_user(user_id, {"deleted_at": func.now()})
+
+    async def _update_active_user(self, user_id: int, values: dict) -> User | None:
+        query = (
+            update(User)
+            .where(User.id == user_id, User.deleted_at.is_(None))
+            .values(**values)
+            .returning(User)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
 
-        self.connection.add(user)
+        raw_result = await self.connection.execute(query)
+        user = raw_result.scalar_one_or_none()
         await self.connection.commit()
-        await self.connection.refresh(user)
         return user
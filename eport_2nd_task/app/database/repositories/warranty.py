@@ -1,8 +1,14 @@
-from sqlalchemy import and_, select
+import json
+from datetime import date, timedelta
+
+from sqlalchemy import Integer, Row, and_, any_, bindparam, func, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncConnection
 
 from app.database.repositories.base import BaseRepository, db_error_handler
 from app.models.warranty import Warranty
+from app.models.warranty_rollup import WarrantyMonthlyRollup
+from app.models.warranty_summary import WarrantySummary
 from app.schemas.warranty import WarrantyInCreate, WarrantyInUpdate
 
 
@@ -12,13 +18,54 @@ class WarrantyRepository(BaseRepository):
 
     @db_error_handler
     async def get_warranty_by_id(self, *, warranty_id: int) -> Warranty | None:
-        query = select(Warranty).where(and_(Warranty.id == warranty_id, Warranty.deleted_at.is_(None))).limit(1)
+        query = (
+            select(Warranty)
+            .where(and_(Warranty.id == warranty_id, Warranty.archived.is_(False), Warranty.deleted_at.is_(None)))
+            .limit(1)
+        )
 
         raw_result = await self.connection.execute(query)
         result = raw_result.fetchone()
 
         return result.Warranty if result is not None else None
 
+    @db_error_handler
+    async def get_warranties_by_ids(self, *, warranty_ids: list[int]) -> list[Warranty]:
+        """
+        Live warranties with the given ids, in no particular order.
+
+        The ids go in as one array parameter (`id = ANY($1)`), so every batch
+        size shares the same prepared statement.
+        """
+        ids = bindparam("warranty_ids", warranty_ids, type_=ARRAY(Integer))
+        query = select(Warranty).where(
+            Warranty.id == any_(ids),
+            Warranty.archived.is_(False),
+            Warranty.deleted_at.is_(None),
+        )
+
+        raw_results = await self.connection.execute(query)
+        return raw_results.scalars().all()
+
+    @staticmethod
+    def _live_filter_conditions(
+        *,
+        status: str | None = None,
+        department: str | None = None,
+        category: str | None = None,
+    ) -> list:
+        # archived = false lets the planner prune the archive partition
+        conditions = [Warranty.archived.is_(False), Warranty.deleted_at.is_(None)]
+
+        if status:
+            conditions.append(Warranty.status == status)
+        if department:
+            conditions.append(Warranty.department == department)
+        if category:
+            conditions.append(Warranty.category == category)
+
+        return conditions
+
     @db_error_handler
     async def get_filtered_warranties(
         self,
@@ -28,21 +75,171 @@ class WarrantyRepository(BaseRepository):
         status: str | None = None,
         department: str | None = None,
         category: str | None = None,
-    ) -> list[Warranty]:
-        query = select(Warranty).where(Warranty.deleted_at.is_(None))
+        fields: list[str] | None = None,
+    ) -> list[Warranty] | list[Row]:
+        """
+        Get live warranties matching the filters.
+
+        When `fields` is given only those columns are selected and plain rows
+        are returned instead of `Warranty` instances.
+        """
+        conditions = self._live_filter_conditions(status=status, department=department, category=category)
+        if fields:
+            query = select(*[getattr(Warranty, field) for field in fields])
+        else:
+            query = select(Warranty)
+        query = query.where(*conditions).offset(skip).limit(limit)
+
+        raw_results = await self.connection.execute(query)
+        if fields:
+            return raw_results.all()
+        results = raw_results.scalars().all()
+        return results
+
+    @db_error_handler
+    async def count_filtered_warranties(
+        self,
+        *,
+        status: str | None = None,
+        department: str | None = None,
+        category: str | None = None,
+    ) -> int:
+        """Exact count of live warranties; the predicate matches ix_warranties_live_filters."""
+        conditions = self._live_filter_conditions(status=status, department=department, category=category)
+        query = select(func.count()).select_from(Warranty).where(*conditions)
+
+        raw_result = await self.connection.execute(query)
+        return raw_result.scalar_one()
+
+    @db_error_handler
+    async def estimate_filtered_warranties(
+        self,
+        *,
+        status: str | None = None,
+        department: str | None = None,
+        category: str | None = None,
+    ) -> int:
+        """
+        Planner estimate of live warranties matching the filters.
+
+        Unfiltered requests read `reltuples` of the live-row partial index on
+        the warranties_live partition (the partitioned parent index has none);
+        filtered requests take the row estimate from EXPLAIN.
+        """
+        filters = {"status": status, "department": department, "category": category}
+        filters = {column: value for column, value in filters.items() if value}
+
+        if not filters:
+            query = text("SELECT reltuples::bigint FROM pg_class WHERE relname = 'ix_warranties_live_live_filters'")
+            raw_result = await self.connection.execute(query)
+            estimate = raw_result.scalar_one_or_none()
+            # reltuples is -1 (or missing) until the index has been analyzed
+            if estimate is not None and estimate >= 0:
+                return estimate
+            return await self.count_filtered_warranties()
+
+        where_clause = " AND ".join(["NOT archived", "deleted_at IS NULL", *[f"{column} = :{column}" for column in filters]])
+        query = text(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM warranties WHERE {where_clause}")
+
+        raw_result = await self.connection.execute(query, filters)
+        plan = raw_result.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    @db_error_handler
+    async def get_department_summaries(self, *, department: str | None = None) -> list[Row]:
+        """
+        Live asset count, cost and under-warranty count per department and
+        category, read from the trigger-maintained warranty_summaries table.
+        """
+        query = (
+            select(
+                WarrantySummary.department,
+                WarrantySummary.category,
+                func.sum(WarrantySummary.asset_count).label("asset_count"),
+                func.sum(WarrantySummary.total_cost).label("total_cost"),
+                func.coalesce(
+                    func.sum(WarrantySummary.asset_count).filter(WarrantySummary.expires_on >= func.current_date()), 0
+                ).label("under_warranty_count"),
+            )
+            .group_by(WarrantySummary.department, WarrantySummary.category)
+            .having(func.sum(WarrantySummary.asset_count) > 0)
+            .order_by(WarrantySummary.department, WarrantySummary.category)
+        )
+        if department:
+            query = query.where(WarrantySummary.department == department)
 
+        raw_results = await self.connection.execute(query)
+        return raw_results.all()
+
+    @db_error_handler
+    async def get_monthly_rollups(
+        self,
+        *,
+        month_from: date,
+        month_to: date,
+        group_by: list[str],
+        status: str | None = None,
+        department: str | None = None,
+        category: str | None = None,
+    ) -> list[Row]:
+        """
+        Registrations and expiries per month between `month_from` and
+        `month_to` (first days of months, inclusive), broken down by the
+        `group_by` columns, from the trigger-maintained rollup table.
+        """
+        group_columns = [getattr(WarrantyMonthlyRollup, field) for field in group_by]
+        conditions = [WarrantyMonthlyRollup.month >= month_from, WarrantyMonthlyRollup.month <= month_to]
         if status:
-            query = query.where(Warranty.status == status)
+            conditions.append(WarrantyMonthlyRollup.status == status)
         if department:
-            query = query.where(Warranty.department == department)
+            conditions.append(WarrantyMonthlyRollup.department == department)
         if category:
-            query = query.where(Warranty.category == category)
+            conditions.append(WarrantyMonthlyRollup.category == category)
 
-        query = query.offset(skip).limit(limit)
+        query = (
+            select(
+                WarrantyMonthlyRollup.month,
+                *group_columns,
+                func.sum(WarrantyMonthlyRollup.registered_count).label("registered_count"),
+                func.sum(WarrantyMonthlyRollup.expiring_count).label("expiring_count"),
+            )
+            .where(*conditions)
+            .group_by(WarrantyMonthlyRollup.month, *group_columns)
+            .having(
+                (func.sum(WarrantyMonthlyRollup.registered_count) > 0)
+                | (func.sum(WarrantyMonthlyRollup.expiring_count) > 0)
+            )
+            .order_by(WarrantyMonthlyRollup.month, *group_columns)
+        )
 
         raw_results = await self.connection.execute(query)
-        results = raw_results.scalars().all()
-        return results
+        return raw_results.all()
+
+    @db_error_handler
+    async def get_warranty_changes(self, *, after_txid: int, after_id: int, limit: int = 500) -> list[Warranty]:
+        """
+        Warranties written after the (change_txid, id) position, in that order.
+
+        Rows whose transaction id is at or above the snapshot's xmin may
+        belong to transactions that are still running, and such a transaction
+        can commit after a later one. They are held back until every older
+        transaction has finished, so a caller that advances its watermark
+        never skips a row.
+        """
+        query = (
+            select(Warranty)
+            .where(
+                tuple_(Warranty.change_txid, Warranty.id) > tuple_(after_txid, after_id),
+                Warranty.change_txid < func.txid_snapshot_xmin(func.txid_current_snapshot()),
+            )
+            .order_by(Warranty.change_txid, Warranty.id)
+            .limit(limit)
+        )
+
+        raw_results = await self.connection.execute(query)
+        return raw_results.scalars().all()
 
     @db_error_handler
     async def create_warranty(self, *, warranty_in: WarrantyInCreate) -> Warranty:
@@ -53,25 +250,151 @@ class WarrantyRepository(BaseRepository):
         return created_warranty
 
     @db_error_handler
-    async def update_warranty(self, *, warranty: Warranty, warranty_in: WarrantyInUpdate) -> Warranty:
-        warranty_in_obj = warranty_in.model_dump(exclude_unset=True)
+    async def update_warranty(
+        self,
+        *,
+        warranty_id: int,
+        warranty_in: WarrantyInUpdate,
+        expected_versions: list[int] | None = None,
+    ) -> Warranty | None:
+        """
+        Update a live warranty with one UPDATE ... RETURNING.
+
+        With `expected_versions` the row is only written while its version is
+        one of them. Returns None when no live warranty has that id or the
+        version did not match.
+        """
+        values = warranty_in.model_dump(exclude_unset=True)
+        if not values:
+            warranty = await self.get_warranty_by_id(warranty_id=warranty_id)
+            if warranty is not None and expected_versions is not None and warranty.version not in expected_versions:
+                return None
+            return warranty
+
+        return await self._update_live_warranty(warranty_id, values, expected_versions)
+
+    @db_error_handler
+    async def delete_warranty(self, *, warranty_id: int) -> Warranty | None:
+        """Soft delete a live warranty with one UPDATE ... RETURNING; None when not found."""
+        return await self._update_live_warranty(warranty_id, {"deleted_at": func.now()})
+
+    async def _update_live_warranty(
+        self,
+        warranty_id: int,
+        values: dict,
+        expected_versions: list[int] | None = None,
+    ) -> Warranty | None:
+        conditions = [Warranty.id == warranty_id, Warranty.archived.is_(False), Warranty.deleted_at.is_(None)]
+        if expected_versions is not None:
+            conditions.append(Warranty.version.in_(expected_versions))
 
-        for key, val in warranty_in_obj.items():
-            setattr(warranty, key, val)
+        query = (
+            update(Warranty)
+            .where(*conditions)
+            .values(**values, version=Warranty.version + 1)
+            .returning(Warranty)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
 
-        self.connection.add(warranty)
+        raw_result = await self.connection.execute(query)
+        warranty = raw_result.scalar_one_or_none()
         await self.connection.commit()
-        await self.connection.refresh(warranty)
         return warranty
 
+    def _bulk_target_conditions(
+        self,
+        *,
+        after_id: int,
+        ids: list[int] | None = None,
+        status: str | None = None,
+        department: str | None = None,
+        category: str | None = None,
+    ) -> list:
+        conditions = self._live_filter_conditions(status=status, department=department, category=category)
+        if ids is not None:
+            conditions.append(Warranty.id == any_(bindparam("warranty_ids", ids, type_=ARRAY(Integer))))
+        conditions.append(Warranty.id > after_id)
+        return conditions
+
+    @db_error_handler
+    async def count_bulk_update_targets(self, *, after_id: int = 0, ids: list[int] | None = None, **filters) -> int:
+        """Live warranties with id > after_id that a bulk update with these ids or filters would change."""
+        conditions = self._bulk_target_conditions(after_id=after_id, ids=ids, **filters)
+        query = select(func.count()).select_from(Warranty).where(*conditions)
+
+        raw_result = await self.connection.execute(query)
+        return raw_result.scalar_one()
+
     @db_error_handler
-    async def delete_warranty(self, *, warranty: Warranty) -> Warranty:
-        from sqlalchemy import func
+    async def bulk_update_warranties(
+        self,
+        *,
+        warranty_in: WarrantyInUpdate,
+        after_id: int = 0,
+        batch_size: int = 500,
+        ids: list[int] | None = None,
+        **filters,
+    ) -> tuple[list[int], bool]:
+        """
+        Apply `warranty_in` to the next `batch_size` matching live warranties
+        (by id, after `after_id`) in one UPDATE, and return the changed ids
+        and whether more matching rows remain.
+
+        The conditions are repeated on the UPDATE itself so a row that stopped
+        matching between the batch select and the write is left alone.
+        """
+        conditions = self._bulk_target_conditions(after_id=after_id, ids=ids, **filters)
+        batch = select(Warranty.id).where(*conditions).order_by(Warranty.id).limit(batch_size).scalar_subquery()
+        query = (
+            update(Warranty)
+            .where(Warranty.id.in_(batch), *conditions)
+            .values(**warranty_in.model_dump(exclude_unset=True), version=Warranty.version + 1)
+            .returning(Warranty.id)
+            .execution_options(synchronize_session=False)
+        )
+
+        raw_result = await self.connection.execute(query)
+        updated_ids = sorted(raw_result.scalars().all())
 
-        warranty.deleted_at = func.now()
+        last_id = updated_ids[-1] if updated_ids else after_id
+        remaining = self._bulk_target_conditions(after_id=last_id, ids=ids, **filters)
+        raw_result = await self.connection.execute(select(select(Warranty.id).where(*remaining).exists()))
+        has_more = raw_result.scalar_one()
 
-        self.connection.add(warranty)
         await self.connection.commit()
-        await self.connection.refresh(warranty)
-        return warranty
+        return updated_ids, has_more
+
+    @db_error_handler
+    async def archive_deleted_warranties(self, *, older_than_days: int, batch_size: int = 1000) -> int:
+        """
+        Move warranties soft-deleted more than `older_than_days` ago into the
+        archive partition and return how many were moved.
+
+        Rows move in batches, each committed on its own, so the job never
+        holds long locks. SKIP LOCKED leaves rows that are being written to
+        for the next run.
+        """
+        cutoff = func.now() - timedelta(days=older_than_days)
+        archived = 0
+
+        while True:
+            batch = (
+                select(Warranty.id)
+                .where(Warranty.archived.is_(False), Warranty.deleted_at < cutoff)
+                .order_by(Warranty.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            query = (
+                update(Warranty)
+                .where(Warranty.archived.is_(False), Warranty.id.in_(batch))
+                .values(archived=True)
+                .execution_options(synchronize_session=False)
+            )
 
+            raw_result = await self.connection.execute(query)
+            await self.connection.commit()
+            archived += raw_result.rowcount
+            if raw_result.rowcount < batch_size:
+                return archived
@@ -0,0 +1,63 @@
+import asyncio
+import logging
+import time
+from itertools import combinations
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.database.repositories.api_key import ApiKeyRepository
+from app.database.repositories.warranty import WarrantyRepository
+
+logger = logging.getLogger(__name__)
+
+# Every combination of the warranty list's filters; each one compiles to a
+# different statement, so each needs its own warm-up.
+WARRANTY_FILTERS = ("status", "department", "category")
+WARRANTY_FILTER_VARIANTS: tuple[dict[str, str], ...] = tuple(dict.fromkeys(names, "warmup") for size in range(len(WARRANTY_FILTERS) + 1) for names in combinations(WARRANTY_FILTERS, size))
+
+
+async def _run_hot_queries(session: AsyncSession) -> None:
+    api_key_repo = ApiKeyRepository(session)
+    warranty_repo = WarrantyRepository(session)
+
+    await api_key_repo.get_api_key_by_hash(key_hash="warmup")
+    await warranty_repo.get_warranty_by_id(warranty_id=0)
+    for filters in WARRANTY_FILTER_VARIANTS:
+        await warranty_repo.get_filtered_warranties(skip=0, limit=1, **filters)
+
+
+async def warm_up_pool(session_factory: sessionmaker, connections: int, timeout_seconds: float) -> bool:
+    """
+    Open `connections` pool connections in parallel and run the hot
+    repository queries on each.
+
+    asyncpg prepares statements per connection, so every connection runs the
+    queries. All sessions stay open until the others have finished,
+    which makes the pool open distinct connections instead of reusing one.
+    Returns False if warm-up failed or timed out. Startup continues either
+    way.
+    """
+    started = time.monotonic()
+    barrier = asyncio.Barrier(connections)
+
+    async def warm_one() -> None:
+        async with session_factory() as session:
+            try:
+                await _run_hot_queries(session)
+                await barrier.wait()
+            except BaseException:
+                await barrier.abort()
+                raise
+
+    try:
+        async with asyncio.timeout(timeout_seconds):
+            async with asyncio.TaskGroup() as group:
+                for _ in range(connections):
+                    group.create_task(warm_one())
+    except Exception as e:
+        logger.warning("Database pool warm-up failed after %.2fs: %r", time.monotonic() - started, e)
+        return False
+
+    logger.info("Warmed %s database connections in %.2fs.", connections, time.monotonic() - started)
+    return True
@@ -1,20 +1,27 @@
+import logging
+from functools import lru_cache
 from pathlib import Path
 
 from asgi_correlation_id import CorrelationIdMiddleware
 from fastapi import FastAPI
 from fastapi.exceptions import HTTPException, RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.openapi.docs import (
-    get_redoc_html,
-    get_swagger_ui_html,
-    get_swagger_ui_oauth2_redirect_html,
-)
 from fastapi.responses import FileResponse
 from starlette.staticfiles import StaticFiles
 
+from app.api.health import router as health_router
 from app.api.v1 import api_router
 from app.core import settings
 from app.core.events import create_start_app_handler, create_stop_app_handler
+from app.core.usage import ApiKeyUsageRecorder
+from app.middlewares import (
+    AccessLogMiddleware,
+    AccessLogSampler,
+    AccessLogWriter,
+    AdmissionControlMiddleware,
+    ApiKeyUsageMiddleware,
+    SampleRule,
+)
 from app.utils import (
     AppExceptionCase,
     CustomizeLogger,
@@ -23,27 +30,66 @@ from app.utils import (
     request_validation_exception_handler,
 )
 
-# Resolve logging config path - try multiple locations
+# Candidate logging config locations, in order of preference
 _logging_config_paths = [
     Path(__file__).with_name("logging_conf.json"),  # Same directory as main.py
-    Path(__file__).parent / "logging_conf.json",     # Explicit parent directory
     Path("app/logging_conf.json"),                    # Relative to working directory
     Path("/data/backend/app/logging_conf.json"),     # Absolute path in container
 ]
 
-config_path = None
-for path in _logging_config_paths:
-    if path.exists():
-        config_path = path
-        break
 
-if config_path is None:
+@lru_cache
+def get_logging_config_path() -> Path:
+    for path in _logging_config_paths:
+        if path.exists():
+            return path
     # Fallback: use the first path and let it fail with a clearer error
-    config_path = _logging_config_paths[0]
+    return _logging_config_paths[0]
+
+
+def _add_docs_routes(_app: FastAPI) -> None:
+    from fastapi.openapi.docs import (
+        get_redoc_html,
+        get_swagger_ui_html,
+        get_swagger_ui_oauth2_redirect_html,
+    )
+
+    @_app.get("/docs", include_in_schema=False)
+    async def custom_swagger_ui_html():
+        return get_swagger_ui_html(
+            openapi_url=_app.openapi_url,
+            title=_app.title + " - Swagger UI custom",
+            oauth2_redirect_url=_app.swagger_ui_oauth2_redirect_url,
+            swagger_js_url=f"{settings.openapi_prefix}/static/swagger-ui-bundle.js",
+            swagger_css_url=f"{settings.openapi_prefix}/static/swagger-ui.css",
+        )
+
+    @_app.get(_app.swagger_ui_oauth2_redirect_url, include_in_schema=False)
+    async def swagger_ui_redirect():
+        return get_swagger_ui_oauth2_redirect_html()
+
+    @_app.get("/redoc", include_in_schema=False)
+    async def redoc_html():
+        return get_redoc_html(
+            openapi_url=_app.openapi_url,
+            title=_app.title + " - ReDoc",
+            redoc_js_url=f"{settings.openapi_prefix}/static/redoc.standalone.js",
+        )
+
 
+def create_app(*, include_docs: bool | None = None) -> FastAPI:
+    """
+    Build the application.
+
+    `include_docs=False` leaves out /docs, /redoc and /openapi.json entirely,
+    which is what production workers want. Defaults to `settings.docs_enabled`.
+    """
+    if include_docs is None:
+        include_docs = settings.docs_enabled
 
-def create_app() -> FastAPI:
     fastapi_kwargs = settings.fastapi_kwargs.copy()
+    if not include_docs:
+        fastapi_kwargs.update({"docs_url": None, "redoc_url": None, "openapi_url": None})
     fastapi_kwargs.update({
         "description": """
         **Warranty Register API**
@@ -69,6 +115,11 @@ def create_app() -> FastAPI:
     })
     _app = FastAPI(**fastapi_kwargs)
 
+    if settings.api_key_usage_enabled:
+        # Innermost: only needs the status and body of the routed response
+        _app.state.api_key_usage = ApiKeyUsageRecorder()
+        _app.add_middleware(ApiKeyUsageMiddleware, recorder=_app.state.api_key_usage)
+
     _app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.allowed_hosts,
@@ -78,7 +129,37 @@ def create_app() -> FastAPI:
     )
 
     _app.add_middleware(CorrelationIdMiddleware)
-    _app.logger = CustomizeLogger.make_logger(config_path)
+
+    if settings.admission_control_enabled:
+        # Added last so it runs first and sheds before any other work is done
+        _app.add_middleware(
+            AdmissionControlMiddleware,
+            max_in_flight=settings.admission_max_in_flight,
+            max_pool_wait_ms=settings.admission_max_pool_wait_ms,
+            priority_reserve=settings.admission_priority_reserve,
+            exempt_paths=settings.admission_exempt_paths,
+            priority_paths=settings.admission_priority_paths,
+            retry_after_seconds=settings.admission_retry_after_seconds,
+        )
+
+    if settings.access_log_enabled:
+        # Outermost, so shed requests are logged too
+        _app.state.access_log_writer = AccessLogWriter(maxsize=settings.access_log_queue_size, path=settings.access_log_path)
+        _app.add_middleware(
+            AccessLogMiddleware,
+            writer=_app.state.access_log_writer,
+            sampler=AccessLogSampler(
+                [SampleRule(**rule) for rule in settings.access_log_sample_rules],
+                default_rate=settings.access_log_default_sample_rate,
+            ),
+        )
+
+    _app.logger = CustomizeLogger.make_logger(get_logging_config_path())
+    if settings.access_log_enabled:
+        # Replaced by AccessLogMiddleware; uvicorn's access records would
+        # otherwise still go through InterceptHandler one by one
+        logging.getLogger("uvicorn.access").disabled = True
+    _app.include_router(health_router, tags=["health"])
     _app.include_router(api_router, prefix=settings.api_v1_prefix)
     _app.mount("/static", StaticFiles(directory="app/static"))
 
@@ -92,27 +173,8 @@ def create_app() -> FastAPI:
         """Serve the Admin Panel for API key management."""
         return FileResponse(Path(__file__).parent / "static" / "admin.html")
 
-    @_app.get("/docs", include_in_schema=False)
-    async def custom_swagger_ui_html():
-        return get_swagger_ui_html(
-            openapi_url=_app.openapi_url,
-            title=_app.title + " - Swagger UI custom",
-            oauth2_redirect_url=_app.swagger_ui_oauth2_redirect_url,
-            swagger_js_url=f"{settings.openapi_prefix}/static/swagger-ui-bundle.js",
-            swagger_css_url=f"{settings.openapi_prefix}/static/swagger-ui.css",
-        )
-
-    @_app.get(_app.swagger_ui_oauth2_redirect_url, include_in_schema=False)
-    async def swagger_ui_redirect():
-        return get_swagger_ui_oauth2_redirect_html()
-
-    @_app.get("/redoc", include_in_schema=False)
-    async def redoc_html():
-        return get_redoc_html(
-            openapi_url=_app.openapi_url,
-            title=_app.title + " - ReDoc",
-            redoc_js_url=f"{settings.openapi_prefix}/static/redoc.standalone.js",
-        )
+    if include_docs:
+        _add_docs_routes(_app)
 
     @_app.exception_handler(HTTPException)
     async def custom_http_exception_handler(request, e):
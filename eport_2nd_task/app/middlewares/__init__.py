@@ -0,0 +1,3 @@
+from .access_log import AccessLogMiddleware, AccessLogSampler, AccessLogWriter, SampleRule
+from .admission import AdmissionControlMiddleware
+from .usage import API_KEY_ID_STATE, ApiKeyUsageMiddleware
@@ -0,0 +1,173 @@
+import json
+import queue
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any, TextIO
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+@dataclass(frozen=True)
+class SampleRule:
+    """Log `rate` (0..1) of requests under `path` whose status is in `status` ("2xx", "5xx" or "*")."""
+
+    path: str
+    status: str = "*"
+    rate: float = 1.0
+
+    def matches(self, path: str, status_class: str) -> bool:
+        return path.startswith(self.path) and self.status in ("*", status_class)
+
+
+class AccessLogSampler:
+    """Decides whether a request is logged; the first matching rule wins."""
+
+    def __init__(self, rules: list[SampleRule], default_rate: float = 1.0) -> None:
+        self.rules = rules
+        self.default_rate = default_rate
+
+    def rate_for(self, path: str, status: int) -> float:
+        status_class = f"{status // 100}xx"
+        for rule in self.rules:
+            if rule.matches(path, status_class):
+                return rule.rate
+        return self.default_rate
+
+    @staticmethod
+    def sampled(rate: float) -> bool:
+        return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+
+class AccessLogWriter:
+    """
+    Writes access log records as JSON lines from a background thread.
+
+    `submit` never blocks the event loop. When the bounded queue is full the
+    record is dropped and counted, and the writer reports the drop count in
+    its own log line once the queue drains. Given a `path` instead of a
+    stream, the writer opens the file itself and closes it in `close`.
+    """
+
+    def __init__(self, stream: TextIO | None = None, maxsize: int = 10_000, *, path: str | None = None) -> None:
+        self._owns_stream = stream is None and path is not None
+        self.stream = open(path, "a") if self._owns_stream else stream or sys.stdout
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._queue: queue.Queue[dict[str, Any] | None] = queue.Queue(maxsize=maxsize)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, record: dict[str, Any]) -> None:
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="access-log-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            record = self._queue.get()
+            if record is None:
+                break
+            self.stream.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+            if self._queue.empty():
+                self._report_drops()
+                self.stream.flush()
+        self._report_drops()
+        self.stream.flush()
+
+    def _report_drops(self) -> None:
+        dropped = self.dropped
+        if dropped > self._reported_dropped:
+            record = {"event": "access_log_dropped", "dropped": dropped - self._reported_dropped, "total": dropped}
+            self.stream.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self._reported_dropped = dropped
+
+    def close(self, timeout: float = 5.0) -> None:
+        if self._thread is not None:
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                return
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                # Still writing; closing the file under it would lose the tail
+                return
+            self._thread = None
+        if self._owns_stream and not self.stream.closed:
+            self.stream.close()
+
+
+class AccessLogMiddleware:
+    """
+    Structured, sampled access log.
+
+    Sits outermost so that requests shed by admission control are logged too;
+    the correlation id is read from the response header set further in.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        writer: AccessLogWriter,
+        sampler: AccessLogSampler,
+        correlation_header: str = "X-Request-ID",
+    ) -> None:
+        self.app = app
+        self.writer = writer
+        self.sampler = sampler
+        self.correlation_header = correlation_header.lower().encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        response: dict[str, Any] = {"status": 500, "request_id": None, "bytes": 0}
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name == self.correlation_header:
+                        response["request_id"] = value.decode("latin-1")
+                        break
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            path = scope["path"]
+            status = response["status"]
+            rate = self.sampler.rate_for(path, status)
+            if self.sampler.sampled(rate):
+                client = scope.get("client")
+                self.writer.submit(
+                    {
+                        "ts": datetime.now(UTC).isoformat(timespec="milliseconds"),
+                        "method": scope["method"],
+                        "path": path,
+                        "query": scope.get("query_string", b"").decode("latin-1") or None,
+                        "status": status,
+                        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                        "bytes": response["bytes"],
+                        "client": client[0] if client else None,
+                        "request_id": response["request_id"],
+                        "sample_rate": rate,
+                    }
+                )
@@ -0,0 +1,84 @@
+import json
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.database.pool import PoolWaitTracker, pool_wait_tracker
+
+
+class AdmissionControlMiddleware:
+    """
+    Rejects requests with a fast 503 when the worker is overloaded.
+
+    A request is shed when the worker already has `max_in_flight` requests
+    running, or when connection checkouts are taking longer than
+    `max_pool_wait_ms`. Exempt paths (health and metrics) are never counted
+    or shed. Priority paths may use `priority_reserve` extra slots and are
+    not shed for pool wait, so the admin panel keeps working under load.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        max_in_flight: int,
+        max_pool_wait_ms: float,
+        priority_reserve: int = 0,
+        exempt_paths: list[str] | None = None,
+        priority_paths: list[str] | None = None,
+        retry_after_seconds: int = 1,
+        tracker: PoolWaitTracker = pool_wait_tracker,
+    ) -> None:
+        self.app = app
+        self.max_in_flight = max_in_flight
+        self.max_pool_wait_ms = max_pool_wait_ms
+        self.priority_reserve = priority_reserve
+        self.exempt_paths = tuple(exempt_paths or ())
+        self.priority_paths = tuple(priority_paths or ())
+        self.retry_after_seconds = retry_after_seconds
+        self.tracker = tracker
+        self.in_flight = 0
+        self.shed_total = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        reason = self._shed_reason(priority=scope["path"].startswith(self.priority_paths))
+        if reason is not None:
+            self.shed_total += 1
+            await self._reject(send, reason)
+            return
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+    def _shed_reason(self, *, priority: bool) -> str | None:
+        if priority:
+            if self.in_flight >= self.max_in_flight + self.priority_reserve:
+                return "too many requests in flight"
+            return None
+
+        if self.in_flight >= self.max_in_flight:
+            return "too many requests in flight"
+        if self.tracker.current_wait_ms() > self.max_pool_wait_ms:
+            return "database connection pool is saturated"
+        return None
+
+    async def _reject(self, send: Send, reason: str) -> None:
+        body = json.dumps({"detail": f"Service overloaded: {reason}. Retry later."}).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                    (b"retry-after", str(self.retry_after_seconds).encode("latin-1")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,45 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.usage import ApiKeyUsageRecorder
+
+# request.state attribute the API key dependency sets for authenticated requests
+API_KEY_ID_STATE = "api_key_id"
+
+
+class ApiKeyUsageMiddleware:
+    """Counts requests made with an API key into an ApiKeyUsageRecorder."""
+
+    def __init__(self, app: ASGIApp, *, recorder: ApiKeyUsageRecorder) -> None:
+        self.app = app
+        self.recorder = recorder
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        response = {"status": 500, "bytes": 0}
+        # request.state writes into this dict, so create it here to share it
+        state = scope.setdefault("state", {})
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            api_key_id = state.get(API_KEY_ID_STATE)
+            if api_key_id is not None:
+                self.recorder.record(
+                    api_key_id,
+                    status=response["status"],
+                    bytes_out=response["bytes"],
+                    latency_ms=(time.perf_counter() - started) * 1000,
+                )
@@ -1,3 +1,7 @@
 from .user import User
 from .warranty import Warranty
 from .api_key import ApiKey
+from .idempotency_key import IdempotencyKey
+from .warranty_summary import WarrantySummary
+from .warranty_rollup import WarrantyMonthlyRollup
+from .api_key_usage import ApiKeyUsageDaily
@@ -1,7 +1,10 @@
 import secrets
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, text
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, text
 from sqlalchemy.sql import func
 
+from app.core import security
 from app.models.common import DateTimeModelMixin
 from app.models.rwmodel import RWModel
 
@@ -15,10 +18,27 @@ class ApiKey(RWModel, DateTimeModelMixin):
     is_active = Column(Boolean, nullable=False, default=True, index=True)
     last_used_at = Column(DateTime(timezone=True), nullable=True)
     expires_at = Column(DateTime(timezone=True), nullable=True)
+    # Token-bucket limits; NULL falls back to the rate_limit_default_* settings
+    rate_limit_per_minute = Column(Integer, nullable=True)
+    rate_limit_burst = Column(Integer, nullable=True)
+    # Set on a rotated key to the key that replaced it
+    replaced_by_id = Column(Integer, ForeignKey("api_keys.id", ondelete="SET NULL"), nullable=True)
 
     @staticmethod
-    def generate_key() -> str:
-        """Generate a secure random API key."""
+    def generate_key(
+        api_key_id: int | None = None,
+        expires_at: datetime | None = None,
+        signing_secret: str | None = None,
+    ) -> str:
+        """
+        Generate a secure API key.
+
+        With a signing secret and the id the key will be stored under, this is
+        a signed `wrs_` key embedding the id and expiry; otherwise a random
+        `wr_` key.
+        """
+        if signing_secret is not None and api_key_id is not None:
+            return security.sign_api_key(api_key_id, expires_at, signing_secret)
         return f"wr_{secrets.token_urlsafe(32)}"
 
     def is_expired(self) -> bool:
@@ -0,0 +1,25 @@
+from sqlalchemy import BigInteger, Column, Date, Float, ForeignKey, Integer, text
+
+from app.models.rwmodel import RWModel
+
+
+class ApiKeyUsageDaily(RWModel):
+    """
+    Requests made with an API key per UTC day.
+
+    Counted in each worker's memory and added in periodically by
+    ApiKeyUsageRecorder.flush, so rows trail live traffic by up to one flush
+    interval.
+    """
+
+    __tablename__ = "api_key_usage_daily"
+
+    api_key_id = Column(Integer, ForeignKey("api_keys.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    requests = Column(BigInteger, nullable=False, server_default=text("0"))
+    # Response body bytes sent
+    bytes_out = Column(BigInteger, nullable=False, server_default=text("0"))
+    # Responses with status >= 400
+    errors = Column(BigInteger, nullable=False, server_default=text("0"))
+    # Divide by requests for the mean latency
+    latency_ms_sum = Column(Float, nullable=False, server_default=text("0"))
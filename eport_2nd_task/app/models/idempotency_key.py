@@ -0,0 +1,20 @@
+from sqlalchemy import Column, DateTime, Integer, String, Text, UniqueConstraint, text
+
+from app.models.rwmodel import RWModel
+
+
+class IdempotencyKey(RWModel):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (UniqueConstraint("scope", "key", name="uq_idempotency_keys_scope_key"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # Endpoint the key belongs to, e.g. "warranty:register"
+    scope = Column(String(100), nullable=False)
+    key = Column(String(255), nullable=False)
+    # SHA-256 of the canonical request body; a reused key with a different body is rejected
+    request_fingerprint = Column(String(64), nullable=False)
+    # NULL until the original request has finished
+    response_status = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=text("now()"))
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
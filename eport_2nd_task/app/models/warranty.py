@@ -1,5 +1,5 @@
 from datetime import date
-from sqlalchemy import Column, Integer, String, Numeric, Date, Text
+from sqlalchemy import BigInteger, Boolean, Column, Integer, String, Numeric, Date, Text, Index, text
 
 from app.models.common import DateTimeModelMixin
 from app.models.rwmodel import RWModel
@@ -7,6 +7,16 @@ from app.models.rwmodel import RWModel
 
 class Warranty(RWModel, DateTimeModelMixin):
     __tablename__ = "warranties"
+    __table_args__ = (
+        Index(
+            "ix_warranties_live_filters",
+            "status",
+            "department",
+            "category",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        Index("ix_warranties_change_txid_id", "change_txid", "id"),
+    )
 
     id = Column(Integer, primary_key=True)
     asset_name = Column(String(255), nullable=False)
@@ -22,4 +32,12 @@ class Warranty(RWModel, DateTimeModelMixin):
     notes = Column(Text, nullable=True)
     # JSON-encoded list of image URLs sent from Asset Manager (up to 4)
     image_urls = Column(Text, nullable=True)
+    # Partition key: archived rows live in warranties_archive, everything
+    # else in warranties_live. Set only by the archive job.
+    archived = Column(Boolean, nullable=False, default=False, server_default=text("false"))
+    # Id of the transaction that last wrote the row, set by a trigger;
+    # watermark for the changes feed
+    change_txid = Column(BigInteger, nullable=False, server_default=text("0"))
+    # Bumped by every update; exposed as the ETag for If-Match
+    version = Column(Integer, nullable=False, default=1, server_default=text("1"))
 
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Date, Integer, String, text
+
+from app.models.rwmodel import RWModel
+
+
+class WarrantyMonthlyRollup(RWModel):
+    """
+    Live warranty registrations and expiries per month, department, category
+    and status.
+
+    Maintained by the maintain_warranty_monthly_rollup trigger on warranties;
+    never written by the application.
+    """
+
+    __tablename__ = "warranty_monthly_rollups"
+
+    # First day of the month
+    month = Column(Date, primary_key=True)
+    department = Column(String(100), primary_key=True)
+    category = Column(String(100), primary_key=True)
+    status = Column(String(50), primary_key=True)
+    # Live warranties created in this month
+    registered_count = Column(Integer, nullable=False, server_default=text("0"))
+    # Live warranties whose warranty expires in this month
+    expiring_count = Column(Integer, nullable=False, server_default=text("0"))
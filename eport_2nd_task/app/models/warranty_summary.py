@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Date, Integer, Numeric, String, text
+
+from app.models.rwmodel import RWModel
+
+
+class WarrantySummary(RWModel):
+    """
+    Live warranty counts and cost per department, category and expiry date.
+
+    Maintained by the maintain_warranty_summary trigger on warranties; never
+    written by the application. Keeping the expiry date in the key lets
+    "under warranty" be answered for any day without touching warranties.
+    """
+
+    __tablename__ = "warranty_summaries"
+
+    department = Column(String(100), primary_key=True)
+    category = Column(String(100), primary_key=True)
+    # -infinity for warranties without an expiry date
+    expires_on = Column(Date, primary_key=True)
+    asset_count = Column(Integer, nullable=False, server_default=text("0"))
+    total_cost = Column(Numeric(14, 2), nullable=False, server_default=text("0"))
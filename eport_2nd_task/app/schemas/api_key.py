@@ -1,7 +1,8 @@
-from datetime import datetime
+from datetime import date, datetime
+from enum import StrEnum
 from typing import Any
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ApiKeyBase(BaseModel):
@@ -14,6 +15,8 @@ class ApiKeyBase(BaseModel):
     is_active: bool
     last_used_at: datetime | None = None
     expires_at: datetime | None = None
+    rate_limit_per_minute: int | None = None
+    rate_limit_burst: int | None = None
     created_at: datetime
     updated_at: datetime | None = None
 
@@ -25,6 +28,14 @@ class ApiKeyOut(ApiKeyBase):
 class ApiKeyCreate(BaseModel):
     name: str
     expires_days: int | None = None
+    rate_limit_per_minute: int | None = Field(None, ge=1)
+    rate_limit_burst: int | None = Field(None, ge=1)
+
+
+class ApiKeyRateLimitUpdate(BaseModel):
+    # None resets the key to the default limits
+    rate_limit_per_minute: int | None = Field(None, ge=1)
+    rate_limit_burst: int | None = Field(None, ge=1)
 
 
 class ApiKeyCreateResponse(BaseModel):
@@ -35,10 +46,52 @@ class ApiKeyCreateResponse(BaseModel):
     expires_at: datetime | None = None
 
 
+# Upper bound on keys created in one bulk request
+API_KEY_BULK_MAX = 1000
+
+
+class ApiKeyBulkCreate(BaseModel):
+    keys: list[ApiKeyCreate] = Field(min_length=1, max_length=API_KEY_BULK_MAX)
+
+
+class ApiKeyBulkCreateResponse(BaseModel):
+    message: str = "API keys created successfully"
+    # Plain keys are only shown here, once
+    data: list[ApiKeyCreateResponse]
+
+
+class ApiKeyRotate(BaseModel):
+    # None rotates every active key
+    ids: list[int] | None = Field(None, min_length=1)
+    # How long the replaced keys keep working alongside the new ones
+    overlap_hours: int = Field(24, ge=0, le=24 * 30)
+
+
+class ApiKeyRotation(ApiKeyCreateResponse):
+    replaces_id: int
+    # When the replaced key stops verifying
+    replaced_key_expires_at: datetime | None = None
+
+
+class ApiKeyRotateResponse(BaseModel):
+    message: str = "API keys rotated successfully"
+    data: list[ApiKeyRotation]
+    # Requested ids that are not active keys and were left alone
+    missing_ids: list[int] = []
+
+
+class ApiKeySort(StrEnum):
+    created_at = "created_at"
+    last_used_at = "last_used_at"
+
+
 class ApiKeysListResponse(BaseModel):
     message: str = "API Keys retrieved successfully"
     data: list[ApiKeyOut]
+    # Keys matching the filters, across all pages
     total: int
+    # Pass as `cursor` for the next page; None on the last page
+    next_cursor: str | None = None
 
 
 class ApiKeyResponse(BaseModel):
@@ -46,3 +99,23 @@ class ApiKeyResponse(BaseModel):
     data: ApiKeyOut | ApiKeyCreateResponse | list[ApiKeyOut]
     detail: dict[str, Any] | None = None
 
+
+
+class ApiKeyUsageDay(BaseModel):
+    model_config = ConfigDict(
+        from_attributes=True,
+    )
+
+    day: date
+    requests: int
+    bytes_out: int
+    # Responses with status >= 400
+    errors: int
+    latency_ms_sum: float
+
+
+class ApiKeyUsageResponse(BaseModel):
+    message: str = "API key usage retrieved successfully"
+    # One entry per UTC day with traffic, oldest first. Counts trail live
+    # traffic by up to the flush interval.
+    data: list[ApiKeyUsageDay]
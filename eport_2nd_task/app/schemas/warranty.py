@@ -1,8 +1,10 @@
 from datetime import date, datetime
+from enum import StrEnum
+from functools import lru_cache
 from typing import Any
 from decimal import Decimal
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, create_model, model_validator
 
 from app.schemas.message import ApiResponse
 
@@ -26,6 +28,7 @@ class WarrantyBase(BaseModel):
     notes: str | None = None
     # Up to 4 image URLs associated with this warranty / asset
     image_urls: list[str] | None = None
+    version: int | None = None
     created_at: datetime | None = None
     updated_at: datetime | None = None
     deleted_at: datetime | None = None
@@ -65,16 +68,145 @@ class WarrantyOutData(WarrantyBase):
     pass
 
 
+WARRANTY_OUT_FIELDS: tuple[str, ...] = tuple(WarrantyOutData.model_fields)
+
+
+@lru_cache(maxsize=128)
+def get_warranty_projection_model(fields: tuple[str, ...]) -> type[BaseModel]:
+    """Build (once per field tuple) an output model that only declares and validates `fields`."""
+    return create_model(
+        "WarrantyProjectedOutData",
+        __config__=ConfigDict(from_attributes=True),
+        **{field: (WarrantyOutData.model_fields[field].annotation, WarrantyOutData.model_fields[field]) for field in fields},
+    )
+
+
+class WarrantyTotalMode(StrEnum):
+    exact = "exact"
+    estimate = "estimate"
+    none = "none"
+
+
 class WarrantiesFilters(BaseModel):
     skip: int | None = 0
     limit: int | None = 100
     status: str | None = None
     department: str | None = None
     category: str | None = None
+    include_total: WarrantyTotalMode = WarrantyTotalMode.none
+    # Sparse fieldset; None returns every column
+    fields: list[str] | None = None
 
 
 class WarrantyResponse(ApiResponse):
     message: str = "Warranty API Response"
-    data: WarrantyOutData | list[WarrantyOutData]
+    data: WarrantyOutData | list[WarrantyOutData] | list[dict[str, Any]]
+    # Only present on list responses requested with include_total=exact|estimate
+    total: int | None = None
+    total_is_estimate: bool | None = None
     detail: dict[str, Any] | None = {"key": "val"}
 
+
+class WarrantyChangesResponse(ApiResponse):
+    message: str = "Warranty Changes Response"
+    # Rows written after `since`, soft-deleted ones included (deleted_at set)
+    data: list[WarrantyOutData]
+    # Pass as `since` on the next call; unchanged when there is nothing new
+    next_since: str
+    has_more: bool
+
+
+# Upper bound on ids per batch lookup
+WARRANTY_BATCH_MAX_IDS = 1000
+
+
+class WarrantyBatchRequest(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=WARRANTY_BATCH_MAX_IDS)
+
+
+class WarrantyBatchResponse(ApiResponse):
+    message: str = "Warranty Batch Response"
+    # Found warranties, in the order their ids were requested
+    data: list[WarrantyOutData]
+    # Requested ids with no live warranty
+    missing_ids: list[int]
+
+
+class WarrantyBulkFilter(BaseModel):
+    status: str | None = None
+    department: str | None = None
+    category: str | None = None
+
+
+class WarrantyBulkUpdateRequest(BaseModel):
+    # Exactly one of `ids` and `filters` selects the warranties to change
+    ids: list[int] | None = Field(None, min_length=1, max_length=WARRANTY_BATCH_MAX_IDS)
+    filters: WarrantyBulkFilter | None = None
+    update: WarrantyInUpdate
+    dry_run: bool = False
+    # Keyset paging: each call changes at most `batch_size` rows with id > after_id
+    after_id: int = Field(0, ge=0)
+    batch_size: int = Field(500, ge=1, le=5000)
+
+    @model_validator(mode="after")
+    def check_selection(self) -> "WarrantyBulkUpdateRequest":
+        if (self.ids is None) == (self.filters is None):
+            raise ValueError("Provide exactly one of `ids` and `filters`.")
+        if self.filters is not None and not self.filters.model_dump(exclude_none=True):
+            raise ValueError("`filters` needs at least one of status, department or category.")
+        if not self.update.model_dump(exclude_unset=True):
+            raise ValueError("`update` must set at least one field.")
+        return self
+
+
+class WarrantyBulkUpdateResponse(ApiResponse):
+    message: str = "Warranty Bulk Update Response"
+    # Ids changed by this call, ascending; empty on a dry run
+    data: list[int]
+    # Rows changed, or on a dry run the rows that would be changed from after_id on
+    count: int
+    dry_run: bool
+    # Pass as `after_id` on the next call while has_more is true
+    next_after_id: int
+    has_more: bool
+
+
+class WarrantyCategorySummary(BaseModel):
+    category: str
+    asset_count: int
+    total_cost: Decimal
+    # Warranties whose expiry date is today or later
+    under_warranty_count: int
+
+
+class WarrantyDepartmentSummary(BaseModel):
+    department: str
+    asset_count: int
+    total_cost: Decimal
+    under_warranty_count: int
+    categories: list[WarrantyCategorySummary]
+
+
+class WarrantySummaryResponse(ApiResponse):
+    message: str = "Warranty Summary Response"
+    data: list[WarrantyDepartmentSummary]
+
+
+# Columns a monthly rollup series can be broken down by
+WARRANTY_ROLLUP_GROUP_FIELDS: tuple[str, ...] = ("department", "category", "status")
+
+
+class WarrantyRollupPoint(BaseModel):
+    month: date
+    # Only set for the fields the series is grouped by
+    department: str | None = None
+    category: str | None = None
+    status: str | None = None
+    registered_count: int
+    expiring_count: int
+
+
+class WarrantyRollupResponse(ApiResponse):
+    message: str = "Warranty Rollup Response"
+    # Ordered by month, then by the grouping fields
+    data: list[WarrantyRollupPoint]
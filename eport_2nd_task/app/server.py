@@ -0,0 +1,103 @@
+"""
+Production entry point: `python -m app.server`.
+
+Runs `app.main:app` under uvicorn's multi-process supervisor, with one worker
+per CPU unless SERVER_WORKERS is set. DB_CONNECTION_BUDGET is the total number
+of database connections all workers may hold: each worker's pool size is
+derived from it (never above DB_POOL_SIZE + DB_MAX_OVERFLOW), and there are
+never more workers than connections in the budget. Workers inherit that pool
+size through the environment. SIGTERM drains in-flight requests for up to
+SERVER_GRACEFUL_TIMEOUT_SECONDS. With several workers, a worker exits after
+SERVER_MAX_REQUESTS requests plus a random share of SERVER_MAX_REQUESTS_JITTER
+and the supervisor starts a fresh one, which caps memory growth without
+recycling every worker at once. A single worker is never recycled, since
+nothing would restart it.
+"""
+import logging
+import os
+import random
+
+import uvicorn
+
+from app.core.config import get_app_settings
+from app.core.settings.app import AppSettings
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_workers(settings: AppSettings) -> int:
+    # Every worker needs at least one connection of the budget
+    return max(1, min(settings.server_workers or os.cpu_count() or 1, settings.db_connection_budget))
+
+
+def worker_pool_sizes(connection_budget: int, workers: int, max_per_worker: int) -> tuple[int, int]:
+    """
+    Split a global connection budget into a per-worker (pool_size, max_overflow).
+
+    Each worker's share is capped at `max_per_worker`, and about a third of it
+    is kept as overflow for spikes.
+    """
+    per_worker = max(1, min(connection_budget // workers, max_per_worker))
+    pool_size = max(1, per_worker * 2 // 3)
+    return pool_size, per_worker - pool_size
+
+
+class JitteredMaxRequests(int):
+    """
+    A request limit that draws `base + randint(0, jitter)` wherever it is created.
+
+    uvicorn hands every worker the same config, which each spawned worker
+    unpickles; redrawing on unpickle gives every worker, including
+    replacements, its own limit.
+    """
+
+    def __new__(cls, base: int, jitter: int) -> "JitteredMaxRequests":
+        limit = super().__new__(cls, base + random.randint(0, max(jitter, 0)))
+        limit.base, limit.jitter = base, jitter
+        return limit
+
+    def __reduce__(self):
+        return JitteredMaxRequests, (self.base, self.jitter)
+
+
+def resolve_max_requests(settings: AppSettings, workers: int) -> int | None:
+    # uvicorn only restarts exited workers under its multi-process supervisor
+    if workers <= 1 or not settings.server_max_requests:
+        return None
+    return JitteredMaxRequests(settings.server_max_requests, settings.server_max_requests_jitter)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    settings = get_app_settings()
+    workers = resolve_workers(settings)
+
+    pool_size, max_overflow = worker_pool_sizes(
+        settings.db_connection_budget, workers, settings.db_pool_size + settings.db_max_overflow
+    )
+    # Picked up by each worker's settings when it imports the app
+    os.environ["DB_POOL_SIZE"] = str(pool_size)
+    os.environ["DB_MAX_OVERFLOW"] = str(max_overflow)
+
+    logger.info(
+        "Starting %s workers with pool_size=%s max_overflow=%s per worker.", workers, pool_size, max_overflow
+    )
+    uvicorn.run(
+        "app.main:app",
+        host=settings.server_host,
+        port=settings.server_port,
+        workers=workers,
+        # "auto" selects uvloop and httptools (installed via uvicorn[standard])
+        loop="auto",
+        http="auto",
+        proxy_headers=True,
+        forwarded_allow_ips=settings.server_forwarded_allow_ips,
+        timeout_keep_alive=settings.server_keepalive_seconds,
+        timeout_graceful_shutdown=settings.server_graceful_timeout_seconds,
+        limit_max_requests=resolve_max_requests(settings, workers),
+        access_log=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
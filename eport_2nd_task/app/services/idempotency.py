@@ -0,0 +1,105 @@
+import hashlib
+import json
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from starlette.status import HTTP_409_CONFLICT, HTTP_422_UNPROCESSABLE_ENTITY
+
+from app.database.repositories.idempotency_key import IdempotencyKeyRepository
+from app.services.base import BaseService
+from app.utils import ServiceResult, response_4xx
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+def request_fingerprint(payload: Any) -> str:
+    """SHA-256 over the canonical JSON form of a request payload."""
+    canonical = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class IdempotencyService(BaseService):
+    async def run_once(
+        self,
+        *,
+        scope: str,
+        key: str,
+        payload: Any,
+        ttl_seconds: int,
+        idempotency_repo: IdempotencyKeyRepository,
+        operation: Callable[[], Awaitable[ServiceResult]],
+        pending_lease_seconds: int = 60,
+    ) -> ServiceResult:
+        """
+        Run `operation` at most once per (scope, key).
+
+        The reservation row is written in the same session as the operation, so it
+        commits together with the operation's own commit. Successful responses are
+        stored and replayed verbatim for retries; failed ones release the key.
+        The response is stored in a second commit; if that never happens, retries
+        get 409 until `pending_lease_seconds` pass and then run the operation again.
+        """
+        fingerprint = request_fingerprint(payload)
+
+        reserved_id = await idempotency_repo.reserve_idempotency_key(
+            scope=scope,
+            key=key,
+            request_fingerprint=fingerprint,
+            ttl_seconds=ttl_seconds,
+            pending_lease_seconds=pending_lease_seconds,
+        )
+        if reserved_id is None:
+            return await self._replay(scope=scope, key=key, fingerprint=fingerprint, idempotency_repo=idempotency_repo)
+
+        result = await operation()
+
+        if not result.success:
+            await idempotency_repo.release_idempotency_key(idempotency_key_id=reserved_id)
+            return result
+
+        with result as response:
+            await idempotency_repo.save_response(
+                idempotency_key_id=reserved_id,
+                status_code=response.status_code,
+                body=response.body.decode("utf-8"),
+            )
+        return result
+
+    async def _replay(
+        self,
+        *,
+        scope: str,
+        key: str,
+        fingerprint: str,
+        idempotency_repo: IdempotencyKeyRepository,
+    ) -> ServiceResult:
+        stored = await idempotency_repo.get_idempotency_key(scope=scope, key=key)
+
+        if stored is None or stored.response_status is None:
+            return ServiceResult(
+                response_4xx(
+                    status_code=HTTP_409_CONFLICT,
+                    context={"reason": "A request with this Idempotency-Key is still being processed. Retry later."},
+                )
+            )
+
+        if stored.request_fingerprint != fingerprint:
+            return ServiceResult(
+                response_4xx(
+                    status_code=HTTP_422_UNPROCESSABLE_ENTITY,
+                    context={"reason": "Idempotency-Key was already used with a different request body."},
+                )
+            )
+
+        logger.debug("Replaying stored response for idempotency key %s:%s", scope, key)
+        return ServiceResult(
+            dict(
+                status_code=stored.response_status,
+                content=json.loads(stored.response_body),
+                headers={IDEMPOTENT_REPLAYED_HEADER: "true"},
+            )
+        )
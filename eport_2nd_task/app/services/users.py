@@ -170,7 +170,12 @@ class UsersService(BaseService):
         user_in: UserInUpdate,
         users_repo: UsersRepository = Depends(get_repository(UsersRepository)),
     ) -> UserResponse:
-        updated_user = await users_repo.update_user(user=token_user, user_in=user_in)
+        updated_user = await users_repo.update_user(user_id=token_user.id, user_in=user_in)
+        if not updated_user:
+            return response_4xx(
+                status_code=HTTP_404_NOT_FOUND,
+                context={"reason": constant.FAIL_VALIDATION_MATCHED_USER_ID},
+            )
 
         return dict(
             status_code=HTTP_200_OK,
@@ -186,7 +191,12 @@ class UsersService(BaseService):
         token_user: User,
         users_repo: UsersRepository = Depends(get_repository(UsersRepository)),
     ) -> ServiceResult:
-        deleted_user = await users_repo.delete_user(user=token_user)
+        deleted_user = await users_repo.delete_user(user_id=token_user.id)
+        if not deleted_user:
+            return response_4xx(
+                status_code=HTTP_404_NOT_FOUND,
+                context={"reason": constant.FAIL_VALIDATION_MATCHED_USER_ID},
+            )
 
         return dict(
             status_code=HTTP_200_OK,
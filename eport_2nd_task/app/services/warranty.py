@@ -1,28 +1,112 @@
 import logging
+from datetime import date
 
 from fastapi.encoders import jsonable_encoder
 from starlette.status import (
     HTTP_200_OK,
     HTTP_201_CREATED,
+    HTTP_400_BAD_REQUEST,
     HTTP_404_NOT_FOUND,
+    HTTP_412_PRECONDITION_FAILED,
 )
 
 from app.database.repositories.warranty import WarrantyRepository
 from app.models.warranty import Warranty
 from app.schemas.warranty import (
+    WARRANTY_BATCH_MAX_IDS,
+    WARRANTY_OUT_FIELDS,
+    WARRANTY_ROLLUP_GROUP_FIELDS,
+    WarrantyBatchResponse,
+    WarrantyBulkUpdateRequest,
+    WarrantyBulkUpdateResponse,
+    WarrantyChangesResponse,
+    WarrantyDepartmentSummary,
     WarrantyInCreate,
     WarrantyInUpdate,
     WarrantyOutData,
     WarrantyResponse,
+    WarrantyRollupPoint,
+    WarrantyRollupResponse,
+    WarrantySummaryResponse,
     WarrantiesFilters,
+    WarrantyTotalMode,
+    get_warranty_projection_model,
 )
 from app.services.base import BaseService
-from app.utils import ServiceResult, response_4xx, return_service
+from app.utils import ServiceResult, TTLCache, response_4xx, return_service
 
 logger = logging.getLogger(__name__)
 
+# Totals are cached per (mode, filters) for a few seconds so paginating UIs
+# do not re-count the table on every page request.
+WARRANTY_TOTAL_CACHE_TTL_SECONDS = 10
+_warranty_total_cache = TTLCache(ttl=WARRANTY_TOTAL_CACHE_TTL_SECONDS)
+
+
+def format_change_token(change_txid: int, warranty_id: int) -> str:
+    return f"{change_txid}.{warranty_id}"
+
+
+def parse_change_token(token: str | None) -> tuple[int, int]:
+    """Parse a `since` token; no token starts from the beginning."""
+    if not token:
+        return 0, 0
+    change_txid, warranty_id = token.split(".")
+    change_txid, warranty_id = int(change_txid), int(warranty_id)
+    if change_txid < 0 or warranty_id < 0:
+        raise ValueError(token)
+    return change_txid, warranty_id
+
+
+def format_warranty_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def parse_if_match(header: str | None) -> list[int] | None:
+    """
+    Versions listed in an If-Match header; None when any version will do
+    (no header or `*`). Weak and malformed tags never match.
+    """
+    if header is None or header.strip() == "*":
+        return None
+    versions = []
+    for tag in header.split(","):
+        tag = tag.strip()
+        if len(tag) > 2 and tag[0] == tag[-1] == '"' and tag[1:-1].isdigit():
+            versions.append(int(tag[1:-1]))
+    return versions
+
 
 class WarrantyService(BaseService):
+    async def _get_warranties_total(
+        self,
+        warranties_filters: WarrantiesFilters,
+        warranty_repo: WarrantyRepository,
+    ) -> int:
+        mode = warranties_filters.include_total
+        cache_key = (
+            mode,
+            warranties_filters.status,
+            warranties_filters.department,
+            warranties_filters.category,
+        )
+        total = _warranty_total_cache.get(cache_key)
+        if total is not None:
+            return total
+
+        filters = dict(
+            status=warranties_filters.status,
+            department=warranties_filters.department,
+            category=warranties_filters.category,
+        )
+        if mode == WarrantyTotalMode.exact:
+            total = await warranty_repo.count_filtered_warranties(**filters)
+        else:
+            total = await warranty_repo.estimate_filtered_warranties(**filters)
+
+        _warranty_total_cache.set(cache_key, total)
+        return total
+
     @return_service
     async def get_warranty_by_id(
         self,
@@ -42,6 +126,35 @@ class WarrantyService(BaseService):
                 "message": "Warranty retrieved successfully.",
                 "data": jsonable_encoder(WarrantyOutData.model_validate(warranty)),
             },
+            headers={"ETag": format_warranty_etag(warranty.version)},
+        )
+
+    @return_service
+    async def get_warranties_by_ids(
+        self,
+        warranty_ids: list[int],
+        warranty_repo: WarrantyRepository,
+    ) -> WarrantyBatchResponse:
+        # Keep the first occurrence of each id, in request order
+        warranty_ids = list(dict.fromkeys(warranty_ids))
+        if not warranty_ids or len(warranty_ids) > WARRANTY_BATCH_MAX_IDS:
+            return response_4xx(
+                status_code=HTTP_400_BAD_REQUEST,
+                context={"reason": f"Provide between 1 and {WARRANTY_BATCH_MAX_IDS} warranty ids."},
+            )
+
+        warranties = await warranty_repo.get_warranties_by_ids(warranty_ids=warranty_ids)
+        by_id = {warranty.id: warranty for warranty in warranties}
+
+        return dict(
+            status_code=HTTP_200_OK,
+            content={
+                "message": "Warranties retrieved successfully.",
+                "data": jsonable_encoder(
+                    [WarrantyOutData.model_validate(by_id[warranty_id]) for warranty_id in warranty_ids if warranty_id in by_id]
+                ),
+                "missing_ids": [warranty_id for warranty_id in warranty_ids if warranty_id not in by_id],
+            },
         )
 
     @return_service
@@ -50,12 +163,24 @@ class WarrantyService(BaseService):
         warranties_filters: WarrantiesFilters,
         warranty_repo: WarrantyRepository,
     ) -> WarrantyResponse:
+        fields = None
+        if warranties_filters.fields:
+            unknown_fields = sorted(set(warranties_filters.fields) - set(WARRANTY_OUT_FIELDS))
+            if unknown_fields:
+                return response_4xx(
+                    status_code=HTTP_400_BAD_REQUEST,
+                    context={"reason": f"Unknown warranty fields: {', '.join(unknown_fields)}."},
+                )
+            # id is always returned so projected rows can still be addressed
+            fields = list(dict.fromkeys(["id", *warranties_filters.fields]))
+
         warranties = await warranty_repo.get_filtered_warranties(
             skip=warranties_filters.skip,
             limit=warranties_filters.limit,
             status=warranties_filters.status,
             department=warranties_filters.department,
             category=warranties_filters.category,
+            fields=fields,
         )
 
         if not warranties:
@@ -64,11 +189,132 @@ class WarrantyService(BaseService):
                 context={"reason": "No warranties found matching the filters."},
             )
 
+        out_model = get_warranty_projection_model(tuple(fields)) if fields else WarrantyOutData
+        content = {
+            "message": "Warranties retrieved successfully.",
+            "data": jsonable_encoder([out_model.model_validate(warranty) for warranty in warranties]),
+        }
+        if warranties_filters.include_total != WarrantyTotalMode.none:
+            content["total"] = await self._get_warranties_total(warranties_filters, warranty_repo)
+            content["total_is_estimate"] = warranties_filters.include_total == WarrantyTotalMode.estimate
+
+        return dict(
+            status_code=HTTP_200_OK,
+            content=content,
+        )
+
+    @return_service
+    async def get_warranty_changes(
+        self,
+        since: str | None,
+        limit: int,
+        warranty_repo: WarrantyRepository,
+    ) -> WarrantyChangesResponse:
+        try:
+            after_txid, after_id = parse_change_token(since)
+        except ValueError:
+            return response_4xx(
+                status_code=HTTP_400_BAD_REQUEST,
+                context={"reason": "Invalid `since` token; use the `next_since` value from a previous response."},
+            )
+
+        warranties = await warranty_repo.get_warranty_changes(after_txid=after_txid, after_id=after_id, limit=limit)
+        if warranties:
+            after_txid, after_id = warranties[-1].change_txid, warranties[-1].id
+
         return dict(
             status_code=HTTP_200_OK,
             content={
-                "message": "Warranties retrieved successfully.",
+                "message": "Warranty changes retrieved successfully.",
                 "data": jsonable_encoder([WarrantyOutData.model_validate(warranty) for warranty in warranties]),
+                "next_since": format_change_token(after_txid, after_id),
+                "has_more": len(warranties) == limit,
+            },
+        )
+
+    @return_service
+    async def get_department_summaries(
+        self,
+        department: str | None,
+        warranty_repo: WarrantyRepository,
+    ) -> WarrantySummaryResponse:
+        rows = await warranty_repo.get_department_summaries(department=department)
+
+        departments: dict[str, dict] = {}
+        for row in rows:
+            summary = departments.setdefault(
+                row.department,
+                {
+                    "department": row.department,
+                    "asset_count": 0,
+                    "total_cost": 0,
+                    "under_warranty_count": 0,
+                    "categories": [],
+                },
+            )
+            summary["asset_count"] += row.asset_count
+            summary["total_cost"] += row.total_cost
+            summary["under_warranty_count"] += row.under_warranty_count
+            summary["categories"].append(
+                {
+                    "category": row.category,
+                    "asset_count": row.asset_count,
+                    "total_cost": row.total_cost,
+                    "under_warranty_count": row.under_warranty_count,
+                }
+            )
+
+        return dict(
+            status_code=HTTP_200_OK,
+            content={
+                "message": "Warranty summary retrieved successfully.",
+                "data": jsonable_encoder(
+                    [WarrantyDepartmentSummary.model_validate(summary) for summary in departments.values()]
+                ),
+            },
+        )
+
+    @return_service
+    async def get_monthly_rollups(
+        self,
+        date_from: date,
+        date_to: date,
+        group_by: list[str],
+        warranty_repo: WarrantyRepository,
+        status: str | None = None,
+        department: str | None = None,
+        category: str | None = None,
+    ) -> WarrantyRollupResponse:
+        unknown_fields = sorted(set(group_by) - set(WARRANTY_ROLLUP_GROUP_FIELDS))
+        if unknown_fields:
+            return response_4xx(
+                status_code=HTTP_400_BAD_REQUEST,
+                context={"reason": f"Cannot group by: {', '.join(unknown_fields)}."},
+            )
+        if date_from > date_to:
+            return response_4xx(
+                status_code=HTTP_400_BAD_REQUEST,
+                context={"reason": "`date_from` must not be after `date_to`."},
+            )
+
+        rows = await warranty_repo.get_monthly_rollups(
+            month_from=date_from.replace(day=1),
+            month_to=date_to.replace(day=1),
+            # Keep the canonical column order whatever order they were asked in
+            group_by=[field for field in WARRANTY_ROLLUP_GROUP_FIELDS if field in group_by],
+            status=status,
+            department=department,
+            category=category,
+        )
+
+        return dict(
+            status_code=HTTP_200_OK,
+            content={
+                "message": "Warranty rollups retrieved successfully.",
+                "data": jsonable_encoder(
+                    [WarrantyRollupPoint.model_validate(row._asdict()) for row in rows],
+                    exclude_none=True,
+                ),
             },
         )
 
@@ -94,22 +340,81 @@ class WarrantyService(BaseService):
         warranty_id: int,
         warranty_in: WarrantyInUpdate,
         warranty_repo: WarrantyRepository,
+        if_match: str | None = None,
     ) -> WarrantyResponse:
-        warranty = await warranty_repo.get_warranty_by_id(warranty_id=warranty_id)
-        if not warranty:
+        expected_versions = parse_if_match(if_match)
+        updated_warranty = await warranty_repo.update_warranty(
+            warranty_id=warranty_id,
+            warranty_in=warranty_in,
+            expected_versions=expected_versions,
+        )
+        if not updated_warranty:
+            # Only a failed conditional update needs the second look, to tell
+            # a stale ETag apart from a missing warranty.
+            current = None
+            if expected_versions is not None:
+                current = await warranty_repo.get_warranty_by_id(warranty_id=warranty_id)
+            if current is not None:
+                return response_4xx(
+                    status_code=HTTP_412_PRECONDITION_FAILED,
+                    context={
+                        "reason": "The warranty was modified since it was read; fetch it again and retry.",
+                        "etag": format_warranty_etag(current.version),
+                    },
+                )
             return response_4xx(
                 status_code=HTTP_404_NOT_FOUND,
                 context={"reason": "No warranty found with the given ID."},
             )
 
-        updated_warranty = await warranty_repo.update_warranty(warranty=warranty, warranty_in=warranty_in)
-
         return dict(
             status_code=HTTP_200_OK,
             content={
                 "message": "Warranty updated successfully.",
                 "data": jsonable_encoder(WarrantyOutData.model_validate(updated_warranty)),
             },
+            headers={"ETag": format_warranty_etag(updated_warranty.version)},
+        )
+
+    @return_service
+    async def bulk_update_warranties(
+        self,
+        bulk_in: WarrantyBulkUpdateRequest,
+        warranty_repo: WarrantyRepository,
+    ) -> WarrantyBulkUpdateResponse:
+        selection = dict(after_id=bulk_in.after_id, ids=bulk_in.ids)
+        if bulk_in.filters is not None:
+            selection.update(bulk_in.filters.model_dump())
+
+        if bulk_in.dry_run:
+            count = await warranty_repo.count_bulk_update_targets(**selection)
+            return dict(
+                status_code=HTTP_200_OK,
+                content={
+                    "message": "Warranty bulk update dry run.",
+                    "data": [],
+                    "count": count,
+                    "dry_run": True,
+                    "next_after_id": bulk_in.after_id,
+                    "has_more": False,
+                },
+            )
+
+        updated_ids, has_more = await warranty_repo.bulk_update_warranties(
+            warranty_in=bulk_in.update,
+            batch_size=bulk_in.batch_size,
+            **selection,
+        )
+        return dict(
+            status_code=HTTP_200_OK,
+            content={
+                "message": "Warranties updated successfully.",
+                "data": updated_ids,
+                "count": len(updated_ids),
+                "dry_run": False,
+                "next_after_id": updated_ids[-1] if updated_ids else bulk_in.after_id,
+                "has_more": has_more,
+            },
         )
 
     @return_service
@@ -118,15 +423,13 @@ class WarrantyService(BaseService):
         warranty_id: int,
         warranty_repo: WarrantyRepository,
     ) -> ServiceResult:
-        warranty = await warranty_repo.get_warranty_by_id(warranty_id=warranty_id)
-        if not warranty:
+        deleted_warranty = await warranty_repo.delete_warranty(warranty_id=warranty_id)
+        if not deleted_warranty:
             return response_4xx(
                 status_code=HTTP_404_NOT_FOUND,
                 context={"reason": "No warranty found with the given ID."},
             )
 
-        deleted_warranty = await warranty_repo.delete_warranty(warranty=warranty)
-
         return dict(
             status_code=HTTP_200_OK,
             content={
@@ -12,3 +12,4 @@ from .request_exceptions import (
     request_validation_exception_handler,
 )
 from .service_result import ServiceResult, handle_result, return_service
+from .ttl_cache import TTLCache
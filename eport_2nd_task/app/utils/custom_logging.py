@@ -33,8 +33,16 @@ class InterceptHandler(logging.Handler):
 
 
 class CustomizeLogger:
+    # Sinks are configured once per process; rebuilding the app reuses them
+    # instead of starting new enqueue threads and reopening the log file.
+    _configured_path: Path | None = None
+    _configured_logger = None
+
     @classmethod
     def make_logger(cls, config_path: Path):
+        if cls._configured_path == config_path:
+            return cls._configured_logger
+
         config = cls.load_logging_config(config_path)
         logging_config = config.get("logger")
 
@@ -45,6 +53,8 @@ class CustomizeLogger:
             rotation=logging_config.get("rotation"),
             format=logging_config.get("format"),
         )
+        cls._configured_path = config_path
+        cls._configured_logger = logger
         return logger
 
     @classmethod
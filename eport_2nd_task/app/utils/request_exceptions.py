@@ -6,7 +6,7 @@ from fastapi.responses import JSONResponse
 
 
 async def http_exception_handler(request: Request, exc: HTTPException) -> JSONResponse:
-    return JSONResponse({"detail": exc.detail}, status_code=exc.status_code)
+    return JSONResponse({"detail": exc.detail}, status_code=exc.status_code, headers=getattr(exc, "headers", None))
 
 
 async def request_validation_exception_handler(request: Request, exc: RequestValidationError) -> JSONResponse:
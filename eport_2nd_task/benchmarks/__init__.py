@@ -0,0 +1,5 @@
+"""
+Load-testing harness and performance regression suite.
+
+See benchmarks/README.md for usage.
+"""
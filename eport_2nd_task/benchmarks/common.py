@@ -0,0 +1,36 @@
+import hashlib
+
+# Seeded API keys and the login user are derived from these so the driver can
+# reproduce valid credentials without storing them anywhere.
+BENCH_API_KEY_PREFIX = "wr_bench_"
+BENCH_USER_EMAIL = "bench@warranty-centre.test"
+BENCH_USER_PASSWORD = "bench-password"
+
+DEPARTMENTS = [f"Department {i:02d}" for i in range(20)]
+CATEGORIES = ["Laptop", "Desktop", "Monitor", "Printer", "Phone", "Tablet", "Router", "Server", "Projector", "Scanner"]
+# Weighted so filtered scans see both common and rare values
+STATUSES = ["Active"] * 14 + ["Under Repair"] * 3 + ["Inactive"] * 2 + ["Retired"]
+
+SIZE_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+
+def parse_size(value: str) -> int:
+    """Parse row counts such as 10k, 1m or 10M."""
+    value = value.strip().lower()
+    if value and value[-1] in SIZE_SUFFIXES:
+        return int(float(value[:-1]) * SIZE_SUFFIXES[value[-1]])
+    return int(value)
+
+
+def bench_api_key(index: int) -> str:
+    return f"{BENCH_API_KEY_PREFIX}{index:08d}"
+
+
+def bench_api_key_hash(index: int) -> str:
+    # Same as app.core.security.hash_api_key, kept import-free for the seeder
+    return hashlib.sha256(bench_api_key(index).encode("utf-8")).hexdigest()
+
+
+def asyncpg_dsn(db_url: str) -> str:
+    """Turn the SQLAlchemy URL from settings into a DSN asyncpg accepts."""
+    return str(db_url).replace("postgresql+asyncpg://", "postgresql://", 1)
@@ -0,0 +1,242 @@
+"""
+Benchmark driver.
+
+    # in-process, through the ASGI app
+    python -m benchmarks.driver run --target asgi --output benchmarks/results/asgi.json
+
+    # spawn uvicorn with N workers, or point at a running server
+    python -m benchmarks.driver run --target uvicorn --workers 4 --output benchmarks/results/uvicorn.json
+    python -m benchmarks.driver run --target http://localhost:8000 --output benchmarks/results/remote.json
+
+    # fail (exit 1) when any scenario's p95 regressed by more than 10%
+    python -m benchmarks.driver compare benchmarks/results/baseline.json benchmarks/results/asgi.json --threshold 0.10
+"""
+import asyncio
+import contextlib
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+from pathlib import Path
+
+import asyncpg
+import click
+import httpx
+
+from benchmarks.common import asyncpg_dsn
+from benchmarks.results import ScenarioStats, compare_results, load_results, write_results
+from benchmarks.scenarios import SCENARIOS, BenchContext, Scenario
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def _load_dataset_info(db_url: str) -> dict[str, int]:
+    conn = await asyncpg.connect(asyncpg_dsn(db_url))
+    try:
+        row = await conn.fetchrow("SELECT coalesce(min(id), 1) AS min_id, coalesce(max(id), 1) AS max_id, count(*) AS total FROM warranties")
+        api_key_count = await conn.fetchval("SELECT count(*) FROM api_keys WHERE name LIKE 'bench-%'")
+    finally:
+        await conn.close()
+    return {
+        "min_warranty_id": row["min_id"],
+        "max_warranty_id": row["max_id"],
+        "warranties": row["total"],
+        "api_keys": api_key_count,
+    }
+
+
+@contextlib.asynccontextmanager
+async def _asgi_client() -> AsyncIterator[tuple[httpx.AsyncClient, object]]:
+    from asgi_lifespan import LifespanManager
+
+    from app.main import create_app
+
+    app = create_app()
+    async with LifespanManager(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://bench") as client:
+            yield client, app
+
+
+@contextlib.asynccontextmanager
+async def _uvicorn_client(workers: int, startup_timeout: float) -> AsyncIterator[tuple[httpx.AsyncClient, None]]:
+    port = _free_port()
+    command = [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+    ]
+    process = subprocess.Popen(command, env=os.environ.copy())
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+            deadline = time.monotonic() + startup_timeout
+            while True:
+                if process.poll() is not None:
+                    raise click.ClickException(f"uvicorn exited with code {process.returncode}")
+                try:
+                    await client.get("/openapi.json")
+                    break
+                except httpx.TransportError:
+                    if time.monotonic() > deadline:
+                        raise click.ClickException("uvicorn did not start in time")
+                    await asyncio.sleep(0.2)
+            yield client, None
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+@contextlib.asynccontextmanager
+async def _remote_client(base_url: str) -> AsyncIterator[tuple[httpx.AsyncClient, None]]:
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        yield client, None
+
+
+async def _run_scenario(ctx: BenchContext, scenario: Scenario, *, concurrency: int, duration: float, warmup: float, seed: int) -> ScenarioStats:
+    stats = ScenarioStats()
+
+    async def worker(worker_id: int, until: float, record: bool) -> None:
+        rng = random.Random(seed * 1_000 + worker_id)
+        while time.perf_counter() < until:
+            started = time.perf_counter()
+            try:
+                status_code = await scenario.run(ctx, rng)
+            except Exception:
+                status_code = None
+            if record:
+                stats.record((time.perf_counter() - started) * 1000, status_code)
+
+    if warmup > 0:
+        until = time.perf_counter() + warmup
+        await asyncio.gather(*(worker(i, until, record=False) for i in range(concurrency)))
+
+    started = time.perf_counter()
+    until = started + duration
+    await asyncio.gather(*(worker(i, until, record=True) for i in range(concurrency)))
+    stats.elapsed_seconds = time.perf_counter() - started
+    return stats
+
+
+async def _run(*, target: str, scenario_names: list[str], concurrency: int, duration: float, warmup: float, workers: int, seed: int, startup_timeout: float) -> dict:
+    from app.core.config import get_app_settings
+
+    dataset = await _load_dataset_info(get_app_settings().db_url)
+
+    if target == "asgi":
+        client_cm = _asgi_client()
+    elif target == "uvicorn":
+        client_cm = _uvicorn_client(workers, startup_timeout)
+    else:
+        client_cm = _remote_client(target)
+
+    scenarios = {}
+    async with client_cm as (client, app):
+        ctx = BenchContext(
+            client=client,
+            app=app,
+            min_warranty_id=dataset["min_warranty_id"],
+            max_warranty_id=dataset["max_warranty_id"],
+            api_key_count=dataset["api_keys"],
+        )
+        for name in scenario_names:
+            scenario = SCENARIOS[name]
+            if scenario.in_process_only and app is None:
+                click.echo(f"- {name}: skipped (in-process only)")
+                continue
+            stats = await _run_scenario(ctx, scenario, concurrency=concurrency, duration=duration, warmup=warmup, seed=seed)
+            summary = stats.summary()
+            scenarios[name] = summary
+            click.echo(
+                f"- {name}: {summary['requests']} req, {summary['rps']} req/s, "
+                f"p50 {summary['latency_ms']['p50']} ms, p95 {summary['latency_ms']['p95']} ms, errors {summary['errors']}"
+            )
+
+    return {
+        "target": target,
+        "started_at": datetime.now(UTC).isoformat(),
+        "git_commit": _git_commit(),
+        "config": {
+            "concurrency": concurrency,
+            "duration_seconds": duration,
+            "warmup_seconds": warmup,
+            "workers": workers if target == "uvicorn" else None,
+            "seed": seed,
+        },
+        "dataset": dataset,
+        "scenarios": scenarios,
+    }
+
+
+@click.group()
+def cli():
+    """Warranty Register benchmark driver."""
+    pass
+
+
+@cli.command()
+@click.option("--target", default="asgi", show_default=True, help="asgi (in-process), uvicorn (spawned) or a base URL")
+@click.option("--scenario", "scenario_names", multiple=True, type=click.Choice(sorted(SCENARIOS)), help="Scenario to run (repeatable, default: all)")
+@click.option("--concurrency", type=click.IntRange(min=1), default=16, show_default=True, help="Concurrent virtual clients")
+@click.option("--duration", type=float, default=20.0, show_default=True, help="Measured seconds per scenario")
+@click.option("--warmup", type=float, default=3.0, show_default=True, help="Unmeasured warm-up seconds per scenario")
+@click.option("--workers", type=click.IntRange(min=1), default=1, show_default=True, help="uvicorn workers (--target uvicorn)")
+@click.option("--seed", type=int, default=42, show_default=True, help="Random seed for request parameters")
+@click.option("--startup-timeout", type=float, default=30.0, show_default=True, help="Seconds to wait for uvicorn to start")
+@click.option("--output", type=click.Path(dir_okay=False, path_type=Path), required=True, help="Where to write the JSON results")
+def run(target, scenario_names, concurrency, duration, warmup, workers, seed, startup_timeout, output):
+    """Run scenarios and write a JSON results file."""
+    results = asyncio.run(
+        _run(
+            target=target,
+            scenario_names=list(scenario_names) or list(SCENARIOS),
+            concurrency=concurrency,
+            duration=duration,
+            warmup=warmup,
+            workers=workers,
+            seed=seed,
+            startup_timeout=startup_timeout,
+        )
+    )
+    write_results(output, results)
+    click.echo(f"Results written to {output}")
+
+
+@cli.command()
+@click.argument("baseline", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.argument("current", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("--threshold", type=float, default=0.10, show_default=True, help="Allowed relative p95 increase (0.10 = 10%)")
+def compare(baseline, current, threshold):
+    """Compare two results files; exit 1 on a p95 regression."""
+    rows = compare_results(load_results(baseline), load_results(current), threshold)
+
+    click.echo(f"{'scenario':<16} {'baseline p95':>14} {'current p95':>14} {'change':>9}")
+    for row in rows:
+        flag = "  REGRESSED" if row["regressed"] else ""
+        click.echo(
+            f"{row['scenario']:<16} {row['baseline_p95_ms']:>11.2f} ms {row['current_p95_ms']:>11.2f} ms {row['change']:>+8.1%}{flag}"
+        )
+
+    if any(row["regressed"] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    cli()
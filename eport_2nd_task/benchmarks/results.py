@@ -0,0 +1,89 @@
+"""Latency statistics, the JSON results format and regression comparison."""
+import json
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+RESULTS_FORMAT_VERSION = 1
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+@dataclass
+class ScenarioStats:
+    latencies_ms: list[float] = field(default_factory=list)
+    status_codes: dict[int, int] = field(default_factory=dict)
+    errors: int = 0
+    elapsed_seconds: float = 0.0
+
+    def record(self, latency_ms: float, status_code: int | None) -> None:
+        self.latencies_ms.append(latency_ms)
+        if status_code is None or status_code >= 500:
+            self.errors += 1
+        key = status_code if status_code is not None else 0
+        self.status_codes[key] = self.status_codes.get(key, 0) + 1
+
+    def summary(self) -> dict[str, Any]:
+        values = sorted(self.latencies_ms)
+        count = len(values)
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "rps": round(count / self.elapsed_seconds, 2) if self.elapsed_seconds else 0.0,
+            "latency_ms": {
+                "mean": round(sum(values) / count, 3) if count else 0.0,
+                "p50": round(percentile(values, 50), 3),
+                "p90": round(percentile(values, 90), 3),
+                "p95": round(percentile(values, 95), 3),
+                "p99": round(percentile(values, 99), 3),
+                "max": round(values[-1], 3) if values else 0.0,
+            },
+            "status_codes": {str(code): n for code, n in sorted(self.status_codes.items())},
+        }
+
+
+def write_results(path: Path, results: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"version": RESULTS_FORMAT_VERSION, **results}, indent=2) + "\n")
+
+
+def load_results(path: Path) -> dict[str, Any]:
+    results = json.loads(path.read_text())
+    if results.get("version") != RESULTS_FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported results format version {results.get('version')!r}")
+    return results
+
+
+def compare_results(baseline: dict[str, Any], current: dict[str, Any], threshold: float) -> list[dict[str, Any]]:
+    """
+    Compare p95 latency per scenario present in both result sets.
+
+    A scenario regresses when its p95 grew by more than `threshold`
+    (0.1 = 10%) or when it recorded errors the baseline did not have.
+    """
+    rows = []
+    for name, base in baseline["scenarios"].items():
+        cur = current["scenarios"].get(name)
+        if cur is None:
+            continue
+        base_p95 = base["latency_ms"]["p95"]
+        cur_p95 = cur["latency_ms"]["p95"]
+        change = (cur_p95 - base_p95) / base_p95 if base_p95 else 0.0
+        new_errors = cur["errors"] > 0 and base["errors"] == 0
+        rows.append(
+            {
+                "scenario": name,
+                "baseline_p95_ms": base_p95,
+                "current_p95_ms": cur_p95,
+                "change": change,
+                "regressed": change > threshold or new_errors,
+            }
+        )
+    return rows
@@ -0,0 +1,111 @@
+"""
+Benchmark scenarios.
+
+Each scenario issues one operation and returns its HTTP status code. HTTP
+scenarios run unchanged in-process and against a live server; scenarios
+marked `in_process_only` call application code directly and are skipped
+when the target is a separate server.
+"""
+import random
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import httpx
+from fastapi import FastAPI, HTTPException
+
+from benchmarks.common import BENCH_USER_EMAIL, BENCH_USER_PASSWORD, CATEGORIES, DEPARTMENTS, STATUSES, bench_api_key
+
+API_PREFIX = "/api/v1"
+
+
+@dataclass
+class BenchContext:
+    client: httpx.AsyncClient
+    # Only set for in-process targets
+    app: FastAPI | None
+    min_warranty_id: int
+    max_warranty_id: int
+    api_key_count: int
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    description: str
+    run: Callable[[BenchContext, random.Random], Awaitable[int]]
+    in_process_only: bool = False
+
+
+async def _list_filtered(ctx: BenchContext, rng: random.Random) -> int:
+    params = {"status": rng.choice(STATUSES), "department": rng.choice(DEPARTMENTS), "limit": 100}
+    response = await ctx.client.get(f"{API_PREFIX}/warranty", params=params)
+    return response.status_code
+
+
+async def _list_sparse(ctx: BenchContext, rng: random.Random) -> int:
+    params = {
+        "category": rng.choice(CATEGORIES),
+        "limit": 500,
+        "fields": "asset_name,status,warranty_expiry_date",
+    }
+    response = await ctx.client.get(f"{API_PREFIX}/warranty", params=params)
+    return response.status_code
+
+
+async def _get_by_id(ctx: BenchContext, rng: random.Random) -> int:
+    warranty_id = rng.randint(ctx.min_warranty_id, ctx.max_warranty_id)
+    response = await ctx.client.get(f"{API_PREFIX}/warranty/{warranty_id}")
+    return response.status_code
+
+
+async def _register(ctx: BenchContext, rng: random.Random) -> int:
+    purchased = date(2024, 1, 1) + timedelta(days=rng.randrange(365))
+    body = {
+        "asset_name": f"Bench asset {rng.randrange(10**9)}",
+        "category": rng.choice(CATEGORIES),
+        "date_purchased": purchased.isoformat(),
+        "cost": f"{rng.randrange(5_000, 500_000) / 100:.2f}",
+        "department": rng.choice(DEPARTMENTS),
+        "status": "Active",
+        "user_id": rng.randrange(1, 5000),
+        "user_name": "bench",
+        "warranty_period_months": 24,
+        "warranty_expiry_date": (purchased + timedelta(days=730)).isoformat(),
+    }
+    response = await ctx.client.post(f"{API_PREFIX}/warranty", json=body)
+    return response.status_code
+
+
+async def _api_key_auth(ctx: BenchContext, rng: random.Random) -> int:
+    # No route requires an API key in this tree yet, so exercise the
+    # dependency itself: hash, lookup by key_hash and last-used update.
+    from app.api.dependencies.api_key import verify_api_key
+    from app.database.repositories.api_key import ApiKeyRepository
+
+    api_key = bench_api_key(rng.randrange(max(ctx.api_key_count, 1)))
+    async with ctx.app.state.pool() as session:
+        try:
+            await verify_api_key(api_key_header=api_key, api_key_repo=ApiKeyRepository(session))
+        except HTTPException as e:
+            return e.status_code
+    return 200
+
+
+async def _login(ctx: BenchContext, rng: random.Random) -> int:
+    body = {"email": BENCH_USER_EMAIL, "password": BENCH_USER_PASSWORD}
+    response = await ctx.client.post(f"{API_PREFIX}/auth/login", json=body)
+    return response.status_code
+
+
+SCENARIOS: dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in [
+        Scenario("list_filtered", "GET /warranty filtered by status and department", _list_filtered),
+        Scenario("list_sparse", "GET /warranty by category with a sparse fieldset", _list_sparse),
+        Scenario("get_by_id", "GET /warranty/{id} for a random seeded id", _get_by_id),
+        Scenario("register", "POST /warranty with a random body", _register),
+        Scenario("api_key_auth", "verify_api_key for a random seeded key", _api_key_auth, in_process_only=True),
+        Scenario("login", "POST /auth/login for the seeded user", _login),
+    ]
+}
@@ -0,0 +1,161 @@
+"""
+Seed the database with synthetic warranties, API keys and a login user.
+
+    python -m benchmarks.seed --warranties 1m --api-keys 10k
+
+Rows are generated deterministically from --seed and loaded with COPY in
+batches, so 10M rows take minutes rather than hours.
+"""
+import asyncio
+import random
+import time
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+
+import asyncpg
+import click
+
+from app.core import security
+from app.core.config import get_app_settings
+from benchmarks.common import (
+    BENCH_USER_EMAIL,
+    BENCH_USER_PASSWORD,
+    CATEGORIES,
+    DEPARTMENTS,
+    STATUSES,
+    asyncpg_dsn,
+    bench_api_key_hash,
+    parse_size,
+)
+
+WARRANTY_COLUMNS = [
+    "asset_name",
+    "category",
+    "date_purchased",
+    "cost",
+    "department",
+    "status",
+    "user_id",
+    "user_name",
+    "warranty_period_months",
+    "warranty_expiry_date",
+    "notes",
+    "created_at",
+    "updated_at",
+    "deleted_at",
+]
+API_KEY_COLUMNS = ["key_hash", "name", "is_active", "expires_at", "created_at"]
+
+# Fraction of seeded warranties that are soft-deleted
+DELETED_RATIO = 0.05
+
+
+def _warranty_rows(rng: random.Random, count: int, now: datetime):
+    for i in range(count):
+        purchased = date(2019, 1, 1) + timedelta(days=rng.randrange(6 * 365))
+        period = rng.choice([12, 24, 36])
+        created_at = datetime.combine(purchased, datetime.min.time(), UTC) + timedelta(hours=rng.randrange(24 * 30))
+        created_at = min(created_at, now)
+        deleted_at = created_at + timedelta(days=rng.randrange(1, 365)) if rng.random() < DELETED_RATIO else None
+        user_id = rng.randrange(1, 5000)
+        yield (
+            f"{rng.choice(CATEGORIES)} {i:09d}",
+            rng.choice(CATEGORIES),
+            purchased,
+            Decimal(rng.randrange(5_000, 500_000)) / 100,
+            rng.choice(DEPARTMENTS),
+            rng.choice(STATUSES),
+            user_id,
+            f"user-{user_id}",
+            period,
+            purchased + timedelta(days=30 * period),
+            "seeded by benchmarks.seed" if rng.random() < 0.3 else None,
+            created_at,
+            created_at,
+            min(deleted_at, now) if deleted_at else None,
+        )
+
+
+def _api_key_rows(count: int, now: datetime):
+    for i in range(count):
+        # Every 50th key is inactive so lookups also exercise the miss path
+        yield (bench_api_key_hash(i), f"bench-{i}", i % 50 != 49, None, now)
+
+
+async def _copy_in_batches(conn: asyncpg.Connection, table: str, columns: list[str], rows, total: int, batch_size: int) -> None:
+    batch, loaded, started = [], 0, time.perf_counter()
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            await conn.copy_records_to_table(table, records=batch, columns=columns)
+            loaded += len(batch)
+            batch.clear()
+            click.echo(f"  {table}: {loaded:,}/{total:,} ({loaded / (time.perf_counter() - started):,.0f} rows/s)")
+    if batch:
+        await conn.copy_records_to_table(table, records=batch, columns=columns)
+        loaded += len(batch)
+    click.echo(f"  {table}: {loaded:,} rows in {time.perf_counter() - started:.1f}s")
+
+
+async def _ensure_bench_user(conn: asyncpg.Connection) -> None:
+    salt = security.generate_salt()
+    await conn.execute(
+        """
+        INSERT INTO users (username, email, salt, hashed_password)
+        SELECT $1, $2, $3, $4
+        WHERE NOT EXISTS (SELECT 1 FROM users WHERE email = $2 AND deleted_at IS NULL)
+        """,
+        "bench",
+        BENCH_USER_EMAIL,
+        salt,
+        security.get_password_hash(salt + BENCH_USER_PASSWORD),
+    )
+
+
+async def seed(*, warranties: int, api_keys: int, truncate: bool, batch_size: int, seed_value: int) -> None:
+    settings = get_app_settings()
+    conn = await asyncpg.connect(asyncpg_dsn(settings.db_url))
+    try:
+        if truncate:
+            click.echo("Truncating warranties and api_keys...")
+            await conn.execute("TRUNCATE warranties, api_keys RESTART IDENTITY")
+
+        now = datetime.now(UTC)
+        rng = random.Random(seed_value)
+
+        click.echo(f"Seeding {warranties:,} warranties...")
+        await _copy_in_batches(conn, "warranties", WARRANTY_COLUMNS, _warranty_rows(rng, warranties, now), warranties, batch_size)
+
+        click.echo(f"Seeding {api_keys:,} API keys...")
+        await _copy_in_batches(conn, "api_keys", API_KEY_COLUMNS, _api_key_rows(api_keys, now), api_keys, batch_size)
+
+        await _ensure_bench_user(conn)
+
+        click.echo("Analyzing...")
+        await conn.execute("ANALYZE warranties")
+        await conn.execute("ANALYZE api_keys")
+    finally:
+        await conn.close()
+
+
+@click.command()
+@click.option("--warranties", default="10k", show_default=True, help="Number of warranties, e.g. 10k, 1m, 10m")
+@click.option("--api-keys", default="1k", show_default=True, help="Number of API keys")
+@click.option("--batch-size", type=click.IntRange(min=1), default=50_000, show_default=True, help="Rows per COPY batch")
+@click.option("--seed", "seed_value", type=int, default=42, show_default=True, help="Random seed for reproducible data")
+@click.option("--truncate", is_flag=True, help="Empty warranties and api_keys first")
+def main(warranties: str, api_keys: str, batch_size: int, seed_value: int, truncate: bool) -> None:
+    """Seed synthetic warranties, API keys and the benchmark login user."""
+    asyncio.run(
+        seed(
+            warranties=parse_size(warranties),
+            api_keys=parse_size(api_keys),
+            truncate=truncate,
+            batch_size=batch_size,
+            seed_value=seed_value,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
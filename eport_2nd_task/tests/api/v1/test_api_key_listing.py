@@ -0,0 +1,98 @@
+import base64
+import uuid
+from datetime import UTC, datetime, timedelta
+from os import environ
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy import update
+from starlette.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+
+from app.database.repositories.api_key import ApiKeyRepository
+from app.models.api_key import ApiKey
+from app.schemas.api_key import ApiKeyCreate
+
+environ["APP_ENV"] = "test"
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _create_api_keys(initialized_app: FastAPI, names: list[str], **values) -> list[int]:
+    async with initialized_app.state.pool() as session:
+        created = await ApiKeyRepository(session).create_api_keys(api_keys_in=[ApiKeyCreate(name=name) for name in names])
+        ids = [api_key.id for _, api_key in created]
+        if values:
+            await session.execute(update(ApiKey).where(ApiKey.id.in_(ids)).values(**values))
+            await session.commit()
+    return ids
+
+
+async def _walk(app: FastAPI, client: AsyncClient, **params) -> tuple[list[int], set[int]]:
+    """Follow next_cursor to the end; the ids in listing order and every page's total."""
+    ids, totals, cursor = [], set(), None
+    while True:
+        response = await client.get(app.url_path_for("admin:list-api-keys"), params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == HTTP_200_OK
+        result = response.json()
+        ids.extend(api_key["id"] for api_key in result["data"])
+        totals.add(result["total"])
+        cursor = result["next_cursor"]
+        if cursor is None:
+            return ids, totals
+
+
+async def test_cursor_walk_pages_through_equal_sort_values(initialized_app: FastAPI, client: AsyncClient) -> None:
+    prefix = f"tie-{uuid.uuid4().hex[:8]}-"
+    ids = await _create_api_keys(initialized_app, [f"{prefix}{i}" for i in range(5)], created_at=datetime(2024, 1, 1, tzinfo=UTC))
+
+    walked, totals = await _walk(initialized_app, client, search=prefix, limit=2)
+
+    # Ties on created_at are broken by id, so no key is skipped or repeated across pages
+    assert walked == sorted(ids, reverse=True)
+    assert totals == {5}
+
+
+async def test_never_used_keys_sort_last(initialized_app: FastAPI, client: AsyncClient) -> None:
+    prefix = f"used-{uuid.uuid4().hex[:8]}-"
+    never_used = await _create_api_keys(initialized_app, [f"{prefix}never-{i}" for i in range(2)])
+    now = datetime.now(UTC)
+    [older] = await _create_api_keys(initialized_app, [f"{prefix}older"], last_used_at=now - timedelta(days=1))
+    [newer] = await _create_api_keys(initialized_app, [f"{prefix}newer"], last_used_at=now)
+
+    walked, totals = await _walk(initialized_app, client, search=prefix, sort="last_used_at", limit=1)
+
+    assert walked == [newer, older, *sorted(never_used, reverse=True)]
+    assert totals == {4}
+
+
+async def test_search_matches_percent_and_underscore_literally(initialized_app: FastAPI, client: AsyncClient) -> None:
+    prefix = f"like-{uuid.uuid4().hex[:8]}-"
+    [literal, *_] = await _create_api_keys(initialized_app, [f"{prefix}100%_off", f"{prefix}100x_off", f"{prefix}100%yoff"])
+
+    walked, totals = await _walk(initialized_app, client, search=f"{prefix}100%_off")
+
+    assert walked == [literal]
+    assert totals == {1}
+
+
+async def test_total_counts_every_key_matching_the_filters(initialized_app: FastAPI, client: AsyncClient) -> None:
+    prefix = f"total-{uuid.uuid4().hex[:8]}-"
+    await _create_api_keys(initialized_app, [f"{prefix}active-{i}" for i in range(3)])
+    await _create_api_keys(initialized_app, [f"{prefix}inactive"], is_active=False)
+
+    response = await client.get(initialized_app.url_path_for("admin:list-api-keys"), params={"search": prefix, "limit": 1})
+    assert response.json()["total"] == 3
+
+    response = await client.get(initialized_app.url_path_for("admin:list-api-keys"), params={"search": prefix, "limit": 1, "include_inactive": True})
+    assert response.json()["total"] == 4
+    assert len(response.json()["data"]) == 1
+
+
+@pytest.mark.parametrize("payload", [b"not json", b"{}", b"[1]", b'["yesterday", 1]', b"[1, 2]", b'[null, "x"]'])
+async def test_malformed_cursor_is_rejected(initialized_app: FastAPI, client: AsyncClient, payload: bytes) -> None:
+    for cursor in (base64.urlsafe_b64encode(payload).decode(), "%%%"):
+        response = await client.get(initialized_app.url_path_for("admin:list-api-keys"), params={"cursor": cursor})
+
+        assert response.status_code == HTTP_400_BAD_REQUEST
+        assert response.json()["detail"] == "Invalid cursor."
@@ -0,0 +1,44 @@
+from datetime import timedelta
+from os import environ
+
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import update
+
+from app.database.repositories.api_key import ApiKeyRepository
+from app.models.api_key import ApiKey
+from app.schemas.api_key import ApiKeyCreate
+
+environ["APP_ENV"] = "test"
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_rotating_twice_only_rotates_the_replacement(initialized_app: FastAPI) -> None:
+    async with initialized_app.state.pool() as session:
+        repo = ApiKeyRepository(session)
+        [(_, original)] = await repo.create_api_keys(api_keys_in=[ApiKeyCreate(name="rotation-test")])
+
+        [(old_key, _, replacement)] = await repo.rotate_api_keys(
+            api_key_ids=[original.id], overlap=timedelta(hours=1)
+        )
+        assert old_key.replaced_by_id == replacement.id
+
+        # Still inside the overlap window: the superseded key is not rotated again
+        assert await repo.rotate_api_keys(api_key_ids=[original.id], overlap=timedelta(hours=1)) == []
+        [(old_key, _, _)] = await repo.rotate_api_keys(
+            api_key_ids=[original.id, replacement.id], overlap=timedelta(hours=1)
+        )
+        assert old_key.id == replacement.id
+
+
+async def test_expired_keys_are_not_rotated(initialized_app: FastAPI) -> None:
+    async with initialized_app.state.pool() as session:
+        repo = ApiKeyRepository(session)
+        [(_, expired)] = await repo.create_api_keys(api_keys_in=[ApiKeyCreate(name="expired-rotation-test")])
+        await session.execute(
+            update(ApiKey).where(ApiKey.id == expired.id).values(expires_at=ApiKey.created_at - timedelta(days=1))
+        )
+        await session.commit()
+
+        assert await repo.rotate_api_keys(api_key_ids=[expired.id], overlap=timedelta(hours=1)) == []
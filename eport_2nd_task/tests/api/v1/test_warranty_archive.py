@@ -0,0 +1,76 @@
+import asyncio
+import uuid
+from datetime import date, timedelta
+from os import environ
+
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import func, insert, select
+
+from app.database.repositories.warranty import WarrantyRepository
+from app.models.warranty import Warranty
+
+environ["APP_ENV"] = "test"
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _insert_warranties(session, department: str, deleted_days_ago: list[int | None]) -> list[int]:
+    ids = []
+    for days in deleted_days_ago:
+        ids.append(
+            await session.scalar(
+                insert(Warranty)
+                .values(
+                    asset_name="Laptop",
+                    category="Laptop",
+                    date_purchased=date(2020, 1, 1),
+                    cost=100,
+                    department=department,
+                    status="Active",
+                    user_id=1,
+                    user_name="tester",
+                    deleted_at=None if days is None else func.now() - timedelta(days=days),
+                )
+                .returning(Warranty.id)
+            )
+        )
+    await session.commit()
+    return ids
+
+
+async def _archived_ids(session, department: str) -> set[int]:
+    query = select(Warranty.id).where(Warranty.department == department, Warranty.archived.is_(True))
+    return set((await session.scalars(query)).all())
+
+
+async def test_archive_moves_old_deleted_rows_in_batches(initialized_app: FastAPI) -> None:
+    department = f"archive-{uuid.uuid4().hex[:8]}"
+    async with initialized_app.state.pool() as session:
+        # Four old rows fill two batches exactly, so the job must run one more
+        # (empty) batch before it knows there is nothing left
+        old = await _insert_warranties(session, department, [100, 120, 200, 365])
+        await _insert_warranties(session, department, [10, None])
+
+        archived = await WarrantyRepository(session).archive_deleted_warranties(older_than_days=90, batch_size=2)
+
+        assert archived >= len(old)
+        assert await _archived_ids(session, department) == set(old)
+        assert await WarrantyRepository(session).archive_deleted_warranties(older_than_days=90, batch_size=2) == 0
+
+
+async def test_archive_skips_locked_rows(initialized_app: FastAPI) -> None:
+    department = f"archive-{uuid.uuid4().hex[:8]}"
+    async with initialized_app.state.pool() as session, initialized_app.state.pool() as locker:
+        locked_id, free_id = await _insert_warranties(session, department, [100, 100])
+        await locker.execute(select(Warranty.id).where(Warranty.id == locked_id).with_for_update())
+
+        # Must not wait for the lock
+        await asyncio.wait_for(
+            WarrantyRepository(session).archive_deleted_warranties(older_than_days=90, batch_size=10), timeout=5
+        )
+        assert await _archived_ids(session, department) == {free_id}
+
+        await locker.rollback()
+        await WarrantyRepository(session).archive_deleted_warranties(older_than_days=90, batch_size=10)
+        assert await _archived_ids(session, department) == {locked_id, free_id}
@@ -0,0 +1,48 @@
+import asyncio
+import json
+from datetime import date, timedelta
+from os import environ
+
+import asyncpg
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import func, insert
+
+from app.core.change_feed import WARRANTY_CHANGES_CHANNEL
+from app.core.config import get_app_settings
+from app.database.repositories.warranty import WarrantyRepository
+from app.models.warranty import Warranty
+
+environ["APP_ENV"] = "test"
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_archiving_a_deleted_warranty_is_not_notified(initialized_app: FastAPI) -> None:
+    events: list[dict] = []
+    listener = await asyncpg.connect(str(get_app_settings().db_url).replace("postgresql+asyncpg://", "postgresql://"))
+    await listener.add_listener(WARRANTY_CHANGES_CHANNEL, lambda *args: events.append(json.loads(args[3])))
+    try:
+        async with initialized_app.state.pool() as session:
+            warranty_id = await session.scalar(
+                insert(Warranty)
+                .values(
+                    asset_name="Old laptop",
+                    category="Laptop",
+                    date_purchased=date(2020, 1, 1),
+                    cost=100,
+                    department="IT",
+                    status="Active",
+                    user_id=1,
+                    user_name="tester",
+                    deleted_at=func.now() - timedelta(days=100),
+                )
+                .returning(Warranty.id)
+            )
+            await session.commit()
+            await WarrantyRepository(session).archive_deleted_warranties(older_than_days=90)
+        await asyncio.sleep(0.2)
+    finally:
+        await listener.close()
+
+    assert [event["op"] for event in events if event["id"] == warranty_id] == ["insert"]
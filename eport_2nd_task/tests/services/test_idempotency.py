@@ -0,0 +1,149 @@
+import json
+from os import environ
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.dependencies.idempotency import idempotency_scope
+from app.models.api_key import ApiKey
+from app.services.idempotency import IDEMPOTENT_REPLAYED_HEADER, IdempotencyService, request_fingerprint
+from app.utils import ServiceResult, response_5xx
+
+environ["APP_ENV"] = "test"
+
+pytestmark = pytest.mark.asyncio
+
+
+class FakeIdempotencyKeyRepository:
+    def __init__(self) -> None:
+        self.rows: dict[tuple[str, str], SimpleNamespace] = {}
+        self.next_id = 1
+
+    async def reserve_idempotency_key(self, *, scope, key, request_fingerprint, ttl_seconds, pending_lease_seconds=60):
+        held = self.rows.get((scope, key))
+        if held is not None and (held.response_status is not None or held.age_seconds < pending_lease_seconds):
+            return None
+        row = SimpleNamespace(
+            id=self.next_id,
+            request_fingerprint=request_fingerprint,
+            response_status=None,
+            response_body=None,
+            age_seconds=0,
+        )
+        self.rows[(scope, key)] = row
+        self.next_id += 1
+        return row.id
+
+    async def get_idempotency_key(self, *, scope, key):
+        return self.rows.get((scope, key))
+
+    async def save_response(self, *, idempotency_key_id, status_code, body):
+        row = next(row for row in self.rows.values() if row.id == idempotency_key_id)
+        row.response_status = status_code
+        row.response_body = body
+
+    async def release_idempotency_key(self, *, idempotency_key_id):
+        self.rows = {k: row for k, row in self.rows.items() if row.id != idempotency_key_id}
+
+
+def _counting_operation(calls: list):
+    async def operation() -> ServiceResult:
+        calls.append(1)
+        return ServiceResult(dict(status_code=201, content={"data": {"id": len(calls)}}))
+
+    return operation
+
+
+async def _run(repo, calls, payload, key="key-1", scope="warranty:register"):
+    return await IdempotencyService().run_once(
+        scope=scope,
+        key=key,
+        payload=payload,
+        ttl_seconds=60,
+        idempotency_repo=repo,
+        operation=_counting_operation(calls),
+    )
+
+
+async def test_retry_replays_stored_response() -> None:
+    repo, calls = FakeIdempotencyKeyRepository(), []
+
+    first = await _run(repo, calls, {"asset_name": "Laptop"})
+    retry = await _run(repo, calls, {"asset_name": "Laptop"})
+
+    assert len(calls) == 1
+    assert retry.result.status_code == 201
+    assert json.loads(retry.result.body) == json.loads(first.result.body)
+    assert retry.result.headers[IDEMPOTENT_REPLAYED_HEADER] == "true"
+
+
+async def test_reused_key_with_different_body_is_rejected() -> None:
+    repo, calls = FakeIdempotencyKeyRepository(), []
+
+    await _run(repo, calls, {"asset_name": "Laptop"})
+    result = await _run(repo, calls, {"asset_name": "Phone"})
+
+    assert len(calls) == 1
+    assert result.success is False
+    assert result.status_code == 422
+
+
+async def test_in_flight_key_returns_conflict() -> None:
+    repo, calls = FakeIdempotencyKeyRepository(), []
+    await repo.reserve_idempotency_key(scope="warranty:register", key="key-1", request_fingerprint="x", ttl_seconds=60)
+
+    result = await _run(repo, calls, {"asset_name": "Laptop"})
+
+    assert calls == []
+    assert result.status_code == 409
+
+
+async def test_pending_key_is_taken_over_after_its_lease() -> None:
+    repo, calls = FakeIdempotencyKeyRepository(), []
+    # Reserved and committed, but the response was never stored
+    await repo.reserve_idempotency_key(scope="warranty:register", key="key-1", request_fingerprint="x", ttl_seconds=60)
+    repo.rows[("warranty:register", "key-1")].age_seconds = 61
+
+    result = await _run(repo, calls, {"asset_name": "Laptop"})
+
+    assert calls == [1]
+    assert result.result.status_code == 201
+    assert repo.rows[("warranty:register", "key-1")].response_status == 201
+
+
+async def test_failed_operation_releases_key() -> None:
+    repo = FakeIdempotencyKeyRepository()
+
+    async def failing_operation() -> ServiceResult:
+        return ServiceResult(response_5xx(context={"reason": "boom"}))
+
+    result = await IdempotencyService().run_once(
+        scope="warranty:register",
+        key="key-1",
+        payload={},
+        ttl_seconds=60,
+        idempotency_repo=repo,
+        operation=failing_operation,
+    )
+
+    assert result.success is False
+    assert repo.rows == {}
+
+
+async def test_fingerprint_ignores_key_order() -> None:
+    assert request_fingerprint({"a": 1, "b": 2}) == request_fingerprint({"b": 2, "a": 1})
+
+
+async def test_same_key_from_different_callers_does_not_collide() -> None:
+    repo, calls = FakeIdempotencyKeyRepository(), []
+    scopes = [
+        idempotency_scope("warranty:register", api_key=ApiKey(id=1), user_id=7),
+        idempotency_scope("warranty:register", api_key=ApiKey(id=2), user_id=7),
+        idempotency_scope("warranty:register", api_key=None, user_id=7),
+    ]
+
+    results = [await _run(repo, calls, {"asset_name": "Laptop"}, scope=scope) for scope in scopes]
+
+    assert len(set(scopes)) == 3
+    assert len(calls) == 3
+    assert all(IDEMPOTENT_REPLAYED_HEADER not in result.result.headers for result in results)
@@ -0,0 +1,303 @@
+import json
+from collections import defaultdict, namedtuple
+from datetime import date
+from decimal import Decimal
+from os import environ
+from types import SimpleNamespace
+
+import pytest
+
+from app.schemas.warranty import WarrantiesFilters, WarrantyBulkUpdateRequest, WarrantyInUpdate, WarrantyTotalMode
+from app.services import warranty as warranty_service_module
+from app.services.warranty import WarrantyService, parse_if_match
+
+environ["APP_ENV"] = "test"
+
+pytestmark = pytest.mark.asyncio
+
+
+def _warranty(warranty_id: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=warranty_id,
+        asset_name=f"Laptop {warranty_id}",
+        category="Laptop",
+        date_purchased=date(2024, 1, 1),
+        cost=Decimal("999.99"),
+        department="IT",
+        status="Active",
+        user_id=1,
+        user_name="tester",
+        warranty_period_months=12,
+        warranty_expiry_date=date(2025, 1, 1),
+        notes=None,
+        image_urls=None,
+        version=1,
+        created_at=None,
+        updated_at=None,
+        deleted_at=None,
+    )
+
+
+class FakeWarrantyRepository:
+    """Canned rows for every repository method the service uses; `calls` records the arguments per method."""
+
+    def __init__(self) -> None:
+        self.calls: defaultdict[str, list[dict]] = defaultdict(list)
+
+    def _record(self, method: str, **kwargs) -> None:
+        self.calls[method].append(kwargs)
+
+    async def get_filtered_warranties(self, **kwargs):
+        self._record("get_filtered_warranties", **kwargs)
+        return [_warranty(1), _warranty(2)]
+
+    async def count_filtered_warranties(self, **kwargs) -> int:
+        self._record("count_filtered_warranties", **kwargs)
+        return 2
+
+    async def estimate_filtered_warranties(self, **kwargs) -> int:
+        self._record("estimate_filtered_warranties", **kwargs)
+        return 1500
+
+    async def get_warranties_by_ids(self, *, warranty_ids: list[int]):
+        self._record("get_warranties_by_ids", warranty_ids=warranty_ids)
+        return [_warranty(warranty_id) for warranty_id in warranty_ids if warranty_id != 404]
+
+    async def get_warranty_changes(self, **kwargs):
+        self._record("get_warranty_changes", **kwargs)
+        rows = [SimpleNamespace(**vars(_warranty(warranty_id)), change_txid=txid) for txid, warranty_id in [(700, 3), (701, 1)]]
+        return rows[: kwargs["limit"]]
+
+    async def get_warranty_by_id(self, *, warranty_id: int):
+        return _warranty(warranty_id) if warranty_id != 404 else None
+
+    async def update_warranty(self, *, warranty_id: int, warranty_in, expected_versions=None):
+        if warranty_id == 404 or (expected_versions is not None and 1 not in expected_versions):
+            return None
+        return SimpleNamespace(**{**vars(_warranty(warranty_id)), **warranty_in.model_dump(exclude_unset=True), "version": 2})
+
+    async def delete_warranty(self, *, warranty_id: int):
+        return _warranty(warranty_id) if warranty_id != 404 else None
+
+    async def bulk_update_warranties(self, *, warranty_in, **kwargs):
+        self._record("bulk_update_warranties", **kwargs)
+        return [kwargs["after_id"] + 1, kwargs["after_id"] + 2], True
+
+    async def count_bulk_update_targets(self, **kwargs):
+        self._record("count_bulk_update_targets", **kwargs)
+        return 42
+
+    async def get_department_summaries(self, *, department=None):
+        return [
+            SimpleNamespace(department="IT", category="Laptop", asset_count=3, total_cost=Decimal("3000.00"), under_warranty_count=2),
+            SimpleNamespace(department="IT", category="Monitor", asset_count=2, total_cost=Decimal("400.50"), under_warranty_count=0),
+            SimpleNamespace(department="Sales", category="Laptop", asset_count=1, total_cost=Decimal("999.99"), under_warranty_count=1),
+        ]
+
+    async def get_monthly_rollups(self, **kwargs):
+        self._record("get_monthly_rollups", **kwargs)
+        Point = namedtuple("Point", ["month", "department", "registered_count", "expiring_count"])
+        return [Point(date(2024, 1, 1), "IT", 4, 0), Point(date(2024, 2, 1), "IT", 1, 2)]
+
+
+@pytest.fixture
+def warranty_repo() -> FakeWarrantyRepository:
+    return FakeWarrantyRepository()
+
+
+@pytest.fixture(autouse=True)
+def clear_total_cache():
+    warranty_service_module._warranty_total_cache.clear()
+    yield
+    warranty_service_module._warranty_total_cache.clear()
+
+
+async def test_list_without_total(warranty_repo: FakeWarrantyRepository) -> None:
+    result = await WarrantyService().get_warranties(warranties_filters=WarrantiesFilters(), warranty_repo=warranty_repo)
+
+    content = json.loads(result.result.body)
+    assert "total" not in content
+    assert not warranty_repo.calls["count_filtered_warranties"] and not warranty_repo.calls["estimate_filtered_warranties"]
+
+
+async def test_list_with_exact_total_is_cached(warranty_repo: FakeWarrantyRepository) -> None:
+    filters = WarrantiesFilters(status="Active", include_total=WarrantyTotalMode.exact)
+
+    for _ in range(2):
+        result = await WarrantyService().get_warranties(warranties_filters=filters, warranty_repo=warranty_repo)
+        content = json.loads(result.result.body)
+        assert content["total"] == 2
+        assert content["total_is_estimate"] is False
+
+    assert len(warranty_repo.calls["count_filtered_warranties"]) == 1
+
+
+async def test_list_with_estimated_total(warranty_repo: FakeWarrantyRepository) -> None:
+    filters = WarrantiesFilters(include_total=WarrantyTotalMode.estimate)
+
+    result = await WarrantyService().get_warranties(warranties_filters=filters, warranty_repo=warranty_repo)
+    content = json.loads(result.result.body)
+
+    assert content["total"] == 1500
+    assert content["total_is_estimate"] is True
+    assert len(warranty_repo.calls["estimate_filtered_warranties"]) == 1
+
+
+async def test_list_with_sparse_fieldset(warranty_repo: FakeWarrantyRepository) -> None:
+    filters = WarrantiesFilters(fields=["asset_name", "status"])
+
+    result = await WarrantyService().get_warranties(warranties_filters=filters, warranty_repo=warranty_repo)
+    content = json.loads(result.result.body)
+
+    assert warranty_repo.calls["get_filtered_warranties"][0]["fields"] == ["id", "asset_name", "status"]
+    assert content["data"][0] == {"id": 1, "asset_name": "Laptop 1", "status": "Active"}
+
+
+async def test_list_with_unknown_field(warranty_repo: FakeWarrantyRepository) -> None:
+    filters = WarrantiesFilters(fields=["asset_name", "secret"])
+
+    result = await WarrantyService().get_warranties(warranties_filters=filters, warranty_repo=warranty_repo)
+
+    assert result.success is False
+    assert result.status_code == 400
+    assert "secret" in result.result.context["reason"]
+
+
+async def test_changes_advance_the_watermark(warranty_repo: FakeWarrantyRepository) -> None:
+
+    result = await WarrantyService().get_warranty_changes(since="650.9", limit=2, warranty_repo=warranty_repo)
+    content = json.loads(result.result.body)
+
+    assert warranty_repo.calls["get_warranty_changes"] == [dict(after_txid=650, after_id=9, limit=2)]
+    assert [row["id"] for row in content["data"]] == [3, 1]
+    assert content["next_since"] == "701.1"
+    assert content["has_more"] is True
+
+
+async def test_changes_reject_malformed_token(warranty_repo: FakeWarrantyRepository) -> None:
+    result = await WarrantyService().get_warranty_changes(since="yesterday", limit=10, warranty_repo=warranty_repo)
+
+    assert result.success is False
+    assert result.status_code == 400
+
+
+async def test_batch_keeps_request_order_and_reports_missing_ids(warranty_repo: FakeWarrantyRepository) -> None:
+
+    result = await WarrantyService().get_warranties_by_ids(warranty_ids=[7, 404, 2, 7], warranty_repo=warranty_repo)
+    content = json.loads(result.result.body)
+
+    assert warranty_repo.calls["get_warranties_by_ids"] == [dict(warranty_ids=[7, 404, 2])]
+    assert [row["id"] for row in content["data"]] == [7, 2]
+    assert content["missing_ids"] == [404]
+
+
+async def test_delete_maps_missing_row_to_not_found(warranty_repo: FakeWarrantyRepository) -> None:
+    service = WarrantyService()
+
+    deleted = await service.delete_warranty(warranty_id=3, warranty_repo=warranty_repo)
+    missing = await service.delete_warranty(warranty_id=404, warranty_repo=warranty_repo)
+
+    assert deleted.success is True
+    assert json.loads(deleted.result.body)["data"]["id"] == 3
+    assert missing.success is False
+    assert missing.status_code == 404
+
+
+async def test_parse_if_match() -> None:
+    assert parse_if_match(None) is None
+    assert parse_if_match("*") is None
+    assert parse_if_match('"3", W/"4", "x"') == [3]
+
+
+async def test_conditional_update_sets_new_etag(warranty_repo: FakeWarrantyRepository) -> None:
+    result = await WarrantyService().update_warranty(
+        warranty_id=3,
+        warranty_in=WarrantyInUpdate(status="Expired"),
+        warranty_repo=warranty_repo,
+        if_match='"1"',
+    )
+
+    assert result.success is True
+    assert result.result.headers["etag"] == '"2"'
+    assert json.loads(result.result.body)["data"]["status"] == "Expired"
+
+
+async def test_stale_if_match_is_a_precondition_failure(warranty_repo: FakeWarrantyRepository) -> None:
+    service = WarrantyService()
+
+    stale = await service.update_warranty(warranty_id=3, warranty_in=WarrantyInUpdate(status="Expired"), warranty_repo=warranty_repo, if_match='"0"')
+    missing = await service.update_warranty(warranty_id=404, warranty_in=WarrantyInUpdate(status="Expired"), warranty_repo=warranty_repo, if_match='"1"')
+
+    assert stale.status_code == 412
+    assert stale.result.context["etag"] == '"1"'
+    assert missing.status_code == 404
+
+
+async def test_bulk_update_pages_by_id(warranty_repo: FakeWarrantyRepository) -> None:
+    bulk_in = WarrantyBulkUpdateRequest(filters={"department": "Sales"}, update={"status": "Retired"}, after_id=10, batch_size=2)
+
+    result = await WarrantyService().bulk_update_warranties(bulk_in=bulk_in, warranty_repo=warranty_repo)
+    content = json.loads(result.result.body)
+
+    assert warranty_repo.calls["bulk_update_warranties"] == [dict(after_id=10, batch_size=2, ids=None, status=None, department="Sales", category=None)]
+    assert content["data"] == [11, 12]
+    assert content["next_after_id"] == 12
+    assert content["has_more"] is True
+
+
+async def test_bulk_update_dry_run_only_counts(warranty_repo: FakeWarrantyRepository) -> None:
+    bulk_in = WarrantyBulkUpdateRequest(ids=[1, 2], update={"status": "Retired"}, dry_run=True)
+
+    result = await WarrantyService().bulk_update_warranties(bulk_in=bulk_in, warranty_repo=warranty_repo)
+    content = json.loads(result.result.body)
+
+    assert not warranty_repo.calls["bulk_update_warranties"]
+    assert content["count"] == 42
+    assert content["data"] == []
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"update": {"status": "Retired"}},
+        {"ids": [1], "filters": {"status": "Active"}, "update": {"status": "Retired"}},
+        {"filters": {}, "update": {"status": "Retired"}},
+        {"ids": [1], "update": {}},
+    ],
+)
+async def test_bulk_update_rejects_ambiguous_requests(payload) -> None:
+    with pytest.raises(ValueError):
+        WarrantyBulkUpdateRequest(**payload)
+
+
+async def test_summary_rolls_categories_up_per_department(warranty_repo: FakeWarrantyRepository) -> None:
+    result = await WarrantyService().get_department_summaries(department=None, warranty_repo=warranty_repo)
+    content = json.loads(result.result.body)
+
+    it, sales = content["data"]
+    assert (it["department"], it["asset_count"], it["total_cost"], it["under_warranty_count"]) == ("IT", 5, "3400.50", 2)
+    assert [category["category"] for category in it["categories"]] == ["Laptop", "Monitor"]
+    assert sales["asset_count"] == 1
+
+
+async def test_rollups_normalise_months_and_grouping(warranty_repo: FakeWarrantyRepository) -> None:
+
+    result = await WarrantyService().get_monthly_rollups(
+        date_from=date(2024, 1, 15),
+        date_to=date(2024, 2, 3),
+        group_by=["status", "department"],
+        warranty_repo=warranty_repo,
+    )
+    content = json.loads(result.result.body)
+
+    [rollup_call] = warranty_repo.calls["get_monthly_rollups"]
+    assert rollup_call["month_from"] == date(2024, 1, 1)
+    assert rollup_call["month_to"] == date(2024, 2, 1)
+    assert rollup_call["group_by"] == ["department", "status"]
+    assert content["data"][1] == {"month": "2024-02-01", "department": "IT", "registered_count": 1, "expiring_count": 2}
+
+
+async def test_rollups_reject_unknown_grouping(warranty_repo: FakeWarrantyRepository) -> None:
+    result = await WarrantyService().get_monthly_rollups(date_from=date(2024, 1, 1), date_to=date(2024, 2, 1), group_by=["cost"], warranty_repo=warranty_repo)
+
+    assert result.status_code == 400
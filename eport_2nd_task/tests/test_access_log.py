@@ -0,0 +1,85 @@
+import io
+import json
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.middlewares import AccessLogMiddleware, AccessLogSampler, AccessLogWriter, SampleRule
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_sampler_uses_first_matching_rule() -> None:
+    sampler = AccessLogSampler(
+        [SampleRule("/api/v1/warranty", "2xx", 0.01), SampleRule("/healthz", "*", 0.0)],
+        default_rate=1.0,
+    )
+
+    assert sampler.rate_for("/api/v1/warranty/", 200) == 0.01
+    assert sampler.rate_for("/api/v1/warranty/", 503) == 1.0
+    assert sampler.rate_for("/healthz", 500) == 0.0
+    assert sampler.sampled(1.0) is True
+    assert sampler.sampled(0.0) is False
+
+
+async def test_writer_drops_and_counts_when_queue_is_full() -> None:
+    stream = io.StringIO()
+    writer = AccessLogWriter(stream, maxsize=2)
+    writer._thread = object()  # stop the consumer so the queue fills up
+
+    for i in range(5):
+        writer.submit({"n": i})
+    assert writer.dropped == 3
+
+    writer._thread = None
+    writer._start()
+    writer.close()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["n"] for line in lines if "n" in line] == [0, 1]
+    assert {"event": "access_log_dropped", "dropped": 3, "total": 3} in lines
+
+
+async def test_writer_closes_the_file_it_opened(tmp_path) -> None:
+    path = tmp_path / "access.log"
+    writer = AccessLogWriter(path=str(path))
+    writer.submit({"n": 1})
+    writer.close()
+
+    assert writer.stream.closed
+    assert json.loads(path.read_text()) == {"n": 1}
+
+    unused = AccessLogWriter(path=str(path))
+    unused.close()
+    assert unused.stream.closed
+
+    stream = io.StringIO()
+    AccessLogWriter(stream, path=str(path)).close()
+    assert not stream.closed
+
+
+async def test_middleware_writes_sampled_json_records() -> None:
+    async def app(scope, receive, send):
+        status = 500 if scope["path"] == "/boom" else 200
+        await send({"type": "http.response.start", "status": status, "headers": [(b"x-request-id", b"abc")]})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    stream = io.StringIO()
+    writer = AccessLogWriter(stream)
+    middleware = AccessLogMiddleware(
+        app,
+        writer=writer,
+        sampler=AccessLogSampler([SampleRule("/", "2xx", 0.0)]),
+    )
+
+    async with AsyncClient(transport=ASGITransport(app=middleware), base_url="http://test") as client:
+        await client.get("/quiet")
+        await client.get("/boom?x=1")
+    writer.close()
+
+    (record,) = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert record["path"] == "/boom"
+    assert record["query"] == "x=1"
+    assert record["status"] == 500
+    assert record["request_id"] == "abc"
+    assert record["bytes"] == 2
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.database.pool import PoolWaitTracker
+from app.middlewares import AdmissionControlMiddleware
+
+pytestmark = pytest.mark.asyncio
+
+
+def make_client(release: asyncio.Event, tracker: PoolWaitTracker) -> tuple[AsyncClient, AdmissionControlMiddleware]:
+    async def app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    middleware = AdmissionControlMiddleware(
+        app,
+        max_in_flight=1,
+        max_pool_wait_ms=100,
+        priority_reserve=1,
+        exempt_paths=["/healthz"],
+        priority_paths=["/api/v1/admin"],
+        retry_after_seconds=2,
+        tracker=tracker,
+    )
+    return AsyncClient(transport=ASGITransport(app=middleware), base_url="http://test"), middleware
+
+
+async def test_sheds_when_in_flight_limit_reached() -> None:
+    release = asyncio.Event()
+    client, middleware = make_client(release, PoolWaitTracker())
+
+    async with client:
+        first = asyncio.create_task(client.get("/api/v1/warranty/"))
+        while middleware.in_flight == 0:
+            await asyncio.sleep(0)
+
+        shed = await client.get("/api/v1/warranty/")
+        assert shed.status_code == 503
+        assert shed.headers["retry-after"] == "2"
+
+        priority = asyncio.create_task(client.get("/api/v1/admin/users"))
+        while middleware.in_flight < 2:
+            await asyncio.sleep(0)
+
+        release.set()
+        assert (await first).status_code == 200
+        assert (await priority).status_code == 200
+        assert (await client.get("/healthz")).status_code == 200
+
+    assert middleware.in_flight == 0
+    assert middleware.shed_total == 1
+
+
+async def test_sheds_non_priority_requests_on_pool_wait() -> None:
+    release = asyncio.Event()
+    release.set()
+    tracker = PoolWaitTracker()
+    token = tracker.start()
+    tracker._waiting[token] -= 1  # a checkout that has been waiting for a second
+
+    client, _ = make_client(release, tracker)
+    async with client:
+        assert (await client.get("/api/v1/warranty/")).status_code == 503
+        assert (await client.get("/api/v1/admin/users")).status_code == 200
+
+        tracker.finish(token)
+        tracker._samples.clear()
+        assert (await client.get("/api/v1/warranty/")).status_code == 200
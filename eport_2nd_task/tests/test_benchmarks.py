@@ -0,0 +1,48 @@
+from benchmarks.common import parse_size
+from benchmarks.results import ScenarioStats, compare_results, percentile
+
+
+def _results(p95: float, errors: int = 0) -> dict:
+    return {"scenarios": {"list_filtered": {"errors": errors, "latency_ms": {"p95": p95}}}}
+
+
+def test_parse_size():
+    assert parse_size("10k") == 10_000
+    assert parse_size("1m") == 1_000_000
+    assert parse_size("10M") == 10_000_000
+    assert parse_size("250") == 250
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 100) == 100.0
+    assert percentile([], 95) == 0.0
+
+
+def test_stats_count_server_errors():
+    stats = ScenarioStats(elapsed_seconds=2.0)
+    stats.record(10.0, 200)
+    stats.record(20.0, 404)
+    stats.record(30.0, 503)
+    stats.record(40.0, None)
+
+    summary = stats.summary()
+    assert summary["requests"] == 4
+    assert summary["errors"] == 2
+    assert summary["rps"] == 2.0
+    assert summary["status_codes"] == {"0": 1, "200": 1, "404": 1, "503": 1}
+
+
+def test_compare_flags_p95_regression():
+    [row] = compare_results(_results(100.0), _results(115.0), threshold=0.10)
+    assert row["regressed"] is True
+
+    [row] = compare_results(_results(100.0), _results(105.0), threshold=0.10)
+    assert row["regressed"] is False
+
+
+def test_compare_flags_new_errors():
+    [row] = compare_results(_results(100.0), _results(90.0, errors=3), threshold=0.10)
+    assert row["regressed"] is True
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from app.core.change_feed import WarrantyChangeFeed, WarrantyChangeFilter
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def feed(monkeypatch: pytest.MonkeyPatch) -> WarrantyChangeFeed:
+    feed = WarrantyChangeFeed("postgresql+asyncpg://localhost/test", queue_size=2)
+
+    async def listen() -> None:
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(feed, "_listen", listen)
+    return feed
+
+
+async def test_dispatch_applies_filters(feed: WarrantyChangeFeed) -> None:
+    it = feed.subscribe(WarrantyChangeFilter(department="IT"))
+    everything = feed.subscribe(WarrantyChangeFilter())
+
+    feed.dispatch({"id": 1, "op": "update", "department": "HR"})
+    feed.dispatch({"id": 2, "op": "insert", "department": "IT"})
+
+    assert it.queue.qsize() == 1
+    assert everything.queue.qsize() == 2
+    await feed.close()
+
+
+async def test_stream_formats_events_and_resyncs_slow_subscribers(feed: WarrantyChangeFeed) -> None:
+    stream = feed.stream(WarrantyChangeFilter(), heartbeat_seconds=0.01)
+    assert await anext(stream) == "retry: 3000\n\n"
+    assert await anext(stream) == ": keep-alive\n\n"
+
+    for i in range(3):
+        feed.dispatch({"id": i, "op": "update"})
+
+    chunks = [chunk async for chunk in stream]
+    assert chunks == [
+        'event: update\ndata: {"id":0,"op":"update"}\n\n',
+        'event: update\ndata: {"id":1,"op":"update"}\n\n',
+        'event: resync\ndata: {"op":"resync"}\n\n',
+    ]
+    assert not feed._subscriptions
+    await feed.close()
@@ -0,0 +1,89 @@
+import io
+import json
+from os import environ
+from types import SimpleNamespace
+
+import pytest
+from click.testing import CliRunner
+
+environ["APP_ENV"] = "test"
+
+from app import cli  # noqa: E402
+from app.core import security  # noqa: E402
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_batch_runs_operations_and_reports_failures(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+
+    async def fake_deactivate(session_factory, op: dict) -> dict:
+        calls.append(op["id"])
+        if op["id"] == 2:
+            raise LookupError("API key 2 not found")
+        return {"id": op["id"]}
+
+    monkeypatch.setitem(cli.BATCH_OPERATIONS, "deactivate", fake_deactivate)
+
+    stream = io.StringIO(
+        '{"op": "deactivate", "id": 1}\n'
+        "\n"
+        "# comment\n"
+        '{"op": "deactivate", "id": 2}\n'
+        '{"op": "unknown"}\n'
+        "not json\n"
+    )
+    results = []
+
+    failures = await cli._run_batch(None, stream, concurrency=2, emit=results.append)
+
+    assert sorted(calls) == [1, 2]
+    assert failures == 3
+    by_line = {result["line"]: result for result in results}
+    assert by_line[1] == {"line": 1, "op": "deactivate", "ok": True, "id": 1}
+    assert by_line[4]["ok"] is False
+    assert by_line[5]["ok"] is False
+    assert by_line[6]["ok"] is False
+
+
+async def test_generate_bulk_prints_each_key_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+
+    def fake_run_with_engine(func, names, expires_days):
+        calls.append((func, names, expires_days))
+        return [
+            (api_key, SimpleNamespace(id=index, name=name, expires_at=None))
+            for index, (name, (api_key, _)) in enumerate(zip(names, security.generate_api_keys(len(names))), start=1)
+        ]
+
+    monkeypatch.setattr(cli, "_run_with_engine", fake_run_with_engine)
+
+    result = CliRunner().invoke(cli.cli, ["generate-bulk", "--name", "partner-a", "--name", "partner-b"])
+
+    assert result.exit_code == 0
+    assert calls == [(cli._create_api_keys, ["partner-a", "partner-b"], None)]
+    lines = [json.loads(line) for line in result.stdout.splitlines() if line.startswith("{")]
+    assert [line["name"] for line in lines] == ["partner-a", "partner-b"]
+    assert all(line["api_key"].startswith("wr_") for line in lines)
+
+
+async def test_rotate_needs_ids_or_all() -> None:
+    result = CliRunner().invoke(cli.cli, ["rotate"])
+
+    assert result.exit_code == 1
+
+
+async def test_archive_warranties_reports_rows_moved(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+
+    def fake_run_with_engine(func, older_than_days, batch_size):
+        calls.append((func, older_than_days, batch_size))
+        return 7
+
+    monkeypatch.setattr(cli, "_run_with_engine", fake_run_with_engine)
+
+    result = CliRunner().invoke(cli.cli, ["archive-warranties", "--older-than-days", "30", "--batch-size", "50"])
+
+    assert result.exit_code == 0
+    assert calls == [(cli._archive_warranties, 30, 50)]
+    assert "Archived 7 warranty(ies)" in result.stdout
@@ -0,0 +1,38 @@
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+pytestmark = pytest.mark.asyncio
+
+
+class FakeProbe:
+    def __init__(self, ok: bool) -> None:
+        self.ok = ok
+
+    def snapshot(self) -> dict:
+        return {"ok": self.ok, "error": None if self.ok else "down"}
+
+
+async def test_liveness_does_not_need_database(app: FastAPI) -> None:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/healthz")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+
+@pytest.mark.parametrize(
+    ("warmed", "db_ok", "expected"),
+    [(False, True, 503), (True, False, 503), (True, True, 200)],
+)
+async def test_readiness_requires_warm_pool_and_healthy_database(
+    app: FastAPI, warmed: bool, db_ok: bool, expected: int
+) -> None:
+    app.state.warmed = warmed
+    app.state.db_health = FakeProbe(db_ok)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/readyz")
+
+    assert response.status_code == expected
+    assert response.json()["database"]["ok"] is db_ok
@@ -0,0 +1,84 @@
+import pytest
+
+from app.core import rate_limit
+from app.core.rate_limit import InMemoryRateLimitBackend, RateLimiter
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    return now
+
+
+async def test_bucket_allows_burst_then_limits(clock: list[float]) -> None:
+    limiter = RateLimiter(InMemoryRateLimitBackend())
+
+    decisions = [await limiter.hit("api_key:1", per_minute=60, burst=3) for _ in range(4)]
+
+    assert [d.allowed for d in decisions] == [True, True, True, False]
+    assert decisions[2].remaining == 0
+    assert decisions[3].retry_after == pytest.approx(1.0)
+
+
+async def test_bucket_refills_over_time(clock: list[float]) -> None:
+    limiter = RateLimiter(InMemoryRateLimitBackend())
+    for _ in range(3):
+        await limiter.hit("api_key:1", per_minute=60, burst=3)
+
+    clock[0] += 2
+    assert (await limiter.hit("api_key:1", per_minute=60, burst=3)).allowed is True
+    assert (await limiter.hit("api_key:1", per_minute=60, burst=3)).allowed is True
+    assert (await limiter.hit("api_key:1", per_minute=60, burst=3)).allowed is False
+
+
+async def test_keys_are_isolated(clock: list[float]) -> None:
+    limiter = RateLimiter(InMemoryRateLimitBackend())
+
+    assert (await limiter.hit("api_key:1", per_minute=1)).allowed is True
+    assert (await limiter.hit("api_key:1", per_minute=1)).allowed is False
+    assert (await limiter.hit("api_key:2", per_minute=1)).allowed is True
+
+
+async def test_backend_failure_fails_open() -> None:
+    class BrokenBackend:
+        async def acquire(self, key, *, rate, capacity, cost=1):
+            raise ConnectionError("redis down")
+
+    decision = await RateLimiter(BrokenBackend()).hit("api_key:1", per_minute=60)
+
+    assert decision.allowed is True
+
+
+async def test_dependency_returns_429_with_retry_after(clock: list[float]) -> None:
+    from types import SimpleNamespace
+
+    from fastapi import Depends, FastAPI
+    from fastapi.exceptions import HTTPException
+    from httpx import ASGITransport, AsyncClient
+
+    from app.api.dependencies.api_key import get_rate_limited_api_key, verify_api_key
+    from app.core.rate_limit import get_rate_limiter
+    from app.utils import http_exception_handler
+
+    app = FastAPI()
+    app.add_exception_handler(HTTPException, http_exception_handler)
+
+    @app.get("/limited", dependencies=[Depends(get_rate_limited_api_key())])
+    async def limited():
+        return {"ok": True}
+
+    api_key = SimpleNamespace(id=7, rate_limit_per_minute=30, rate_limit_burst=1)
+    app.dependency_overrides[verify_api_key] = lambda: api_key
+    limiter = RateLimiter(InMemoryRateLimitBackend())
+    app.dependency_overrides[get_rate_limiter] = lambda: limiter
+
+    async with AsyncClient(transport=ASGITransport(app), base_url="http://test") as client:
+        first = await client.get("/limited")
+        second = await client.get("/limited")
+
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert second.headers["Retry-After"] == "2"
@@ -0,0 +1,43 @@
+import pickle
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.settings.app import AppSettings
+from app.server import resolve_max_requests, resolve_workers, worker_pool_sizes
+
+
+@pytest.mark.parametrize(
+    ("budget", "workers", "expected"),
+    [(90, 4, (14, 8)), (30, 1, (20, 10)), (150, 1, (20, 10)), (150, 16, (6, 3)), (3, 3, (1, 0))],
+)
+def test_worker_pool_sizes_stay_within_budget(budget: int, workers: int, expected: tuple[int, int]) -> None:
+    pool_size, max_overflow = worker_pool_sizes(budget, workers, 30)
+
+    assert (pool_size, max_overflow) == expected
+    assert (pool_size + max_overflow) * workers <= budget
+
+
+def test_default_budget_stays_below_max_connections(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("os.cpu_count", lambda: 64)
+    defaults = {name: field.default for name, field in AppSettings.model_fields.items()}
+    settings = SimpleNamespace(**defaults)
+
+    workers = resolve_workers(settings)
+    pool_size, max_overflow = worker_pool_sizes(
+        settings.db_connection_budget, workers, settings.db_pool_size + settings.db_max_overflow
+    )
+
+    assert workers == 64
+    # max_connections in postgresql/postgresql.conf
+    assert (pool_size + max_overflow) * workers <= settings.db_connection_budget < 200
+    assert resolve_workers(SimpleNamespace(server_workers=8, db_connection_budget=3)) == 3
+
+
+def test_max_requests_only_recycles_supervised_workers() -> None:
+    settings = SimpleNamespace(server_max_requests=100, server_max_requests_jitter=10)
+
+    assert resolve_max_requests(settings, 1) is None
+    limits = {pickle.loads(pickle.dumps(resolve_max_requests(settings, 4))) for _ in range(50)}
+    assert len(limits) > 1
+    assert all(100 <= limit <= 110 for limit in limits)
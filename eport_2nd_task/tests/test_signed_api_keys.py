@@ -0,0 +1,114 @@
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi.exceptions import HTTPException
+from pydantic import SecretStr
+
+from app.api.dependencies import api_key as api_key_dependency
+from app.api.dependencies.api_key import verify_api_key
+from app.core import security
+from app.core.api_key_revocations import ApiKeyRevocations
+from app.models.api_key import ApiKey
+
+pytestmark = pytest.mark.asyncio
+
+SECRET = "test-signing-secret"
+
+
+class UnusedRepository:
+    async def get_api_key_by_hash(self, *, key_hash: str):
+        raise AssertionError("signed keys must not be looked up")
+
+
+class HashRepository:
+    def __init__(self, api_key: ApiKey) -> None:
+        self.api_key = api_key
+
+    async def get_api_key_by_hash(self, *, key_hash: str):
+        return self.api_key
+
+
+@pytest.fixture
+def revocations(monkeypatch: pytest.MonkeyPatch) -> ApiKeyRevocations:
+    revocations = ApiKeyRevocations()
+    revocations.load([3, 12], {5: (600, 50)})
+    settings = SimpleNamespace(
+        api_key_signing_key=SECRET,
+        api_key_signing_secret=SecretStr(SECRET),
+        api_key_revocation_max_staleness_seconds=300,
+    )
+    monkeypatch.setattr(api_key_dependency, "get_app_settings", lambda: settings)
+    monkeypatch.setattr(api_key_dependency, "get_api_key_revocations", lambda: revocations)
+    return revocations
+
+
+async def test_signed_key_round_trips_and_rejects_tampering() -> None:
+    expires_at = datetime(2030, 1, 1, tzinfo=UTC)
+    api_key = ApiKey.generate_key(42, expires_at, SECRET)
+
+    assert api_key.startswith(security.SIGNED_API_KEY_PREFIX)
+    assert security.parse_signed_api_key(api_key, SECRET) == security.SignedApiKeyClaims(42, expires_at)
+    assert security.parse_signed_api_key(api_key, "other-secret") is None
+    assert security.parse_signed_api_key(api_key.replace("wrs_42.", "wrs_43."), SECRET) is None
+    assert ApiKey.generate_key().startswith("wr_")
+
+
+@pytest.mark.parametrize("api_key", ["wrs_1.0.é", "wrs_é.0.abc", "wrs_1.0", "wrs_"])
+async def test_malformed_signed_key_is_rejected_not_raised(revocations: ApiKeyRevocations, api_key: str) -> None:
+    assert security.parse_signed_api_key(api_key, SECRET) is None
+    with pytest.raises(HTTPException) as exc_info:
+        await verify_api_key(api_key_header=api_key, api_key_repo=UnusedRepository())
+
+    assert exc_info.value.status_code == 403
+
+
+async def test_signed_key_verifies_without_a_lookup(revocations: ApiKeyRevocations) -> None:
+    api_key = await verify_api_key(
+        api_key_header=ApiKey.generate_key(5, None, SECRET),
+        api_key_repo=UnusedRepository(),
+    )
+
+    assert (api_key.id, api_key.rate_limit_per_minute, api_key.rate_limit_burst) == (5, 600, 50)
+
+
+@pytest.mark.parametrize(
+    ("api_key_id", "expires_at", "detail"),
+    [
+        (12, None, "API key has been deactivated."),
+        (7, datetime.now(UTC) - timedelta(minutes=1), "API key has expired."),
+    ],
+)
+async def test_revoked_or_expired_signed_key_is_rejected(
+    revocations: ApiKeyRevocations, api_key_id: int, expires_at: datetime | None, detail: str
+) -> None:
+    with pytest.raises(HTTPException) as exc_info:
+        await verify_api_key(
+            api_key_header=ApiKey.generate_key(api_key_id, expires_at, SECRET),
+            api_key_repo=UnusedRepository(),
+        )
+
+    assert exc_info.value.detail == detail
+
+
+async def test_stale_revocations_fall_back_to_the_database(revocations: ApiKeyRevocations) -> None:
+    revocations.refreshed_at = None
+    stored = ApiKey(id=9, is_active=True, expires_at=None)
+
+    api_key = await verify_api_key(
+        api_key_header=ApiKey.generate_key(9, None, SECRET),
+        api_key_repo=HashRepository(stored),
+    )
+
+    assert api_key is stored
+
+
+async def test_revocation_bitmap_covers_only_listed_ids() -> None:
+    revocations = ApiKeyRevocations()
+    assert not revocations.fresh(300)
+
+    revocations.load([0, 9, 4096], {})
+
+    assert revocations.fresh(300)
+    assert [i for i in range(5000) if revocations.is_revoked(i)] == [0, 9, 4096]
+    assert not revocations.is_revoked(10**6)
@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi import FastAPI
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# Only needed for password hashing and JWTs, so kept off the startup path
+LAZY_MODULES = ("jose", "passlib", "bcrypt")
+
+
+def import_profile(module: str) -> dict[str, int]:
+    """Cumulative import time in microseconds per module, from `python -X importtime`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        env={**os.environ, "APP_ENV": "test"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def test_import_time_profile_excludes_lazy_modules() -> None:
+    profile = import_profile("app.main")
+    eager = {name: profile[name] for name in profile if name.split(".")[0] in LAZY_MODULES}
+
+    assert "app.main" in profile
+    assert not eager, f"imported by app.main (cumulative us): {eager}"
+
+
+def test_production_factory_omits_docs_routes() -> None:
+    from app.main import create_app
+
+    paths = {route.path for route in create_app(include_docs=False).routes}
+    assert not paths & {"/docs", "/redoc", "/openapi.json", "/docs/oauth2-redirect"}
+    assert "/healthz" in paths
+
+    app: FastAPI = create_app(include_docs=True)
+    assert {"/docs", "/redoc", "/openapi.json"} <= {route.path for route in app.routes}
@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.exceptions import HTTPException
+from httpx import ASGITransport, AsyncClient
+
+from app.api.dependencies.api_key import get_rate_limited_api_key, verify_api_key
+from app.core import usage as usage_module
+from app.core.rate_limit import InMemoryRateLimitBackend, RateLimiter, get_rate_limiter
+from app.core.usage import ApiKeyUsageRecorder
+from app.middlewares import ApiKeyUsageMiddleware
+from app.utils import http_exception_handler
+
+pytestmark = pytest.mark.asyncio
+
+
+class FakeUsageRepository:
+    flushed: list[tuple[list[dict], dict]] = []
+    fail = False
+
+    def __init__(self, session) -> None:
+        pass
+
+    async def add_usage(self, *, usage: list[dict], last_used: dict) -> None:
+        if FakeUsageRepository.fail:
+            raise ConnectionError("database unavailable")
+        FakeUsageRepository.flushed.append((usage, last_used))
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+@pytest.fixture(autouse=True)
+def fake_repository(monkeypatch: pytest.MonkeyPatch):
+    FakeUsageRepository.flushed = []
+    FakeUsageRepository.fail = False
+    monkeypatch.setattr(usage_module, "ApiKeyUsageRepository", FakeUsageRepository)
+
+
+async def test_requests_with_a_key_are_counted_and_flushed_once() -> None:
+    recorder = ApiKeyUsageRecorder()
+    app = FastAPI()
+    app.add_exception_handler(HTTPException, http_exception_handler)
+    app.add_middleware(ApiKeyUsageMiddleware, recorder=recorder)
+
+    @app.get("/open")
+    async def open_route():
+        return {"ok": True}
+
+    @app.get("/keyed", dependencies=[Depends(get_rate_limited_api_key())])
+    async def keyed():
+        return {"ok": True}
+
+    api_key = SimpleNamespace(id=7, rate_limit_per_minute=60, rate_limit_burst=2)
+    app.dependency_overrides[verify_api_key] = lambda: api_key
+    limiter = RateLimiter(InMemoryRateLimitBackend())
+    app.dependency_overrides[get_rate_limiter] = lambda: limiter
+
+    async with AsyncClient(transport=ASGITransport(app), base_url="http://test") as client:
+        for _ in range(3):
+            await client.get("/keyed", headers={"X-API-Key": "wr_test"})
+        await client.get("/open")
+
+    assert recorder.pending() == 3
+    assert await recorder.flush(FakeSession) == 3
+    assert await recorder.flush(FakeSession) == 0
+
+    [(usage, last_used)] = FakeUsageRepository.flushed
+    [row] = usage
+    assert (row["api_key_id"], row["requests"], row["errors"]) == (7, 3, 1)  # the third hit is rate limited
+    assert row["bytes_out"] > 0
+    assert set(last_used) == {7}
+
+
+async def test_failed_flush_keeps_counts_for_the_next_one() -> None:
+    recorder = ApiKeyUsageRecorder()
+    recorder.record(1, status=200, bytes_out=10, latency_ms=2.0)
+    FakeUsageRepository.fail = True
+
+    with pytest.raises(ConnectionError):
+        await recorder.flush(FakeSession)
+    recorder.record(1, status=500, bytes_out=5, latency_ms=3.0)
+    FakeUsageRepository.fail = False
+    await recorder.flush(FakeSession)
+
+    [(usage, _)] = FakeUsageRepository.flushed
+    assert (usage[0]["requests"], usage[0]["bytes_out"], usage[0]["errors"], usage[0]["latency_ms_sum"]) == (2, 15, 1, 5.0)
@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+
+from app.core import events
+from app.core.config import get_app_settings
+from app.database.warmup import WARRANTY_FILTER_VARIANTS, warm_up_pool
+
+pytestmark = pytest.mark.asyncio
+
+
+class FakeResult:
+    def fetchone(self):
+        return None
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return []
+
+
+class FakeSession:
+    open_sessions = 0
+    max_open_sessions = 0
+
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.statements = []
+
+    async def __aenter__(self) -> "FakeSession":
+        FakeSession.open_sessions += 1
+        FakeSession.max_open_sessions = max(FakeSession.max_open_sessions, FakeSession.open_sessions)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        FakeSession.open_sessions -= 1
+
+    async def execute(self, statement):
+        await asyncio.sleep(0)
+        if self.fail:
+            raise ConnectionError("database unavailable")
+        self.statements.append(statement)
+        return FakeResult()
+
+
+@pytest.fixture(autouse=True)
+def reset_counters() -> None:
+    FakeSession.open_sessions = 0
+    FakeSession.max_open_sessions = 0
+
+
+async def test_warm_up_holds_every_connection_and_runs_hot_queries() -> None:
+    sessions: list[FakeSession] = []
+
+    def factory() -> FakeSession:
+        sessions.append(FakeSession())
+        return sessions[-1]
+
+    assert await warm_up_pool(factory, connections=4, timeout_seconds=1) is True
+
+    assert FakeSession.max_open_sessions == 4
+    assert all(len(session.statements) == 2 + len(WARRANTY_FILTER_VARIANTS) for session in sessions)
+
+
+async def test_filter_variants_cover_every_filter_combination() -> None:
+    combinations = {frozenset(filters) for filters in WARRANTY_FILTER_VARIANTS}
+
+    assert len(combinations) == len(WARRANTY_FILTER_VARIANTS) == 8
+    assert frozenset({"department", "category"}) in combinations
+
+
+async def test_warm_up_failure_does_not_hang_or_raise() -> None:
+    calls = iter([FakeSession(), FakeSession(fail=True), FakeSession()])
+
+    assert await warm_up_pool(lambda: next(calls), connections=3, timeout_seconds=1) is False
+    assert FakeSession.open_sessions == 0
+
+
+async def test_failed_warm_up_keeps_worker_unready_until_a_retry_succeeds(monkeypatch: pytest.MonkeyPatch) -> None:
+    results = iter([False, False, True])
+
+    async def fake_warm_up_pool(session_factory, connections, timeout_seconds) -> bool:
+        return next(results)
+
+    async def fake_connect_to_db(app, settings) -> None:
+        app.state.pool, app.state.engine = FakeSession, None
+
+    class FakeHealthProbe:
+        def __init__(self, engine, **kwargs) -> None:
+            pass
+
+        async def check(self) -> None:
+            pass
+
+        async def run(self) -> None:
+            await asyncio.Event().wait()
+
+    monkeypatch.setattr(events, "warm_up_pool", fake_warm_up_pool)
+    monkeypatch.setattr(events, "connect_to_db", fake_connect_to_db)
+    monkeypatch.setattr(events, "DatabaseHealthProbe", FakeHealthProbe)
+    settings = get_app_settings().model_copy(update={"db_warmup_retry_seconds": 0.01, "warranty_archive_enabled": False, "api_key_signing_secret": None})
+    app = FastAPI()
+
+    await events.create_start_app_handler(app, settings)()
+    assert app.state.warmed is False
+
+    for _ in range(100):
+        if app.state.warmed:
+            break
+        await asyncio.sleep(0.01)
+    assert app.state.warmed is True
+
+    for task in app.state.background_tasks:
+        task.cancel()